@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, QuestionModel, AnswerModel, Appointment
+from .models import CustomUser, QuestionModel, AnswerModel, Appointment, EvaluationJob, EvaluationUsage, CV, FacultyAvailability
 
 
 @admin.register(CustomUser)
@@ -18,3 +18,30 @@ class CustomUserAdmin(UserAdmin):
 admin.site.register(QuestionModel)
 admin.site.register(AnswerModel)
 admin.site.register(Appointment)
+
+
+@admin.register(FacultyAvailability)
+class FacultyAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ['faculty', 'weekday', 'start_time', 'end_time', 'slot_minutes']
+    list_filter = ['weekday']
+
+
+@admin.register(EvaluationJob)
+class EvaluationJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'answer', 'status', 'attempts', 'not_before', 'created_at', 'finished_at']
+    list_filter = ['status']
+
+
+@admin.register(EvaluationUsage)
+class EvaluationUsageAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'model', 'kind', 'category', 'item_count', 'prompt_tokens', 'cached_tokens', 'completion_tokens', 'latency_ms']
+    list_filter = ['model', 'kind', 'category']
+    date_hierarchy = 'created_at'
+
+
+@admin.register(CV)
+class CVAdmin(admin.ModelAdmin):
+    list_display = ['student', 'filename', 'size_bytes', 'has_pdf', 'uploaded_at']
+    list_filter = ['has_pdf']
+    exclude = ['pdf_base64']
+    readonly_fields = ['checksum', 'size_bytes', 'has_pdf']
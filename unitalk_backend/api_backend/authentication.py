@@ -0,0 +1,74 @@
+"""Stateless JWT authentication.
+
+simplejwt's JWTAuthentication loads the CustomUser row on every request. The access token
+already carries ``user_type`` and ``username`` (see CustomTokenObtainPairSerializer), so
+requests are authenticated as a TokenBackedUser built from the claims. Deactivation and
+role changes are still honoured through a short-TTL per-user state cache that signals.py
+invalidates whenever a user is saved or deleted.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+AUTH_STATE_KEY = 'auth:user-state:{}'
+
+
+def get_user_state(user_id):
+    """Return ``{'is_active', 'user_type'}`` for a user, from cache when possible."""
+    key = AUTH_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = get_user_model().objects.filter(pk=user_id).values('is_active', 'user_type').first()
+        state = row or {'is_active': False, 'user_type': ''}
+        cache.set(key, state, timeout=settings.AUTH_USER_STATE_TTL)
+    return state
+
+
+def forget_user_state(user_id):
+    cache.delete(AUTH_STATE_KEY.format(user_id))
+
+
+class TokenBackedUser(TokenUser):
+    """Request user built from token claims, with ``user_type`` taken from the cached user state."""
+
+    def __init__(self, token, state=None):
+        super().__init__(token)
+        self._state = state or {}
+
+    @cached_property
+    def id(self):
+        # Tokens store the id as a string; convert it so it can be assigned to foreign keys.
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def user_type(self):
+        return self._state.get('user_type') or self.token.get('user_type', '')
+
+    @property
+    def is_student(self):
+        return self.user_type == 'student'
+
+    @property
+    def is_faculty(self):
+        return self.user_type == 'faculty'
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed('Token contained no recognizable user identification', code='token_not_valid')
+        state = get_user_state(user_id)
+        if not state['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return TokenBackedUser(validated_token, state)
@@ -0,0 +1,393 @@
+"""Benchmark harness behind the seed_benchmark_data and run_benchmarks commands.
+
+Every route in api_backend/urls.py has a Scenario describing how to call it against the
+seeded ``bench_`` data. Requests go through django.test.Client, so the full middleware
+and authentication stack is measured, while the LLM is replaced by ``fake_evaluator``.
+Both commands refuse to run with DEBUG off unless given --i-know-this-is-not-prod, and keep
+CV files in local storage.
+"""
+import asyncio
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import CommandError
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import progress, urls
+from .cv_storage import save_cv_pdf
+from .models import CV, AnswerModel, Appointment, CustomUser, EvaluationJob, QuestionModel
+
+BENCH_PREFIX = 'bench_'
+BENCH_QUESTION_PREFIX = '[bench] '
+# Weekday hours (start, end) given to every seeded faculty member, in 30-minute slots.
+BENCH_WORKING_HOURS = (9, 17)
+BENCH_PDF = b'%PDF-1.4\n% unitalk benchmark CV\n' + b'0' * 64 * 1024 + b'\n%%EOF\n'
+
+
+# --- Fake evaluator ---------------------------------------------------------------------
+
+def _fake_evaluation(answer_text):
+    score = 40 + len(answer_text) % 60
+    return {
+        'strengths': ['Clear structure', 'Relevant example'],
+        'weaknesses': ['Could quantify the impact'],
+        'score': score,
+    }
+
+
+def add_safety_argument(parser):
+    parser.add_argument(
+        '--i-know-this-is-not-prod', action='store_true', dest='not_prod',
+        help='Run even though DEBUG is off. The command writes to the configured database.',
+    )
+
+
+def refuse_unsafe_target(not_prod):
+    """Raise CommandError unless DEBUG is on or ``--i-know-this-is-not-prod`` was given.
+
+    The benchmark commands bulk-insert and delete rows in whatever DATABASES points at, which
+    on a deployed service (DEBUG off) is production.
+    """
+    if settings.DEBUG or not_prod:
+        return
+    database = settings.DATABASES['default']
+    target = database.get('HOST') or database.get('NAME')
+    raise CommandError(
+        f'Refusing to run against {target} with DEBUG off. Point DATABASES at a benchmark '
+        f'database and pass --i-know-this-is-not-prod.'
+    )
+
+
+@contextmanager
+def local_cv_storage():
+    """Store CV files under MEDIA_ROOT/benchmark_cvs whatever the cvs storage is (e.g. S3),
+    so seeded and benchmarked uploads never reach the real bucket."""
+    field = CV._meta.get_field('pdf')
+    with mock.patch.object(field, 'storage', FileSystemStorage(location=settings.MEDIA_ROOT / 'benchmark_cvs')):
+        yield
+
+
+@contextmanager
+def fake_evaluator(latency=0.3, jitter=0.0):
+    """Replace the OpenAI entry points used by evaluators with a local fake taking ``latency``
+    seconds (a third of that for the cheaper screening model)."""
+    def delay():
+        return max(0.0, latency + random.uniform(-jitter, jitter))
+
+    def evaluate_answer(question_obj, answer_text):
+        time.sleep(delay())
+        return _fake_evaluation(answer_text)
+
+    def screen_answer(question_obj, answer_text):
+        time.sleep(delay() / 3)
+        return {**_fake_evaluation(answer_text), 'confidence': 0.9}
+
+    def evaluate_answers_batch(items):
+        time.sleep(delay())
+        return [_fake_evaluation(answer_text) for _, answer_text in items]
+
+    async def stream_evaluation(question_obj, answer_text):
+        evaluation = _fake_evaluation(answer_text)
+        items = [('strengths', text) for text in evaluation['strengths']]
+        items += [('weaknesses', text) for text in evaluation['weaknesses']]
+        step = delay() / (len(items) + 1)
+        for item in items:
+            await asyncio.sleep(step)
+            yield item
+        await asyncio.sleep(step)
+        yield 'result', evaluation
+
+    targets = {
+        'api_backend.openai_service.evaluate_answer': evaluate_answer,
+        'api_backend.openai_service.screen_answer': screen_answer,
+        'api_backend.openai_service.evaluate_answers_batch': evaluate_answers_batch,
+        'api_backend.openai_service.stream_evaluation': stream_evaluation,
+    }
+    with ExitStack() as stack:
+        for target, replacement in targets.items():
+            stack.enter_context(mock.patch(target, replacement))
+        yield
+
+
+# --- Fixtures and scenarios -------------------------------------------------------------
+
+class Fixtures:
+    """The seeded objects scenarios refer to, loaded once per run."""
+
+    def __init__(self):
+        self.student = (
+            CustomUser.objects.filter(username__startswith=BENCH_PREFIX, user_type='student')
+            .filter(answers__isnull=False).order_by('id').first()
+        )
+        self.faculty = CustomUser.objects.filter(username__startswith=BENCH_PREFIX, user_type='faculty').order_by('id').first()
+        self.question = QuestionModel.objects.filter(question__startswith=BENCH_QUESTION_PREFIX).order_by('id').first()
+        if self.student is None or self.faculty is None or self.question is None:
+            raise LookupError('No benchmark data found; run seed_benchmark_data first.')
+
+        # A student with an appointment with self.faculty and a CV, for the faculty CV routes.
+        self.appointment = Appointment.objects.filter(faculty=self.faculty).order_by('id').first()
+        if self.appointment is None:
+            self.appointment = Appointment.objects.create(
+                faculty=self.faculty, student=self.student, scheduled_at=timezone.now(),
+            )
+        self.cv_student = self.appointment.student
+        if not CV.objects.with_pdf().filter(student=self.cv_student).exists():
+            self.upload_cv(self.cv_student)
+
+        answer = AnswerModel.objects.filter(student=self.student).order_by('id').first()
+        self.job, _ = EvaluationJob.objects.get_or_create(
+            answer=answer, defaults={'status': 'done', 'finished_at': timezone.now()},
+        )
+
+    @staticmethod
+    def upload_cv(student):
+        cv, _ = CV.objects.get_or_create(student=student)
+        save_cv_pdf(cv, ContentFile(BENCH_PDF, name='cv.pdf'))
+        cv.save()
+
+
+class Scenario:
+    def __init__(self, route, method='get', user='student', kwargs=None, data=None, query='', setup=None, label=''):
+        self.route = route
+        self.method = method
+        self.user = user
+        self.kwargs = kwargs or (lambda f: {})
+        self.data = data
+        self.query = query
+        self.setup = setup
+        self.label = label
+
+    @property
+    def name(self):
+        suffix = f'?{self.query}' if self.query else ''
+        label = f' ({self.label})' if self.label else ''
+        return f'{self.method.upper()} {self.route}{suffix}{label}'
+
+    def path(self, fixtures):
+        path = '/api_backend/' + self.route
+        for key, value in self.kwargs(fixtures).items():
+            path = re.sub(rf'<\w+:{key}>', str(value), path)
+        return path + (f'?{self.query}' if self.query else '')
+
+
+def _answer(fixtures):
+    return {'answer': 'I would walk through the DCF, then sanity-check it against trading comparables. ' * 3}
+
+
+def _new_question(fixtures):
+    # Mostly random tokens, so runs do not trip the near-duplicate check against each other.
+    tokens = ' '.join(uuid.uuid4().hex[i:i + 4] for i in range(0, 32, 4))
+    return {
+        'question': f'{BENCH_QUESTION_PREFIX}Walk me through {tokens}',
+        'difficulty': 'Medium',
+        'category': 'Investment Banking',
+        'subcategory': 'Financial',
+    }
+
+
+def _duplicate_question(fixtures):
+    return {**_new_question(fixtures), 'question': fixtures.question.question}
+
+
+def _batch(fixtures):
+    return {'answers': [{'question': fixtures.question.pk, **_answer(fixtures)} for _ in range(5)]}
+
+
+def _register(fixtures):
+    return {
+        'username': f'{BENCH_PREFIX}reg_{uuid.uuid4().hex[:12]}',
+        'password': 'bench-password',
+        'user_type': 'student',
+    }
+
+
+def _appointment(fixtures):
+    # A random slot inside BENCH_WORKING_HOURS years ahead, so repeated runs rarely collide.
+    day = timezone.localdate() + timedelta(days=365 + random.randrange(3650))
+    day -= timedelta(days=max(0, day.weekday() - 4))
+    first_hour, last_hour = BENCH_WORKING_HOURS
+    offset = timedelta(hours=first_hour, minutes=30 * random.randrange(2 * (last_hour - first_hour)))
+    scheduled_at = timezone.make_aware(datetime.combine(day, datetime.min.time()) + offset)
+    return {'faculty': fixtures.faculty.pk, 'scheduled_at': scheduled_at.isoformat(), 'notes': 'benchmark'}
+
+
+def _question_import(fixtures):
+    # 500 new rows plus one duplicate of a seeded question and one invalid row.
+    rows = [
+        {
+            'question': f'{BENCH_QUESTION_PREFIX}Imported {uuid.uuid4().hex}',
+            'difficulty': 'Medium',
+            'category': 'Consulting',
+            'subcategory': 'Case',
+        }
+        for _ in range(500)
+    ]
+    rows += [{'question': fixtures.question.question, 'difficulty': 'Easy'}, {'question': '', 'difficulty': 'Easy'}]
+    return {'file': ContentFile(''.join(json.dumps(row) + '\n' for row in rows).encode(), name='questions.ndjson')}
+
+
+def _cv_upload(fixtures):
+    return {'pdf': ContentFile(BENCH_PDF, name='cv.pdf')}
+
+
+SCENARIOS = [
+    Scenario('questions/'),
+    Scenario('questions/', query='category=Investment+Banking&limit=20'),
+    Scenario('questions/', query='q=merger&limit=20'),
+    Scenario('questions/', method='post', data=_new_question),
+    Scenario('questions/', method='post', data=_duplicate_question, label='duplicate'),
+    Scenario('questions/random/'),
+    Scenario('questions/submit-answers/', method='post', data=_batch),
+    Scenario('questions/<int:pk>/', kwargs=lambda f: {'pk': f.question.pk}),
+    Scenario('questions/<int:pk>/submit-answer/', method='post', kwargs=lambda f: {'pk': f.question.pk}, data=_answer),
+    Scenario('questions/<int:pk>/submit-answer/stream/', method='post', kwargs=lambda f: {'pk': f.question.pk}, data=_answer),
+    Scenario('evaluations/<uuid:token>/', kwargs=lambda f: {'token': f.job.token}),
+    Scenario('register/', method='post', user=None, data=_register),
+    Scenario('student/answers/'),
+    Scenario('student/answers/', query='limit=20&fields=id,score,created_at'),
+    Scenario('student/performance/over-time/'),
+    Scenario('student/performance/by-category/'),
+    Scenario('student/performance/by-subcategory/'),
+    Scenario('student/performance/summary/'),
+    # Measures the steady state; the first read after a change rebuilds the snapshot.
+    Scenario('student/progress/', setup=lambda f: progress.get_snapshot(f.student.pk)),
+    Scenario('faculty/'),
+    Scenario('faculty/analytics/', user='faculty'),
+    Scenario('faculty/evaluations/tiers/', user='faculty'),
+    Scenario('faculty/evaluations/usage/', user='faculty'),
+    Scenario('faculty/export/answers/', user='faculty'),
+    Scenario('faculty/export/answers/', user='faculty', query='output=ndjson&gzip=1&category=Consulting'),
+    Scenario('faculty/questions/import/', method='post', user='faculty', data=_question_import),
+    Scenario('faculty/appointments/', user='faculty'),
+    Scenario('faculty/appointments/', user='faculty', query='status=pending,confirmed&ordering=-scheduled_at&limit=20'),
+    Scenario('faculty/availability/', user='faculty'),
+    Scenario('faculty/<int:faculty_id>/availability/', kwargs=lambda f: {'faculty_id': f.faculty.pk}),
+    Scenario('faculty/student/<int:student_id>/answers/', user='faculty', kwargs=lambda f: {'student_id': f.student.pk}),
+    Scenario('appointments/'),
+    Scenario('appointments/', method='post', data=_appointment),
+    Scenario(
+        'appointments/<int:pk>/status/', method='patch', user='faculty',
+        kwargs=lambda f: {'pk': f.appointment.pk}, data=lambda f: {'status': 'confirmed'},
+    ),
+    Scenario('student/cv/', user='cv_student'),
+    Scenario('student/cv/', method='post', user='cv_student', data=_cv_upload),
+    Scenario('student/cv/pdf/', user='cv_student'),
+    Scenario('faculty/student/<int:student_id>/cv/', user='faculty', kwargs=lambda f: {'student_id': f.cv_student.pk}),
+    Scenario('faculty/student/<int:student_id>/cv/pdf/', user='faculty', kwargs=lambda f: {'student_id': f.cv_student.pk}),
+    # Last, so the CV routes above see an uploaded file.
+    Scenario('student/cv/', method='delete', user='cv_student', setup=lambda f: Fixtures.upload_cv(f.cv_student)),
+]
+
+
+def uncovered_routes():
+    """Routes in api_backend/urls.py without a scenario."""
+    covered = {scenario.route for scenario in SCENARIOS}
+    return [str(pattern.pattern) for pattern in urls.urlpatterns if str(pattern.pattern) not in covered]
+
+
+# --- Running ------------------------------------------------------------------------------
+
+_clients = threading.local()
+
+
+def _client(fixtures, user):
+    cache = getattr(_clients, 'cache', None)
+    if cache is None:
+        cache = _clients.cache = {}
+    if user not in cache:
+        account = {'student': fixtures.student, 'faculty': fixtures.faculty, 'cv_student': fixtures.cv_student}.get(user)
+        headers = {}
+        if account is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(account).access_token}'
+        cache[user] = Client(**headers)
+    return cache[user]
+
+
+def _send(scenario, fixtures):
+    client = _client(fixtures, scenario.user)
+    path = scenario.path(fixtures)
+    data = scenario.data(fixtures) if scenario.data else None
+    if scenario.method == 'get':
+        response = client.get(path)
+    elif scenario.data in (_cv_upload, _question_import):
+        response = client.post(path, data)
+    else:
+        response = getattr(client, scenario.method)(path, json.dumps(data) if data is not None else '', content_type='application/json')
+    # Streaming bodies (SSE, CV downloads) only do their work when consumed.
+    if response.streaming:
+        b''.join(response)
+    return response
+
+
+def _percentile(samples, pct):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
+
+
+def run_scenario(scenario, fixtures, iterations, concurrency):
+    if scenario.setup:
+        scenario.setup(fixtures)
+    # Counted with an execute wrapper rather than CaptureQueriesContext, whose log is
+    # reset by the request_started signal.
+    queries = []
+    with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+        warmup = _send(scenario, fixtures)
+
+    def timed(_):
+        close_old_connections()
+        if scenario.setup:
+            scenario.setup(fixtures)
+        start = time.perf_counter()
+        response = _send(scenario, fixtures)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, range(iterations)))
+    else:
+        results = [timed(i) for i in range(iterations)]
+    wall = time.perf_counter() - start
+
+    latencies = sorted(ms for ms, _ in results)
+    return {
+        'status': warmup.status_code,
+        'errors': sum(1 for _, code in results if code >= 400),
+        'queries': len(queries),
+        'iterations': iterations,
+        'p50_ms': round(_percentile(latencies, 50), 2),
+        'p95_ms': round(_percentile(latencies, 95), 2),
+        'p99_ms': round(_percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.fmean(latencies), 2),
+        'throughput_rps': round(iterations / wall, 2) if wall else None,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return regression messages for endpoints whose p95 or query count got worse."""
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result['queries'] > before['queries']:
+            regressions.append(f'{name}: {before["queries"]} -> {result["queries"]} queries')
+        if result['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append(f'{name}: p95 {before["p95_ms"]} ms -> {result["p95_ms"]} ms')
+    return regressions
@@ -0,0 +1,121 @@
+"""Storing and serving CV PDFs through the ``cvs`` storage backend (see STORAGES in settings).
+
+The backend is any Django Storage: local disk by default, or an object store configured
+with CV_STORAGE_BACKEND. Only the file name, checksum and metadata live in the database.
+CVs uploaded before file storage are still served from the legacy pdf_base64 column until
+`manage.py move_cvs_to_storage` has copied them into the backend.
+"""
+import base64
+import hashlib
+import io
+import re
+
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def save_cv_pdf(cv, uploaded_file):
+    """Write ``uploaded_file`` to storage, replacing any previous PDF. Does not save ``cv``.
+
+    The previous file is deleted only once the surrounding transaction commits, so call this
+    and ``cv.save()`` inside one ``transaction.atomic()`` block.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in uploaded_file.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    uploaded_file.seek(0)
+    previous = cv.pdf.name if cv.pdf else ''
+    cv.pdf.save(uploaded_file.name, uploaded_file, save=False)
+    if previous:
+        storage = cv.pdf.storage
+        transaction.on_commit(lambda: storage.delete(previous))
+    cv.checksum = digest.hexdigest()
+    cv.filename = uploaded_file.name
+    cv.size_bytes = size
+    cv.has_pdf = True
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, None to ignore the header,
+    or False when the range cannot be satisfied."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def serve_cv_pdf(request, cv):
+    """Stream ``cv.pdf`` with ETag/Last-Modified validators, conditional GET and single-range support."""
+    etag = f'"{cv.checksum}"' if cv.checksum else None
+    last_modified = int(cv.uploaded_at.timestamp())
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return conditional
+
+    size = cv.size_bytes
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag or if_range == http_date(last_modified)):
+        byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if cv.pdf:
+        pdf_file = cv.pdf.open('rb')
+    else:
+        # Not yet moved to storage: the only query that loads the legacy blob.
+        pdf_base64 = type(cv).objects.filter(pk=cv.pk).values_list('pdf_base64', flat=True).get()
+        pdf_file = io.BytesIO(base64.b64decode(pdf_base64))
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(pdf_file, start, end - start + 1),
+            status=206,
+            content_type='application/pdf',
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(pdf_file, content_type='application/pdf')
+        response['Content-Length'] = str(size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(last_modified)
+    if etag:
+        response['ETag'] = etag
+    response['Content-Disposition'] = f'inline; filename="{cv.filename}"'
+    return response
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import random
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EvaluationCacheEntry
+
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def rubric_version(rubric: str, model: str) -> str:
+    return hashlib.sha256(f'{model}\n{rubric}'.encode('utf-8')).hexdigest()[:16]
+
+
+def normalize_answer(answer_text: str) -> str:
+    return ' '.join(answer_text.split()).casefold()
+
+
+def cache_key(question_obj, answer_text: str, rubric: str, model: str) -> str:
+    payload = json.dumps(
+        {
+            'question_id': question_obj.pk,
+            'question': question_obj.question,
+            'category': question_obj.category,
+            'subcategory': question_obj.subcategory,
+            'difficulty': question_obj.difficulty,
+            'answer': normalize_answer(answer_text),
+            'rubric': rubric,
+            'model': model,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def lookup(key: str, version: str):
+    """Return the cached evaluation for ``key`` or None, bumping its LRU timestamp on a hit.
+
+    Hits come back with tier "cache" so their near-zero latency is reported separately
+    from the model that originally produced them.
+    """
+    if not settings.EVALUATION_CACHE_ENABLED:
+        return None
+    fresh_after = timezone.now() - timedelta(seconds=settings.EVALUATION_CACHE_TTL)
+    entry = (
+        EvaluationCacheEntry.objects.filter(key=key, rubric_version=version, created_at__gte=fresh_after)
+        .only('id', 'result')
+        .first()
+    )
+    if entry is None:
+        _count('misses')
+        return None
+    EvaluationCacheEntry.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    _count('hits')
+    return {**entry.result, 'tier': 'cache'}
+
+
+def store(key: str, version: str, result: dict):
+    if not settings.EVALUATION_CACHE_ENABLED:
+        return
+    EvaluationCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={'rubric_version': version, 'result': result, 'created_at': timezone.now(), 'last_used_at': timezone.now()},
+    )
+    # Eviction scans the table, so run it on a sample of writes rather than every miss; the
+    # table may overshoot EVALUATION_CACHE_MAX_ENTRIES by about EVALUATION_CACHE_EVICT_EVERY.
+    if random.random() * settings.EVALUATION_CACHE_EVICT_EVERY < 1:
+        evict(version)
+
+
+def evict(version: str):
+    """Drop entries from older rubrics, entries past the TTL and the least recently used overflow."""
+    expired_before = timezone.now() - timedelta(seconds=settings.EVALUATION_CACHE_TTL)
+    EvaluationCacheEntry.objects.exclude(rubric_version=version).delete()
+    EvaluationCacheEntry.objects.filter(created_at__lt=expired_before).delete()
+    overflow = EvaluationCacheEntry.objects.count() - settings.EVALUATION_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = EvaluationCacheEntry.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+        EvaluationCacheEntry.objects.filter(pk__in=list(oldest)).delete()
+
+
+def stats() -> dict:
+    with _stats_lock:
+        counters = dict(_stats)
+    counters['entries'] = EvaluationCacheEntry.objects.count()
+    lookups = counters['hits'] + counters['misses']
+    counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else 0.0
+    return counters
+
+
+def clear():
+    EvaluationCacheEntry.objects.all().delete()
@@ -0,0 +1,210 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import evaluators
+from .models import EvaluationJob
+from .openai_service import EvaluatorBusyError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_sweeper = None
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EVALUATION_WORKERS,
+                thread_name_prefix='evaluation',
+            )
+        return _executor
+
+
+def _wake():
+    _get_executor().submit(_drain_in_thread)
+
+
+def _wake_after(seconds):
+    # The in-process pool only runs when woken, so deferred jobs need a timer to be retried.
+    if settings.EVALUATION_WORKERS > 0:
+        timer = threading.Timer(seconds, _wake)
+        timer.daemon = True
+        timer.start()
+
+
+def start_sweeper():
+    """Start the process's sweeper thread, once: it wakes the pool now and then every
+    EVALUATION_SWEEP_INTERVAL seconds.
+
+    Submissions and retry timers only wake the pool of the process that made them, so after a
+    restart nothing else would pick up jobs that were pending, waiting on ``not_before``, or
+    left ``running`` by a killed worker (claimable again after EVALUATION_JOB_TIMEOUT).
+    """
+    global _sweeper
+    if settings.EVALUATION_WORKERS <= 0 or settings.EVALUATION_SWEEP_INTERVAL <= 0:
+        return None
+    with _executor_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep, name='evaluation-sweeper', daemon=True)
+            _sweeper.start()
+        return _sweeper
+
+
+def _sweep():
+    while True:
+        _wake()
+        time.sleep(settings.EVALUATION_SWEEP_INTERVAL)
+
+
+def enqueue_evaluation(answer):
+    """Create a pending job for ``answer`` and wake the in-process pool once committed."""
+    job = EvaluationJob.objects.create(answer=answer)
+    if settings.EVALUATION_WORKERS > 0:
+        transaction.on_commit(_wake)
+    return job
+
+
+def enqueue_evaluations(answers):
+    """Queue ``answers`` as one batch: a worker claims them together and makes one batched call."""
+    batch = uuid.uuid4()
+    jobs = EvaluationJob.objects.bulk_create([EvaluationJob(answer=answer, batch=batch) for answer in answers])
+    if settings.EVALUATION_WORKERS > 0:
+        transaction.on_commit(_wake)
+    return jobs
+
+
+def claim_next_jobs():
+    """Atomically move the oldest runnable job, plus the runnable jobs of its batch, to ``running``.
+
+    Returns the claimed jobs in queue order (empty when there is nothing to do).
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.EVALUATION_JOB_TIMEOUT)
+    runnable = (
+        Q(status='pending', not_before__isnull=True)
+        | Q(status='pending', not_before__lte=now)
+        | Q(status='running', started_at__lt=stale_before)
+    )
+    with transaction.atomic():
+        jobs = EvaluationJob.objects.select_for_update(skip_locked=True).filter(runnable).order_by('created_at', 'id')
+        job = jobs.first()
+        if job is None:
+            return []
+        candidates = list(jobs.filter(batch=job.batch)) if job.batch is not None else [job]
+        # The conditional update keeps the claim safe on backends without row locks.
+        claimed = [
+            candidate.pk for candidate in candidates
+            if EvaluationJob.objects.filter(pk=candidate.pk, status=candidate.status, attempts=candidate.attempts).update(
+                status='running',
+                started_at=now,
+                attempts=candidate.attempts + 1,
+            )
+        ]
+    return list(EvaluationJob.objects.select_related('answer__question').filter(pk__in=claimed).order_by('created_at', 'id'))
+
+
+def retry_delay(attempts):
+    """Seconds to wait before retrying a job that has failed ``attempts`` times (doubling)."""
+    return settings.EVALUATION_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def _requeue_busy(job):
+    # Saturation is not the answer's fault: requeue without using up an attempt, but not
+    # claimable at once, or the worker would spin on the same job while the limiter is full.
+    job.status = 'pending'
+    job.attempts -= 1
+    job.not_before = timezone.now() + timedelta(seconds=settings.EVALUATION_BUSY_RETRY_DELAY)
+    job.save(update_fields=['status', 'attempts', 'not_before'])
+
+
+def _record_failure(job, error):
+    job.error = str(error) or error.__class__.__name__
+    if job.attempts >= settings.EVALUATION_MAX_ATTEMPTS:
+        job.status = 'failed'
+        job.finished_at = timezone.now()
+    else:
+        delay = retry_delay(job.attempts)
+        job.status = 'pending'
+        job.not_before = timezone.now() + timedelta(seconds=delay)
+        _wake_after(delay)
+    job.save(update_fields=['status', 'error', 'finished_at', 'not_before'])
+
+
+def _record_result(job, evaluation):
+    answer = job.answer
+    with transaction.atomic():
+        answer.strengths = evaluation['strengths']
+        answer.weaknesses = evaluation['weaknesses']
+        answer.score = evaluation['score']
+        answer.evaluation_tier = evaluation['tier']
+        answer.evaluation_ms = evaluation['evaluation_ms']
+        answer.save(update_fields=['strengths', 'weaknesses', 'score', 'evaluation_tier', 'evaluation_ms', 'updated_at'])
+        job.status = 'done'
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+def run_jobs(jobs):
+    """Evaluate claimed jobs (one batched call for several) and record the outcome on each.
+
+    Returns False if the evaluator was saturated and the jobs were put back, else True.
+    """
+    items = [(job.answer.question, job.answer.answer) for job in jobs]
+    try:
+        if len(items) == 1:
+            evaluations = [evaluators.evaluate(*items[0])]
+        else:
+            evaluations = evaluators.evaluate_batch(items)
+    except EvaluatorBusyError:
+        for job in jobs:
+            _requeue_busy(job)
+        _wake_after(settings.EVALUATION_BUSY_RETRY_DELAY)
+        return False
+    except Exception as e:
+        # Any failure (bad model output, network, a bug) must release the jobs, or they would sit
+        # in ``running`` until EVALUATION_JOB_TIMEOUT and take the worker thread down with them.
+        logger.warning('Evaluation job(s) %s failed: %s', [job.pk for job in jobs], e, exc_info=not isinstance(e, ValueError))
+        for job in jobs:
+            _record_failure(job, e)
+        return True
+
+    for job, evaluation in zip(jobs, evaluations):
+        _record_result(job, evaluation)
+    return True
+
+
+def drain(max_jobs=None):
+    """Run jobs until the queue is empty (or ``max_jobs`` have run). Returns the count.
+
+    Stops early when the evaluator is saturated: the next jobs would only hit the same limit.
+    """
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        jobs = claim_next_jobs()
+        if not jobs or not run_jobs(jobs):
+            break
+        processed += len(jobs)
+    return processed
+
+
+def _drain_in_thread():
+    close_old_connections()
+    try:
+        drain()
+    except Exception:
+        logger.exception('Evaluation worker crashed')
+    finally:
+        connection.close()
@@ -0,0 +1,368 @@
+"""Evaluator backends and the registry that picks one per question.
+
+Every backend returns the same {"score", "strengths", "weaknesses"} dict as
+openai_service.evaluate_answer; the registry functions add "tier" (which model or rule
+produced it, see TIERS) and "evaluation_ms" (how long it took). EVALUATOR_BACKEND selects the default backend,
+EVALUATOR_BACKENDS_BY_CATEGORY overrides it per question category, and
+EVALUATOR_FALLBACK_BACKEND takes over when the chosen backend is unavailable. After a
+fallback the primary is skipped for EVALUATOR_FALLBACK_COOLDOWN seconds, so requests
+during an outage don't each wait out the upstream timeout first.
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import openai_service
+from .openai_service import EvaluatorUnavailableError
+
+
+logger = logging.getLogger(__name__)
+
+TIERS = ('rules', 'screen', 'full', 'heuristic', 'cache')
+
+
+class Evaluator:
+    name = None
+    # Reported as the answer's evaluation_tier unless the result sets its own "tier".
+    tier = None
+
+    def evaluate(self, question_obj, answer_text: str) -> dict:
+        raise NotImplementedError
+
+    def evaluate_batch(self, items) -> list:
+        return [self.evaluate(question_obj, answer_text) for question_obj, answer_text in items]
+
+    async def stream(self, question_obj, answer_text: str):
+        """Yield items in the openai_service.stream_evaluation format."""
+        evaluation = await sync_to_async(self.evaluate)(question_obj, answer_text)
+        for field in ('strengths', 'weaknesses'):
+            for item in evaluation[field]:
+                yield field, item
+        yield 'result', evaluation
+
+
+class OpenAIEvaluator(Evaluator):
+    name = 'openai'
+    tier = 'full'
+
+    def evaluate(self, question_obj, answer_text):
+        return openai_service.evaluate_answer(question_obj, answer_text)
+
+    def evaluate_batch(self, items):
+        return openai_service.evaluate_answers_batch(items)
+
+    async def stream(self, question_obj, answer_text):
+        async for item in openai_service.stream_evaluation(question_obj, answer_text):
+            yield item
+
+
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
+SENTENCE_RE = re.compile(r'[.!?]+(?:\s|$)')
+STOPWORDS = frozenset(
+    'a about an and are as at be but by can do does for from how i if in is it me of on or '
+    'our so that the their them they this to was we what when where which who why will with '
+    'would you your'.split()
+)
+STRUCTURE_MARKERS = frozenset(
+    'first second third then next finally because therefore however so overall result '
+    'firstly secondly lastly conclusion'.split()
+)
+EXAMPLE_MARKERS = ('for example', 'for instance', 'such as', 'when i', 'in my', 'i led', 'i worked')
+FILLER_WORDS = frozenset('um uh like basically literally stuff things kinda gonna'.split())
+
+
+class HeuristicEvaluator(Evaluator):
+    """In-process scorer built from surface features of the answer.
+
+    Mirrors the four rubric sections in openai_service.RUBRIC with cheap proxies: overlap
+    with the question's key terms (accuracy), length and examples (depth), sentence and
+    signposting structure (clarity) and filler/sentence length (communication). It is far
+    less accurate than the LLM and is meant as a degraded mode, not a replacement.
+    """
+
+    name = 'heuristic'
+    tier = 'heuristic'
+
+    def evaluate(self, question_obj, answer_text):
+        text = answer_text.strip()
+        lowered = text.lower()
+        words = [word.lower() for word in WORD_RE.findall(text)]
+        word_count = len(words)
+        if not word_count:
+            return {'score': 0, 'strengths': [], 'weaknesses': ['The answer is empty.']}
+        sentences = max(1, len(SENTENCE_RE.findall(text)))
+        unique_ratio = len(set(words)) / word_count
+
+        key_terms = {word for word in map(str.lower, WORD_RE.findall(question_obj.question))} - STOPWORDS
+        covered = key_terms & set(words)
+        relevance = len(covered) / len(key_terms) if key_terms else 0.5
+        examples = sum(marker in lowered for marker in EXAMPLE_MARKERS)
+        has_numbers = any(char.isdigit() for char in text)
+        markers = sum(word in STRUCTURE_MARKERS for word in words)
+        fillers = sum(word in FILLER_WORDS for word in words)
+        words_per_sentence = word_count / sentences
+
+        accuracy = 30 * min(1.0, 0.3 + relevance) * min(1.0, word_count / 40)
+        depth = 25 * min(1.0, word_count / 150) * (0.6 + 0.2 * min(examples, 1) + 0.2 * has_numbers)
+        clarity = 25 * (0.4 * min(1.0, sentences / 4) + 0.4 * min(1.0, markers / 3) + 0.2 * min(1.0, unique_ratio / 0.5))
+        communication = 20 * max(0.0, 1.0 - fillers / max(10, word_count / 10)) * (0.5 if words_per_sentence > 40 else 1.0)
+        score = max(0, min(100, round(accuracy + depth + clarity + communication)))
+
+        strengths, weaknesses = [], []
+        if relevance >= 0.5:
+            strengths.append('Addresses the key terms of the question directly.')
+        else:
+            weaknesses.append('Engage more directly with what the question asks.')
+        if word_count >= 150:
+            strengths.append('Gives a detailed, well-developed answer.')
+        elif word_count < 60:
+            weaknesses.append('Too brief; expand with more explanation and context.')
+        if examples or has_numbers:
+            strengths.append('Supports the answer with concrete examples or figures.')
+        else:
+            weaknesses.append('Add a specific example or quantify the impact.')
+        if markers >= 2:
+            strengths.append('Uses clear signposting to structure the answer.')
+        else:
+            weaknesses.append('Structure the answer with clear steps or signposting.')
+        if fillers > 2:
+            weaknesses.append('Cut filler words to sound more professional.')
+        if words_per_sentence > 40:
+            weaknesses.append('Break long sentences up so the answer is easier to follow.')
+        if unique_ratio < 0.3:
+            weaknesses.append('Avoid repeating the same points.')
+        return {'score': score, 'strengths': strengths, 'weaknesses': weaknesses}
+
+
+def _rule_result(weakness):
+    return {'score': 0, 'strengths': [], 'weaknesses': [weakness], 'tier': 'rules'}
+
+
+def prescreen(question_obj, answer_text: str):
+    """Return a rule-based evaluation for answers not worth sending to a model, else None.
+
+    Catches empty or near-empty transcripts, non-English speech, and answers that are mostly
+    repetition or speech-recognition garbage.
+    """
+    words = [word.lower() for word in WORD_RE.findall(answer_text)]
+    if len(words) < settings.EVALUATION_MIN_WORDS:
+        return _rule_result('The answer is too short to evaluate. Give a complete spoken answer.')
+
+    letters = [char for char in answer_text if char.isalpha()]
+    if not letters:
+        # Only reachable when EVALUATION_MIN_WORDS is 0: digits, symbols or nothing at all.
+        return _rule_result('The transcript looks garbled. Try recording the answer again.')
+    ascii_share = sum(char.isascii() for char in letters) / len(letters)
+    stopword_share = sum(word in STOPWORDS for word in words) / len(words) if words else 0.0
+    if ascii_share < 0.5 or (len(words) >= 12 and stopword_share < 0.05):
+        return _rule_result('The answer does not appear to be in English.')
+
+    if len(words) >= 20:
+        trigrams = list(zip(words, words[1:], words[2:]))
+        if len(set(words)) / len(words) < 0.2 or len(set(trigrams)) / len(trigrams) < 0.3:
+            return _rule_result('The answer mostly repeats the same words.')
+
+    garbled = sum(len(word) > 20 or not any(vowel in word for vowel in 'aeiouy') for word in words)
+    if garbled / len(words) > 0.4:
+        return _rule_result('The transcript looks garbled. Try recording the answer again.')
+    return None
+
+
+class TieredEvaluator(Evaluator):
+    """Route each answer to the cheapest tier that can score it.
+
+    ``prescreen`` answers trivially bad input instantly ("rules"). Otherwise
+    OPENAI_SCREEN_MODEL scores it ("screen"), and the answer is escalated to the full model
+    ("full") when the screen is less confident than EVALUATION_ESCALATION_CONFIDENCE, its
+    output could not be parsed, or the question's difficulty is in
+    EVALUATION_ESCALATE_DIFFICULTIES. Cache hits keep the "cache" tier.
+    """
+
+    name = 'tiered'
+
+    def _needs_full_model(self, question_obj):
+        return question_obj.difficulty in settings.EVALUATION_ESCALATE_DIFFICULTIES
+
+    def _screen(self, question_obj, answer_text):
+        """Screen-tier result, or None when the answer should be escalated."""
+        try:
+            evaluation = openai_service.screen_answer(question_obj, answer_text)
+        except EvaluatorUnavailableError:
+            raise
+        except ValueError as e:
+            logger.warning('Screen model output unusable, escalating: %s', e)
+            return None
+        if evaluation.get('confidence', 0) < settings.EVALUATION_ESCALATION_CONFIDENCE:
+            return None
+        result = {key: evaluation[key] for key in ('score', 'strengths', 'weaknesses')}
+        result['tier'] = evaluation.get('tier', 'screen')
+        return result
+
+    def evaluate(self, question_obj, answer_text):
+        evaluation = prescreen(question_obj, answer_text)
+        if evaluation is None and not self._needs_full_model(question_obj):
+            evaluation = self._screen(question_obj, answer_text)
+        if evaluation is None:
+            evaluation = {'tier': 'full', **openai_service.evaluate_answer(question_obj, answer_text)}
+        return evaluation
+
+    def evaluate_batch(self, items):
+        """Rule-based results where possible; the rest go to the full model in one batch
+        request, since the batch prompt has no confidence signal to escalate on."""
+        results = [prescreen(question_obj, answer_text) for question_obj, answer_text in items]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            evaluations = openai_service.evaluate_answers_batch([items[i] for i in pending])
+            for i, evaluation in zip(pending, evaluations):
+                results[i] = {'tier': 'full', **evaluation}
+        return results
+
+    async def stream(self, question_obj, answer_text):
+        evaluation = prescreen(question_obj, answer_text)
+        if evaluation is None and not self._needs_full_model(question_obj):
+            evaluation = await sync_to_async(self._screen)(question_obj, answer_text)
+        if evaluation is not None:
+            for field in ('strengths', 'weaknesses'):
+                for item in evaluation[field]:
+                    yield field, item
+            yield 'result', evaluation
+            return
+        async for field, value in openai_service.stream_evaluation(question_obj, answer_text):
+            yield field, ({'tier': 'full', **value} if field == 'result' else value)
+
+
+EVALUATORS = {
+    OpenAIEvaluator.name: OpenAIEvaluator,
+    HeuristicEvaluator.name: HeuristicEvaluator,
+    TieredEvaluator.name: TieredEvaluator,
+}
+
+_instances = {}
+_skip_until = {}
+_lock = threading.Lock()
+
+
+def register(evaluator_class):
+    """Make an Evaluator subclass selectable by its ``name`` in settings."""
+    EVALUATORS[evaluator_class.name] = evaluator_class
+    return evaluator_class
+
+
+def get_evaluator(name: str) -> Evaluator:
+    with _lock:
+        if name not in _instances:
+            try:
+                _instances[name] = EVALUATORS[name]()
+            except KeyError:
+                raise ValueError(f'Unknown evaluator backend {name!r}.') from None
+        return _instances[name]
+
+
+def evaluator_for(question_obj) -> Evaluator:
+    name = settings.EVALUATOR_BACKENDS_BY_CATEGORY.get(question_obj.category, settings.EVALUATOR_BACKEND)
+    return get_evaluator(name)
+
+
+def _fallback_for(evaluator):
+    name = settings.EVALUATOR_FALLBACK_BACKEND
+    if not name or name == evaluator.name:
+        return None
+    return get_evaluator(name)
+
+
+def _is_skipped(evaluator):
+    return _skip_until.get(evaluator.name, 0) > time.monotonic()
+
+
+def _fall_back(evaluator, fallback, error):
+    logger.warning('Evaluator %r unavailable, using %r for %ss: %s',
+                   evaluator.name, fallback.name, settings.EVALUATOR_FALLBACK_COOLDOWN, error)
+    _skip_until[evaluator.name] = time.monotonic() + settings.EVALUATOR_FALLBACK_COOLDOWN
+
+
+def _annotate(evaluation, evaluator, elapsed_ms):
+    evaluation.setdefault('tier', evaluator.tier)
+    evaluation['evaluation_ms'] = elapsed_ms
+    return evaluation
+
+
+@contextmanager
+def _timer():
+    start = time.perf_counter()
+    elapsed = {}
+    yield elapsed
+    elapsed['ms'] = round((time.perf_counter() - start) * 1000)
+
+
+def evaluate(question_obj, answer_text: str) -> dict:
+    """Evaluate with the question's backend, falling back if it is unavailable."""
+    evaluator = evaluator_for(question_obj)
+    fallback = _fallback_for(evaluator)
+    with _timer() as elapsed:
+        if fallback is not None and _is_skipped(evaluator):
+            evaluator = fallback
+        try:
+            evaluation = evaluator.evaluate(question_obj, answer_text)
+        except EvaluatorUnavailableError as e:
+            if fallback is None or evaluator is fallback:
+                raise
+            _fall_back(evaluator, fallback, e)
+            evaluator = fallback
+            evaluation = evaluator.evaluate(question_obj, answer_text)
+    return _annotate(evaluation, evaluator, elapsed['ms'])
+
+
+def evaluate_batch(items) -> list:
+    """Evaluate (question_obj, answer_text) pairs, one batch per backend, preserving order.
+    Each result's evaluation_ms is the time its whole group took."""
+    groups = {}
+    for position, (question_obj, answer_text) in enumerate(items):
+        groups.setdefault(evaluator_for(question_obj), []).append(position)
+
+    results = [None] * len(items)
+    for evaluator, positions in groups.items():
+        group = [items[position] for position in positions]
+        fallback = _fallback_for(evaluator)
+        with _timer() as elapsed:
+            if fallback is not None and _is_skipped(evaluator):
+                evaluator = fallback
+            try:
+                evaluations = evaluator.evaluate_batch(group)
+            except EvaluatorUnavailableError as e:
+                if fallback is None or evaluator is fallback:
+                    raise
+                _fall_back(evaluator, fallback, e)
+                evaluator = fallback
+                evaluations = evaluator.evaluate_batch(group)
+        for position, evaluation in zip(positions, evaluations):
+            results[position] = _annotate(evaluation, evaluator, elapsed['ms'])
+    return results
+
+
+async def stream(question_obj, answer_text: str):
+    """Stream with the question's backend; falls back only if nothing was sent yet."""
+    evaluator = evaluator_for(question_obj)
+    fallback = _fallback_for(evaluator)
+    if fallback is not None and _is_skipped(evaluator):
+        evaluator = fallback
+    start = time.perf_counter()
+    sent = False
+    try:
+        async for field, value in evaluator.stream(question_obj, answer_text):
+            sent = True
+            if field == 'result':
+                value = _annotate(value, evaluator, round((time.perf_counter() - start) * 1000))
+            yield field, value
+    except EvaluatorUnavailableError as e:
+        if sent or fallback is None or evaluator is fallback:
+            raise
+        _fall_back(evaluator, fallback, e)
+        async for field, value in fallback.stream(question_obj, answer_text):
+            if field == 'result':
+                value = _annotate(value, fallback, round((time.perf_counter() - start) * 1000))
+            yield field, value
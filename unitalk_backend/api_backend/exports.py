@@ -0,0 +1,137 @@
+"""Streaming answer exports (CSV or NDJSON, optionally gzipped) for faculty analysis.
+
+Rows are read in primary-key order, ``chunk_size`` at a time, with ``id > last id`` as the
+cursor, so no server-side cursor is needed (the exports work with DISABLE_SERVER_SIDE_CURSORS
+behind PgBouncer) and each chunk is an index range scan. Each chunk is encoded and handed
+to the caller before the next is fetched, so memory use depends on the chunk size rather
+than on the number of rows exported. ``astream`` is the same stream for ASGI responses,
+which would otherwise read a synchronous iterator to the end before sending anything.
+
+CSV text cells that a spreadsheet would run as a formula (see FORMULA_PREFIXES) are
+prefixed with a single quote; NDJSON is written as stored.
+"""
+import csv
+import io
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import AnswerModel
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Output column -> AnswerModel lookup.
+COLUMNS = {
+    'id': 'id',
+    'created_at': 'created_at',
+    'student_id': 'student_id',
+    'student_username': 'student__username',
+    'question_id': 'question_id',
+    'category': 'question__category',
+    'subcategory': 'question__subcategory',
+    'difficulty': 'question__difficulty',
+    'question': 'question__question',
+    'answer': 'answer',
+    'score': 'score',
+    'strengths': 'strengths',
+    'weaknesses': 'weaknesses',
+    'evaluation_tier': 'evaluation_tier',
+    'evaluation_ms': 'evaluation_ms',
+}
+
+
+# Leading characters that make Excel, LibreOffice or Sheets treat a cell as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def answers(since=None, until=None, category=None, subcategory=None, student_id=None):
+    """Answers to export; ``until`` is exclusive."""
+    queryset = AnswerModel.objects.all()
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+    if category:
+        queryset = queryset.filter(question__category=category)
+    if subcategory:
+        queryset = queryset.filter(question__subcategory=subcategory)
+    if student_id is not None:
+        queryset = queryset.filter(student_id=student_id)
+    return queryset
+
+
+def iter_chunks(queryset, chunk_size=None):
+    """Yield lists of export rows (dicts keyed by COLUMNS), walking the primary key."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('id').values_list(*COLUMNS.values())
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield [dict(zip(COLUMNS, row)) for row in chunk]
+        last_id = chunk[-1][0]
+
+
+def _encode_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(COLUMNS))
+    writer.writeheader()
+    for chunk in chunks:
+        for row in chunk:
+            row['created_at'] = row['created_at'].isoformat()
+            row['strengths'] = json.dumps(row['strengths'])
+            row['weaknesses'] = json.dumps(row['weaknesses'])
+        writer.writerows({column: _csv_cell(value) for column, value in row.items()} for row in chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # A header-only file for an empty export.
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(chunks):
+    for chunk in chunks:
+        yield ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in chunk).encode('utf-8')
+
+
+def gzip_stream(parts):
+    compressor = zlib.compressobj(wbits=31)  # 16 + MAX_WBITS: gzip container
+    for part in parts:
+        compressed = compressor.compress(part)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream(queryset, fmt='csv', compress=False, chunk_size=None):
+    """Yield the encoded export of ``queryset`` as byte strings, one or so per chunk."""
+    encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+    parts = encode(iter_chunks(queryset, chunk_size))
+    return gzip_stream(parts) if compress else parts
+
+
+async def astream(queryset, fmt='csv', compress=False, chunk_size=None):
+    """Async generator over ``stream``: each part, and the chunk query behind it, is produced
+    in its own sync_to_async call, so every part is sent before the next chunk is read."""
+    parts = stream(queryset, fmt, compress, chunk_size)
+    next_part = sync_to_async(next)
+    while (part := await next_part(parts, None)) is not None:
+        yield part
+
+
+def filename(fmt, compress, stamp):
+    return f'answers-{stamp:%Y%m%d-%H%M%S}.{fmt}' + ('.gz' if compress else '')
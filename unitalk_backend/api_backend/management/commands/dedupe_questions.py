@@ -0,0 +1,65 @@
+import numpy as np
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api_backend import progress, question_index
+from api_backend.models import AnswerModel, QuestionModel
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the near-duplicate question index and report groups of near-duplicate questions. '
+        'With --merge, move answers onto the oldest question of each group and delete the rest.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=None, help='Cosine similarity cut-off (default QUESTION_DUPLICATE_THRESHOLD).')
+        parser.add_argument('--merge', action='store_true', help='Keep the oldest question of each group and delete the others.')
+        parser.add_argument('--block-size', type=int, default=256, help='Rows compared per matrix block.')
+
+    def handle(self, *args, **options):
+        threshold = options['threshold'] if options['threshold'] is not None else settings.QUESTION_DUPLICATE_THRESHOLD
+        index = question_index.get_index()
+        index.rebuild()
+        self.stdout.write(f'Indexed {index.size} question(s).')
+
+        # Rows come in id order, so by the time a question is reached it is final whether an
+        # older question already kept it. Only questions not kept by another may keep others:
+        # every duplicate matches its group's kept question directly, never through a chain.
+        kept_by = {}
+        for row_ids, column_ids, similarities in index.similarity_matrix_blocks(options['block_size']):
+            rows, columns = np.nonzero(similarities >= threshold)
+            for row, column in zip(rows, columns):
+                keep, pk = int(row_ids[row]), int(column_ids[column])
+                if pk > keep and keep not in kept_by and pk not in kept_by:
+                    kept_by[pk] = keep
+
+        groups = {}
+        for pk, keep in kept_by.items():
+            groups.setdefault(keep, []).append(pk)
+        if not groups:
+            self.stdout.write(self.style.SUCCESS(f'No near-duplicates at threshold {threshold}.'))
+            return
+
+        texts = dict(QuestionModel.objects.filter(pk__in=[*groups, *kept_by]).values_list('id', 'question'))
+        for keep, duplicates in sorted(groups.items()):
+            self.stdout.write(f'#{keep}: {texts[keep]}')
+            for pk in sorted(duplicates):
+                self.stdout.write(f'  #{pk}: {texts[pk]}')
+        duplicate_ids = [pk for duplicates in groups.values() for pk in duplicates]
+        self.stdout.write(f'{len(groups)} group(s), {len(duplicate_ids)} duplicate question(s).')
+        if not options['merge']:
+            return
+
+        with transaction.atomic():
+            students = set(AnswerModel.objects.filter(question_id__in=duplicate_ids).values_list('student_id', flat=True))
+            for keep, duplicates in groups.items():
+                # Queryset update skips the answer signals; rollups and snapshots are refreshed below.
+                AnswerModel.objects.filter(question_id__in=duplicates).update(question_id=keep)
+            QuestionModel.objects.filter(pk__in=duplicate_ids).delete()
+            progress.invalidate(*students)
+        call_command('rebuild_analytics_rollups', stdout=self.stdout, stderr=self.stderr)
+        index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Merged {len(duplicate_ids)} duplicate question(s).'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api_backend import evaluation_cache
+from api_backend.openai_service import MODEL, RUBRIC
+
+
+class Command(BaseCommand):
+    help = 'Show evaluation cache statistics, or evict/clear cached evaluations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--evict', action='store_true', help='Drop stale, expired and overflow entries.')
+        parser.add_argument('--clear', action='store_true', help='Delete every cached evaluation.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            evaluation_cache.clear()
+        elif options['evict']:
+            evaluation_cache.evict(evaluation_cache.rubric_version(RUBRIC, MODEL))
+        stats = evaluation_cache.stats()
+        self.stdout.write(f"Entries: {stats['entries']}")
+        self.stdout.write(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']}")
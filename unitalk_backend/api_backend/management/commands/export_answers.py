@@ -0,0 +1,67 @@
+import sys
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api_backend import exports
+from api_backend.models import CustomUser
+
+
+def _day(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'Invalid date: {value}')
+    return day
+
+
+class Command(BaseCommand):
+    help = 'Stream answers with their question and student data to a CSV or NDJSON file (or stdout).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help='File to write, or - for stdout.')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--since', type=_day, help='First day to include (YYYY-MM-DD).')
+        parser.add_argument('--until', type=_day, help='Last day to include (YYYY-MM-DD).')
+        parser.add_argument('--category')
+        parser.add_argument('--subcategory')
+        parser.add_argument('--student', help='Student id or username.')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows per query (default EXPORT_CHUNK_SIZE).')
+
+    def handle(self, *args, **options):
+        student_id = None
+        if options['student']:
+            student = CustomUser.objects.filter(user_type='student')
+            student = (
+                student.filter(pk=options['student']) if options['student'].isdigit()
+                else student.filter(username=options['student'])
+            ).first()
+            if student is None:
+                raise CommandError(f'No student {options["student"]!r}.')
+            student_id = student.pk
+
+        def midnight(day):
+            return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+        queryset = exports.answers(
+            since=midnight(options['since']) if options['since'] else None,
+            until=midnight(options['until'] + timedelta(days=1)) if options['until'] else None,
+            category=options['category'],
+            subcategory=options['subcategory'],
+            student_id=student_id,
+        )
+        parts = exports.stream(queryset, options['format'], options['gzip'], options['chunk_size'])
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for part in parts:
+                out.write(part)
+            out.flush()
+            return
+        written = 0
+        with open(options['output'], 'wb') as out:
+            for part in parts:
+                out.write(part)
+                written += len(part)
+        self.stderr.write(f'Wrote {written} bytes to {options["output"]}.')
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_backend import question_import
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-import questions from a CSV, JSON or NDJSON file (or - for stdin). Invalid rows and '
+        'duplicates of existing questions are skipped and reported.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for stdin.')
+        parser.add_argument('--format', choices=question_import.FORMATS, help='Default: from the file extension, else csv.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per bulk insert (default QUESTION_IMPORT_BATCH_SIZE).')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and count duplicates without writing.')
+        parser.add_argument('--max-errors', type=int, default=None, help='Row errors to list (default QUESTION_IMPORT_MAX_ERRORS).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or question_import.detect_format(path)
+        try:
+            if path == '-':
+                report = self._import(sys.stdin.buffer, fmt, options)
+            else:
+                with open(path, 'rb') as source:
+                    report = self._import(source, fmt, options)
+        except OSError as e:
+            raise CommandError(str(e))
+        except question_import.ImportFormatError as e:
+            raise CommandError(str(e))
+
+        for item in report['errors']:
+            errors = '; '.join(f'{field}: {message}' for field, message in item['errors'].items())
+            self.stderr.write(f'Row {item["row"]}: {errors}')
+        verb = 'Would create' if report['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {report["created"]} question(s) from {report["rows"]} row(s); '
+            f'{report["duplicates"]} duplicate(s), {report["invalid"]} invalid.'
+        ))
+
+    def _import(self, source, fmt, options):
+        return question_import.import_questions(
+            question_import.read_rows(source, fmt),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            max_errors=options['max_errors'],
+        )
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.management.base import BaseCommand, CommandError
+
+from api_backend.cv_storage import CHUNK_SIZE
+from api_backend.models import CV
+
+
+def _stored_checksum(cv):
+    digest = hashlib.sha256()
+    with cv.pdf.storage.open(cv.pdf.name, 'rb') as stored:
+        for chunk in iter(lambda: stored.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy CVs still held in the legacy pdf_base64 column into the cvs storage backend and '
+        'verify each copy by reading it back. With --clear-legacy, blank pdf_base64 for CVs whose '
+        'stored copy verified. Safe to re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear-legacy', action='store_true', help='Blank pdf_base64 once the stored copy verifies.')
+        parser.add_argument(
+            '--allow-local-storage', action='store_true',
+            help='Run even though the cvs backend is local disk (only if that disk is persistent).',
+        )
+
+    def handle(self, *args, **options):
+        storage = storages['cvs']
+        if isinstance(storage, FileSystemStorage) and not options['allow_local_storage']:
+            raise CommandError(
+                f'The cvs storage is local disk ({storage.location}), which is wiped on redeploy on hosts '
+                'such as Render. Set CV_STORAGE_BACKEND (see settings.py) or pass --allow-local-storage '
+                'if this disk is persistent.'
+            )
+
+        moved = verified = cleared = failed = 0
+        for pk in CV.objects.exclude(pdf_base64='').values_list('pk', flat=True).iterator():
+            # One blob in memory at a time.
+            cv = CV.objects.with_blob().get(pk=pk)
+            if not cv.pdf:
+                pdf_bytes = base64.b64decode(cv.pdf_base64)
+                cv.pdf.save(f'{cv.student_id}.pdf', ContentFile(pdf_bytes), save=False)
+                cv.checksum = hashlib.sha256(pdf_bytes).hexdigest()
+                cv.size_bytes = len(pdf_bytes)
+                cv.has_pdf = True
+                cv.save(update_fields=['pdf', 'checksum', 'size_bytes', 'has_pdf'])
+                moved += 1
+            # Otherwise a newer upload already replaced the legacy blob; check that file instead.
+            if _stored_checksum(cv) != cv.checksum:
+                failed += 1
+                self.stderr.write(f'CV {cv.pk}: stored copy {cv.pdf.name} does not match its checksum; kept pdf_base64.')
+                continue
+            verified += 1
+            if options['clear_legacy']:
+                CV.objects.filter(pk=cv.pk).update(pdf_base64='')
+                cleared += 1
+
+        self.stdout.write(f'Moved {moved}, verified {verified}, cleared {cleared}, failed {failed}.')
+        if failed:
+            raise CommandError(f'{failed} CV(s) failed verification.')
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api_backend import rollups
+from api_backend.models import AnswerRollup, StudentAnswerRollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the faculty analytics rollup tables from AnswerModel and verify them. '
+        'Run after bulk edits that bypass model signals, such as changing a question category.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify-only', action='store_true', help='Compare the rollups with the raw data without rebuilding.')
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            with transaction.atomic():
+                buckets, students = rollups.expected_rollups()
+                AnswerRollup.objects.all().delete()
+                StudentAnswerRollup.objects.all().delete()
+                AnswerRollup.objects.bulk_create([
+                    AnswerRollup(
+                        category=category,
+                        subcategory=subcategory,
+                        difficulty=difficulty,
+                        day=day,
+                        score_sum=score_sum,
+                        answer_count=answer_count,
+                    )
+                    for (category, subcategory, difficulty, day), (score_sum, answer_count) in buckets.items()
+                ], batch_size=1000)
+                StudentAnswerRollup.objects.bulk_create([
+                    StudentAnswerRollup(student_id=student_id, answer_count=answer_count)
+                    for student_id, answer_count in students.items()
+                ], batch_size=1000)
+            self.stdout.write(f'Rebuilt {len(buckets)} bucket(s) and {len(students)} student row(s).')
+
+        expected_buckets, expected_students = rollups.expected_rollups()
+        stored_buckets, stored_students = rollups.stored_rollups()
+        mismatches = [
+            key for key in expected_buckets.keys() | stored_buckets.keys()
+            if expected_buckets.get(key) != stored_buckets.get(key)
+        ]
+        student_mismatches = [
+            key for key in expected_students.keys() | stored_students.keys()
+            if expected_students.get(key) != stored_students.get(key)
+        ]
+        for key in mismatches:
+            self.stderr.write(f'Bucket {key}: expected {expected_buckets.get(key)}, stored {stored_buckets.get(key)}')
+        for key in student_mismatches:
+            self.stderr.write(f'Student {key}: expected {expected_students.get(key)}, stored {stored_students.get(key)}')
+        if mismatches or student_mismatches:
+            raise CommandError(f'{len(mismatches)} bucket(s) and {len(student_mismatches)} student row(s) do not match.')
+        self.stdout.write(self.style.SUCCESS('Rollups match the raw answer data.'))
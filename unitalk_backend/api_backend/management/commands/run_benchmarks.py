@@ -0,0 +1,101 @@
+import json
+import platform
+import subprocess
+import warnings
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from api_backend import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every route in api_backend/urls.py against the seed_benchmark_data fixtures, '
+        'with a fake evaluator in place of OpenAI. Reports p50/p95/p99 latency, throughput and '
+        'query counts, writes them as JSON and optionally compares them with an earlier run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Client threads per endpoint.')
+        parser.add_argument('--evaluator-latency', type=float, default=300, help='Fake evaluator latency in ms.')
+        parser.add_argument('--evaluator-jitter', type=float, default=0, help='Random +/- jitter on that latency in ms.')
+        parser.add_argument('--endpoint', action='append', default=[], help='Only run scenarios whose name contains this text.')
+        parser.add_argument('--output', default='benchmark-results.json', help='Where to write the JSON results.')
+        parser.add_argument('--compare', help='Earlier results file; exit non-zero on regressions.')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 slowdown before it counts as a regression.')
+        parser.add_argument('--keep-rate-limits', action='store_true', help='Leave RATE_LIMITS on (most scenarios will then see 429s).')
+        benchmarks.add_safety_argument(parser)
+
+    def handle(self, *args, **options):
+        benchmarks.refuse_unsafe_target(options['not_prod'])
+        uncovered = benchmarks.uncovered_routes()
+        for route in uncovered:
+            self.stderr.write(self.style.WARNING(f'No benchmark scenario for route {route!r}.'))
+        scenarios = [
+            scenario for scenario in benchmarks.SCENARIOS
+            if not options['endpoint'] or any(text in scenario.name for text in options['endpoint'])
+        ]
+
+        results = {}
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if not options['keep_rate_limits']:
+            overrides['RATE_LIMITS'] = {}
+        # The test client talks to 'testserver'. It is synchronous, so async bodies (SSE, exports) are
+        # consumed synchronously on purpose; any other warning is still shown.
+        with override_settings(**overrides), warnings.catch_warnings(), benchmarks.local_cv_storage():
+            warnings.filterwarnings('ignore', message='StreamingHttpResponse must consume asynchronous iterators')
+            with benchmarks.fake_evaluator(options['evaluator_latency'] / 1000, options['evaluator_jitter'] / 1000):
+                try:
+                    fixtures = benchmarks.Fixtures()
+                except LookupError as e:
+                    raise CommandError(str(e))
+                for scenario in scenarios:
+                    result = benchmarks.run_scenario(scenario, fixtures, options['iterations'], options['concurrency'])
+                    results[scenario.name] = result
+                    self.stdout.write(
+                        f'{scenario.name:<60} {result["status"]:>3}  p50 {result["p50_ms"]:>8.1f}  '
+                        f'p95 {result["p95_ms"]:>8.1f}  p99 {result["p99_ms"]:>8.1f} ms  '
+                        f'{result["throughput_rps"]:>7.1f} req/s  {result["queries"]:>3} queries'
+                    )
+
+        report = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'commit': self._commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'iterations': options['iterations'],
+                'concurrency': options['concurrency'],
+                'evaluator_latency_ms': options['evaluator_latency'],
+                'uncovered_routes': uncovered,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f'Wrote {options["output"]}.')
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+            regressions = benchmarks.compare(results, baseline, options['threshold'])
+            for message in regressions:
+                self.stderr.write(message)
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}.')
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}.'))
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
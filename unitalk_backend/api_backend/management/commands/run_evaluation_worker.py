@@ -0,0 +1,35 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from api_backend.evaluation_jobs import drain
+
+
+class Command(BaseCommand):
+    help = 'Process pending answer evaluations from the EvaluationJob table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Number of concurrent worker threads.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                processed = sum(pool.map(lambda _: self._drain(), range(threads)))
+                if processed:
+                    self.stdout.write(f'Processed {processed} evaluation job(s).')
+                if options['once']:
+                    return
+                if not processed:
+                    time.sleep(options['poll_interval'])
+
+    def _drain(self):
+        close_old_connections()
+        try:
+            return drain()
+        finally:
+            connection.close()
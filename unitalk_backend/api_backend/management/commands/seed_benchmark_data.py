@@ -0,0 +1,135 @@
+import random
+from datetime import time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from api_backend import benchmarks, signals
+from api_backend.benchmarks import BENCH_PREFIX, BENCH_QUESTION_PREFIX, BENCH_WORKING_HOURS, Fixtures
+from api_backend.models import AnswerModel, Appointment, CustomUser, FacultyAvailability, QuestionModel, question_text_hash
+
+STRENGTHS = ['Clear structure', 'Good use of numbers', 'Relevant example', 'Concise delivery']
+WEAKNESSES = ['Too generic', 'Missed the key driver', 'No conclusion', 'Could quantify the impact']
+
+
+class Command(BaseCommand):
+    help = (
+        'Create synthetic benchmark data: users prefixed with "bench_", questions prefixed with '
+        '"[bench] ", scored answers spread over the last --days days, appointments and CVs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10000)
+        parser.add_argument('--faculty', type=int, default=50)
+        parser.add_argument('--questions', type=int, default=5000)
+        parser.add_argument('--answers', type=int, default=100000)
+        parser.add_argument('--appointments', type=int, default=2000)
+        parser.add_argument('--cvs', type=int, default=100, help='Number of students given a CV file.')
+        parser.add_argument('--days', type=int, default=180)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible data.')
+        parser.add_argument('--clear', action='store_true', help='Delete existing benchmark data first.')
+        benchmarks.add_safety_argument(parser)
+
+    def handle(self, *args, **options):
+        benchmarks.refuse_unsafe_target(options['not_prod'])
+        with benchmarks.local_cv_storage():
+            self.seed(options)
+
+    def seed(self, options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        if options['clear']:
+            self.clear()
+
+        password = make_password('bench-password')
+        with transaction.atomic():
+            CustomUser.objects.bulk_create([
+                CustomUser(username=f'{BENCH_PREFIX}{kind}_{i}', user_type=kind, password=password)
+                for kind, count in (('student', options['students']), ('faculty', options['faculty']))
+                for i in range(count)
+            ], batch_size=batch_size, ignore_conflicts=True)
+            students = list(CustomUser.objects.filter(username__startswith=f'{BENCH_PREFIX}student_').values_list('id', flat=True))
+            faculty = list(CustomUser.objects.filter(username__startswith=f'{BENCH_PREFIX}faculty_').values_list('id', flat=True))
+            first_hour, last_hour = BENCH_WORKING_HOURS
+            scheduled = set(FacultyAvailability.objects.filter(faculty_id__in=faculty).values_list('faculty_id', flat=True))
+            FacultyAvailability.objects.bulk_create([
+                FacultyAvailability(faculty_id=faculty_id, weekday=weekday, start_time=time(first_hour), end_time=time(last_hour))
+                for faculty_id in faculty if faculty_id not in scheduled
+                for weekday in range(5)
+            ], batch_size=batch_size)
+
+            questions = [
+                QuestionModel(
+                    question=f'{BENCH_QUESTION_PREFIX}{rng.choice(["Walk me through", "How would you value", "Tell me about"])} '
+                             f'case {i}: merger, valuation and market sizing',
+                    difficulty=rng.choice(QuestionModel.DIFFICULTY_CHOICES)[0],
+                    category=rng.choice(QuestionModel.CATEGORY_CHOICES)[0],
+                    subcategory=rng.choice(QuestionModel.SUBCATEGORY_CHOICES)[0],
+                )
+                for i in range(options['questions'])
+            ]
+            for question in questions:
+                question.text_hash = question_text_hash(question.question)
+            questions = QuestionModel.objects.bulk_create(questions, batch_size=batch_size)
+            question_ids = [question.pk for question in questions]
+        self.stdout.write(f'Created {len(students)} student(s), {len(faculty)} faculty and {len(question_ids)} question(s).')
+
+        now = timezone.now()
+        created = 0
+        while created < options['answers']:
+            count = min(batch_size, options['answers'] - created)
+            with transaction.atomic():
+                answers = AnswerModel.objects.bulk_create([
+                    AnswerModel(
+                        question_id=rng.choice(question_ids),
+                        student_id=rng.choice(students),
+                        answer='Synthetic benchmark answer. ' * rng.randint(2, 40),
+                        strengths=rng.sample(STRENGTHS, 2),
+                        weaknesses=rng.sample(WEAKNESSES, 2),
+                        score=rng.randint(20, 100),
+                        evaluation_tier='full',
+                        evaluation_ms=rng.randint(1500, 6000),
+                    )
+                    for _ in range(count)
+                ])
+                # created_at is auto_now_add, so spread the history out afterwards.
+                for answer in answers:
+                    answer.created_at = now - timedelta(seconds=rng.randint(0, options['days'] * 86400))
+                AnswerModel.objects.bulk_update(answers, ['created_at'], batch_size=500)
+            created += count
+            self.stdout.write(f'Created {created}/{options["answers"]} answer(s).')
+
+        Appointment.objects.bulk_create([
+            Appointment(
+                faculty_id=rng.choice(faculty),
+                student_id=rng.choice(students),
+                scheduled_at=now + timedelta(hours=rng.randint(-24 * 30, 24 * 30)),
+                status=rng.choice(Appointment.STATUS_CHOICES)[0],
+            )
+            for _ in range(options['appointments'])
+        ], batch_size=batch_size)
+        for student in CustomUser.objects.filter(pk__in=rng.sample(students, min(options['cvs'], len(students)))):
+            Fixtures.upload_cv(student)
+        self.stdout.write(f'Created {options["appointments"]} appointment(s) and {options["cvs"]} CV(s).')
+
+        # bulk_create and bulk_update skip the rollup signals.
+        call_command('rebuild_analytics_rollups', stdout=self.stdout, stderr=self.stderr)
+
+    def clear(self):
+        bench_users = CustomUser.objects.filter(username__startswith=BENCH_PREFIX)
+        # Answers are rebuilt into the rollups afterwards, so skip the per-row signal work.
+        post_delete.disconnect(signals.update_rollups_on_delete, sender=AnswerModel)
+        try:
+            with transaction.atomic():
+                AnswerModel.objects.filter(student__in=bench_users).delete()
+                QuestionModel.objects.filter(question__startswith=BENCH_QUESTION_PREFIX).delete()
+                bench_users.delete()
+        finally:
+            post_delete.connect(signals.update_rollups_on_delete, sender=AnswerModel)
+        call_command('rebuild_analytics_rollups', stdout=self.stdout, stderr=self.stderr)
+        self.stdout.write('Cleared existing benchmark data.')
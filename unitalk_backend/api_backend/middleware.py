@@ -0,0 +1,173 @@
+import contextvars
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger(__name__)
+
+_current_stats = contextvars.ContextVar('query_budget_stats', default=None)
+
+
+class _RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.connect_ms = 0.0
+
+
+def _count_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_ms += (perf_counter() - start) * 1000
+
+
+def _instrument_connection(conn):
+    """Install the query counter on ``conn`` once; it charges whichever request is current.
+
+    The request's stats travel in a context variable, which asgiref copies into the threads
+    that run sync views and ORM calls under ASGI, so the same wrapper works for both stacks.
+    """
+    if not getattr(conn, '_query_budget_counted', False):
+        conn.execute_wrappers.append(_count_query)
+        conn._query_budget_counted = True
+
+
+@receiver(connection_created)
+def _instrument_new_connection(sender, connection, **kwargs):
+    # Under ASGI each request's sync work runs on a fresh thread with its own connection.
+    _instrument_connection(connection)
+
+
+def _time_connection_setup(backend_class):
+    """Wrap ``get_new_connection`` once per backend class so setup time is charged to the request."""
+    if getattr(backend_class, '_query_budget_timed', False):
+        return
+    get_new_connection = backend_class.get_new_connection
+
+    def timed_get_new_connection(self, conn_params):
+        start = perf_counter()
+        try:
+            return get_new_connection(self, conn_params)
+        finally:
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.connect_ms += (perf_counter() - start) * 1000
+
+    backend_class.get_new_connection = timed_get_new_connection
+    backend_class._query_budget_timed = True
+
+
+class QueryBudgetMiddleware:
+    """Count queries, DB time and connection setup time per request.
+
+    Adds a Server-Timing header (when SERVER_TIMING is on) and logs a warning when a view
+    runs more queries than its budget: the view class's ``query_budget`` attribute if set,
+    otherwise settings.QUERY_BUDGET. Works natively in both the sync and the async stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        _time_connection_setup(type(connections[DEFAULT_DB_ALIAS]))
+        # Connections opened before the middleware was loaded did not pass through the signal.
+        for conn in connections.all(initialized_only=True):
+            _instrument_connection(conn)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        _instrument_connection(connection)
+        stats = _RequestStats()
+        token = _current_stats.set(stats)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self._finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        stats = _RequestStats()
+        token = _current_stats.set(stats)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        return self._finish(request, response, stats, start)
+
+    def _finish(self, request, response, stats, start):
+        total_ms = (perf_counter() - start) * 1000
+
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={stats.db_ms:.1f};desc="{stats.queries} queries", '
+                f'db-connect;dur={stats.connect_ms:.1f}, '
+                f'total;dur={total_ms:.1f}'
+            )
+
+        view_name, budget = getattr(request, '_query_budget', (None, settings.QUERY_BUDGET))
+        if stats.queries > budget:
+            logger.warning(
+                'Query budget exceeded: %s %s (%s) ran %d queries (budget %d, %.1f ms in DB, %.1f ms connecting)',
+                request.method, request.path, view_name or 'unknown view', stats.queries, budget,
+                stats.db_ms, stats.connect_ms,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        name = view_class.__name__ if view_class else getattr(view_func, '__name__', None)
+        budget = getattr(view_class, 'query_budget', None)
+        if budget is None:
+            budget = settings.QUERY_BUDGET
+        request._query_budget = (name, budget)
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that can sit in the async middleware stack.
+
+    WhiteNoise is sync-only, so under ASGI it forced every request through a sync/async thread
+    hop. Here a miss is a dict lookup followed by the async chain, and only requests that
+    really are for static files leave the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
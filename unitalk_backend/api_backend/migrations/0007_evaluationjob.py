@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0006_cv_pdf_base64'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('answer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_job', to='api_backend.answermodel')),
+            ],
+            options={
+                'verbose_name': 'Evaluation Job',
+                'verbose_name_plural': 'Evaluation Jobs',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='api_backend_status_d687b8_idx')],
+            },
+        ),
+    ]
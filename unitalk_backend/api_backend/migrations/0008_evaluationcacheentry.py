@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0007_evaluationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('rubric_version', models.CharField(db_index=True, max_length=16)),
+                ('result', models.JSONField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Evaluation Cache Entry',
+                'verbose_name_plural': 'Evaluation Cache Entries',
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_rollups(apps, schema_editor):
+    AnswerModel = apps.get_model('api_backend', 'AnswerModel')
+    AnswerRollup = apps.get_model('api_backend', 'AnswerRollup')
+    StudentAnswerRollup = apps.get_model('api_backend', 'StudentAnswerRollup')
+    scored = AnswerModel.objects.filter(score__isnull=False)
+    AnswerRollup.objects.bulk_create([
+        AnswerRollup(
+            category=row['question__category'],
+            subcategory=row['question__subcategory'],
+            difficulty=row['question__difficulty'],
+            day=row['day'],
+            score_sum=row['score_sum'],
+            answer_count=row['answer_count'],
+        )
+        for row in scored.annotate(day=TruncDate('created_at'))
+        .values('question__category', 'question__subcategory', 'question__difficulty', 'day')
+        .annotate(score_sum=Sum('score'), answer_count=Count('id'))
+    ], batch_size=1000)
+    StudentAnswerRollup.objects.bulk_create([
+        StudentAnswerRollup(student_id=row['student_id'], answer_count=row['answer_count'])
+        for row in scored.filter(student__isnull=False).values('student_id').annotate(answer_count=Count('id'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0008_evaluationcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=30)),
+                ('subcategory', models.CharField(max_length=20)),
+                ('difficulty', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Answer Rollup',
+                'verbose_name_plural': 'Answer Rollups',
+                'constraints': [models.UniqueConstraint(fields=('category', 'subcategory', 'difficulty', 'day'), name='unique_answer_rollup_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentAnswerRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='answer_rollup', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
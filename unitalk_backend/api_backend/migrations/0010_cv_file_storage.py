@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:38
+
+import api_backend.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0009_answer_rollups'),
+    ]
+
+    # Existing pdf_base64 blobs are left in place: a build-time migration cannot tell whether the
+    # cvs storage is durable. `manage.py move_cvs_to_storage` copies and verifies them explicitly.
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='checksum',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the PDF, used as its ETag', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='cv',
+            name='pdf',
+            field=models.FileField(blank=True, max_length=255, storage=api_backend.models.cv_storage, upload_to=api_backend.models.cv_upload_to),
+        ),
+    ]
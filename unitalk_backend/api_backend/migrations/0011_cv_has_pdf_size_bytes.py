@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:39
+
+from django.db import migrations, models
+
+
+def backfill_pdf_metadata(apps, schema_editor):
+    CV = apps.get_model('api_backend', 'CV')
+    for cv in CV.objects.exclude(pdf='').only('id', 'pdf').iterator():
+        cv.has_pdf = True
+        cv.size_bytes = cv.pdf.size if cv.pdf.storage.exists(cv.pdf.name) else 0
+        cv.save(update_fields=['has_pdf', 'size_bytes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0010_cv_file_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='has_pdf',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='cv',
+            name='size_bytes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_pdf_metadata, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0011_cv_has_pdf_size_bytes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answermodel',
+            index=models.Index(fields=['student', 'created_at', 'id'], name='answer_student_created_idx'),
+        ),
+    ]
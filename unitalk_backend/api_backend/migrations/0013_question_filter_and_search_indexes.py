@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:41
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+SEARCH_INDEXES = [
+    (
+        'question_search_idx',
+        "CREATE INDEX IF NOT EXISTS question_search_idx ON api_backend_questionmodel "
+        "USING GIN (to_tsvector('english', question))",
+    ),
+    (
+        'question_trgm_idx',
+        "CREATE INDEX IF NOT EXISTS question_trgm_idx ON api_backend_questionmodel "
+        "USING GIN (question gin_trgm_ops)",
+    ),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    # Full-text and trigram GIN indexes only exist on PostgreSQL.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, sql in SEARCH_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0012_answer_student_created_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='questionmodel',
+            index=models.Index(fields=['category', 'subcategory', 'difficulty'], name='question_filter_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
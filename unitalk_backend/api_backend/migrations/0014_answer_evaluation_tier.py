@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:50
+
+from django.db import migrations, models
+
+
+def mark_existing_answers_full(apps, schema_editor):
+    # Every answer scored before tiered routing was scored by the full model.
+    AnswerModel = apps.get_model('api_backend', 'AnswerModel')
+    AnswerModel.objects.filter(score__isnull=False).update(evaluation_tier='full')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0013_question_filter_and_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answermodel',
+            name='evaluation_ms',
+            field=models.PositiveIntegerField(blank=True, help_text='Evaluation latency in milliseconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='answermodel',
+            name='evaluation_tier',
+            field=models.CharField(blank=True, default='', help_text='Evaluator tier that produced the score: rules, screen, full or heuristic', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_answers_full, migrations.RunPython.noop),
+    ]
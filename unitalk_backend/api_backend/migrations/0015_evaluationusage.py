@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0014_answer_evaluation_tier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('model', models.CharField(max_length=50)),
+                ('kind', models.CharField(choices=[('single', 'Single'), ('screen', 'Screen'), ('batch', 'Batch'), ('stream', 'Stream')], max_length=10)),
+                ('category', models.CharField(max_length=30)),
+                ('item_count', models.PositiveIntegerField(default=1)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('cached_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Evaluation usage',
+                'verbose_name_plural': 'Evaluation usage',
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-17 20:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0016_ratelimitbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentProgressSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+                ('scored_count', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('best_score', models.IntegerField(blank=True, null=True)),
+                ('worst_score', models.IntegerField(blank=True, null=True)),
+                ('areas', models.JSONField(default=dict)),
+                ('recent_scores', models.JSONField(default=list)),
+                ('weekly_activity', models.JSONField(default=dict)),
+                ('current_streak', models.PositiveIntegerField(default=0)),
+                ('longest_streak', models.PositiveIntegerField(default=0)),
+                ('last_active_day', models.DateField(blank=True, null=True)),
+                ('last_answer_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='progress_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Student Progress Snapshot',
+                'verbose_name_plural': 'Student Progress Snapshots',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0017_studentprogresssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['faculty', 'scheduled_at', 'id'], name='appointment_faculty_sched_idx'),
+        ),
+    ]
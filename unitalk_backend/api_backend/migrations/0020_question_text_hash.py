@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:06
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+
+def hash_existing_questions(apps, schema_editor):
+    # Same normalisation as models.question_text_hash at the time of this migration.
+    QuestionModel = apps.get_model('api_backend', 'QuestionModel')
+    word_re = re.compile(r"[a-z0-9']+")
+    questions = list(QuestionModel.objects.only('id', 'question'))
+    for question in questions:
+        normalized = ' '.join(word_re.findall(question.question.lower()))
+        question.text_hash = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    QuestionModel.objects.bulk_update(questions, ['text_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0019_facultyavailability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionmodel',
+            name='text_hash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(hash_existing_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+import uuid
+
+from django.db import migrations, models
+
+
+def fill_tokens(apps, schema_editor):
+    EvaluationJob = apps.get_model('api_backend', 'EvaluationJob')
+    for job in EvaluationJob.objects.only('pk').iterator():
+        job.token = uuid.uuid4()
+        job.save(update_fields=['token'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0020_question_text_hash'),
+    ]
+
+    operations = [
+        # Added nullable, filled, then made unique, so existing jobs get distinct tokens.
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='token',
+            field=models.UUIDField(null=True, editable=False),
+        ),
+        migrations.RunPython(fill_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='evaluationjob',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, unique=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='evaluationjob',
+            name='not_before',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
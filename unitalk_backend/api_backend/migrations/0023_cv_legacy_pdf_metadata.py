@@ -0,0 +1,30 @@
+import base64
+import hashlib
+
+from django.db import migrations
+
+
+def backfill_legacy_metadata(apps, schema_editor):
+    CV = apps.get_model('api_backend', 'CV')
+    # CVs still held only in pdf_base64 are served from it, so they need the same metadata as
+    # stored files. Load one blob at a time so memory use does not grow with the table.
+    legacy = CV.objects.filter(pdf='').exclude(pdf_base64='')
+    for pk in legacy.values_list('pk', flat=True).iterator():
+        pdf_base64 = CV.objects.filter(pk=pk).values_list('pdf_base64', flat=True).get()
+        pdf_bytes = base64.b64decode(pdf_base64)
+        CV.objects.filter(pk=pk).update(
+            has_pdf=True,
+            size_bytes=len(pdf_bytes),
+            checksum=hashlib.sha256(pdf_bytes).hexdigest(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0022_evaluationjob_batch'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_legacy_metadata, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 21:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_backend', '0023_cv_legacy_pdf_metadata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='answermodel',
+            name='evaluation_tier',
+            field=models.CharField(blank=True, default='', help_text='Evaluator tier that produced the score: rules, screen, full, heuristic or cache', max_length=10),
+        ),
+    ]
@@ -1,6 +1,13 @@
-from django.db import models
+import hashlib
+import re
+import uuid
+from datetime import timedelta
+
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from django.core.files.storage import storages
 
 
 class CustomUser(AbstractUser):
@@ -19,6 +26,18 @@ class CustomUser(AbstractUser):
         return f'{self.username} ({self.user_type})'
 
 
+QUESTION_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize_question_text(text):
+    """Lower-case word tokens only, so case, punctuation and spacing changes compare equal."""
+    return ' '.join(QUESTION_WORD_RE.findall(text.lower()))
+
+
+def question_text_hash(text):
+    return hashlib.sha256(normalize_question_text(text).encode('utf-8')).hexdigest()
+
+
 class QuestionModel(models.Model):
 
     DIFFICULTY_CHOICES = [
@@ -39,13 +58,25 @@ class QuestionModel(models.Model):
     difficulty = models.CharField(max_length=100, choices=DIFFICULTY_CHOICES)
     category = models.CharField(max_length=30, choices=CATEGORY_CHOICES, default='Investment Banking')
     subcategory = models.CharField(max_length=20, choices=SUBCATEGORY_CHOICES, default='Behavioral')
+    # question_text_hash(question), for duplicate checks; bulk_create callers must set it themselves.
+    text_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, editable=False)
 
     def __str__(self):
         return self.question
 
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or 'question' in update_fields:
+            self.text_hash = question_text_hash(self.question)
+            if update_fields is not None:
+                update_fields = {*update_fields, 'text_hash'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         verbose_name = 'Question'
         verbose_name_plural = 'Questions'
+        indexes = [
+            models.Index(fields=['category', 'subcategory', 'difficulty'], name='question_filter_idx'),
+        ]
 
 
 class AnswerModel(models.Model):
@@ -56,6 +87,13 @@ class AnswerModel(models.Model):
     strengths = models.JSONField(default=list, help_text='List of strength items')
     weaknesses = models.JSONField(default=list, help_text='List of weakness items')
     score = models.IntegerField(null=True, blank=True, help_text='AI-evaluated score 0–100')
+    evaluation_tier = models.CharField(
+        max_length=10,
+        blank=True,
+        default='',
+        help_text='Evaluator tier that produced the score: rules, screen, full, heuristic or cache',
+    )
+    evaluation_ms = models.PositiveIntegerField(null=True, blank=True, help_text='Evaluation latency in milliseconds')
     student = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -68,9 +106,40 @@ class AnswerModel(models.Model):
     def __str__(self):
         return self.answer
 
+    def save(self, *args, **kwargs):
+        # Run the post_save progress update in the write's own transaction, so the student row
+        # lock it takes orders it against a concurrent snapshot build (see api_backend.progress).
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'Answer'
         verbose_name_plural = 'Answers'
+        indexes = [
+            models.Index(fields=['student', 'created_at', 'id'], name='answer_student_created_idx'),
+        ]
+
+
+def cv_storage():
+    return storages['cvs']
+
+
+def cv_upload_to(instance, filename):
+    return f'{instance.student_id}/{uuid.uuid4().hex}.pdf'
+
+
+class CVQuerySet(models.QuerySet):
+    def with_pdf(self):
+        return self.filter(has_pdf=True)
+
+    def with_blob(self):
+        """Undo the default deferral when the legacy pdf_base64 column is really needed."""
+        return self.defer(None)
+
+
+class CVManager(models.Manager.from_queryset(CVQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().defer('pdf_base64')
 
 
 class CV(models.Model):
@@ -80,14 +149,64 @@ class CV(models.Model):
         related_name='cv',
         limit_choices_to={'user_type': 'student'},
     )
+    # Legacy inline storage, kept until `manage.py move_cvs_to_storage` has copied it to the
+    # `cvs` storage backend and verified the copy; new uploads go straight to the backend.
     pdf_base64 = models.TextField(blank=True, default='')
+    pdf = models.FileField(storage=cv_storage, upload_to=cv_upload_to, max_length=255, blank=True)
+    checksum = models.CharField(max_length=64, blank=True, default='', help_text='SHA-256 of the PDF, used as its ETag')
     filename = models.CharField(max_length=255, default='cv.pdf')
+    size_bytes = models.PositiveIntegerField(default=0)
+    has_pdf = models.BooleanField(default=False, db_index=True)
     uploaded_at = models.DateTimeField(auto_now=True)
 
+    objects = CVManager()
+
     def __str__(self):
         return f'CV — {self.student.username}'
 
 
+DEFAULT_APPOINTMENT_MINUTES = 30
+# Upper bound on any slot length; overlap checks only look this far back from a new booking.
+MAX_APPOINTMENT_MINUTES = 240
+
+
+class FacultyAvailability(models.Model):
+    """A recurring weekly working-hours window, in the project's TIME_ZONE, split into slots."""
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    faculty = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='availability',
+        limit_choices_to={'user_type': 'faculty'},
+    )
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveSmallIntegerField(
+        default=DEFAULT_APPOINTMENT_MINUTES,
+        validators=[MinValueValidator(5), MaxValueValidator(MAX_APPOINTMENT_MINUTES)],
+    )
+
+    def __str__(self):
+        return f'{self.faculty_id}: {self.get_weekday_display()} {self.start_time}-{self.end_time}'
+
+    class Meta:
+        verbose_name = 'Faculty Availability'
+        verbose_name_plural = 'Faculty Availability'
+        ordering = ['weekday', 'start_time']
+        indexes = [
+            models.Index(fields=['faculty', 'weekday'], name='availability_faculty_day_idx'),
+        ]
+
+
 class Appointment(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -107,6 +226,7 @@ class Appointment(models.Model):
         limit_choices_to={'user_type': 'student'},
     )
     scheduled_at = models.DateTimeField()
+    duration_minutes = models.PositiveSmallIntegerField(default=DEFAULT_APPOINTMENT_MINUTES)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     notes = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -114,6 +234,164 @@ class Appointment(models.Model):
     def __str__(self):
         return f'Appointment: {self.student} with {self.faculty} at {self.scheduled_at}'
 
+    @property
+    def ends_at(self):
+        return self.scheduled_at + timedelta(minutes=self.duration_minutes)
+
     class Meta:
         verbose_name = 'Appointment'
-        verbose_name_plural = 'Appointments'
\ No newline at end of file
+        verbose_name_plural = 'Appointments'
+        indexes = [
+            models.Index(fields=['faculty', 'scheduled_at', 'id'], name='appointment_faculty_sched_idx'),
+        ]
+
+class EvaluationJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    answer = models.OneToOneField(AnswerModel, on_delete=models.CASCADE, related_name='evaluation_job')
+    # Public id for polling; the sequential pk would let anyone enumerate anonymous answers.
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    # Jobs submitted together share a batch and are evaluated in one batched model call.
+    batch = models.UUIDField(null=True, blank=True, db_index=True, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    # A pending job is not claimed again before this time (retry backoff).
+    not_before = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Evaluation job {self.pk} ({self.status})'
+
+    class Meta:
+        verbose_name = 'Evaluation Job'
+        verbose_name_plural = 'Evaluation Jobs'
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+
+class EvaluationCacheEntry(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    rubric_version = models.CharField(max_length=16, db_index=True)
+    result = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'Cached evaluation {self.key[:12]}'
+
+    class Meta:
+        verbose_name = 'Evaluation Cache Entry'
+        verbose_name_plural = 'Evaluation Cache Entries'
+
+
+class RateLimitBucket(models.Model):
+    """Token-bucket state for api_backend.ratelimit.DatabaseBucketStore."""
+    key = models.CharField(max_length=200, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField(db_index=True, help_text='Unix time of the last refill')
+
+    def __str__(self):
+        return self.key
+
+
+class EvaluationUsage(models.Model):
+    """Token usage and latency of one OpenAI evaluation call (one row per category for batches)."""
+    KIND_CHOICES = [
+        ('single', 'Single'),
+        ('screen', 'Screen'),
+        ('batch', 'Batch'),
+        ('stream', 'Stream'),
+    ]
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    model = models.CharField(max_length=50)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    category = models.CharField(max_length=30)
+    item_count = models.PositiveIntegerField(default=1)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    cached_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    latency_ms = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.model} {self.kind} ({self.category})'
+
+    class Meta:
+        verbose_name = 'Evaluation usage'
+        verbose_name_plural = 'Evaluation usage'
+
+
+class AnswerRollup(models.Model):
+    """Running score totals per (category, subcategory, difficulty, day), kept by api_backend.rollups."""
+    category = models.CharField(max_length=30)
+    subcategory = models.CharField(max_length=20)
+    difficulty = models.CharField(max_length=100)
+    day = models.DateField()
+    score_sum = models.BigIntegerField(default=0)
+    answer_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.day} {self.category}/{self.subcategory}/{self.difficulty}: {self.answer_count}'
+
+    class Meta:
+        verbose_name = 'Answer Rollup'
+        verbose_name_plural = 'Answer Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'subcategory', 'difficulty', 'day'],
+                name='unique_answer_rollup_bucket',
+            ),
+        ]
+
+
+class StudentAnswerRollup(models.Model):
+    """Scored answer count per student, used for the distinct-student total."""
+    student = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='answer_rollup',
+    )
+    answer_count = models.PositiveIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f'{self.student_id}: {self.answer_count}'
+
+
+class StudentProgressSnapshot(models.Model):
+    """Precomputed dashboard data for one student, kept by api_backend.progress.
+
+    ``areas`` maps category -> {"count", "sum", "min", "max", "subcategories": {name -> same}}
+    over scored answers; ``recent_scores`` is the newest PROGRESS_TREND_LENGTH scores, oldest
+    first; ``weekly_activity`` maps the ISO date of each week's Monday to an answer count.
+    """
+    student = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='progress_snapshot',
+    )
+    answer_count = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    best_score = models.IntegerField(null=True, blank=True)
+    worst_score = models.IntegerField(null=True, blank=True)
+    areas = models.JSONField(default=dict)
+    recent_scores = models.JSONField(default=list)
+    weekly_activity = models.JSONField(default=dict)
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_day = models.DateField(null=True, blank=True)
+    last_answer_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Progress for {self.student_id}'
+
+    class Meta:
+        verbose_name = 'Student Progress Snapshot'
+        verbose_name_plural = 'Student Progress Snapshots'
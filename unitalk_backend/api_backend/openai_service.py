@@ -1,6 +1,29 @@
+import asyncio
 import json
+import logging
+import random
+import threading
+import time
+
+import httpx
 from django.conf import settings
-from openai import OpenAI, OpenAIError
+from asgiref.sync import sync_to_async
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+    OpenAIError,
+    RateLimitError,
+)
+
+from . import evaluation_cache, usage
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4o"
 
 # Strict, unchanging scoring rubric — never modify these weights.
 RUBRIC = """
@@ -13,39 +36,407 @@ Sum the four category scores for the total (0–100).
 """.strip()
 
 
-def evaluate_answer(question_obj, answer_text: str) -> dict:
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# The static instructions go first, as the system message, so every request shares a
+# byte-identical prefix that OpenAI's automatic prompt caching can reuse. Only the
+# question and answer in the user message vary.
+SYSTEM_PROMPT = f"""You are an expert interview coach. Evaluate the spoken answer to the interview question in the user message.
 
-    prompt = f"""You are an expert interview coach. Evaluate the following spoken answer.
+{RUBRIC}
 
-Question: {question_obj.question}
-Category: {question_obj.category} | Subcategory: {question_obj.subcategory} | Difficulty: {question_obj.difficulty}
-Answer: {answer_text}
+Return a JSON object with exactly these three keys, in this order:
+- "strengths": list of strings (specific things done well)
+- "weaknesses": list of strings (specific areas for improvement)
+- "score": integer from 0 to 100"""
+
+SCREEN_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+Also include "confidence": a number from 0 to 1 saying how sure you are of the score."""
+
+BATCH_SYSTEM_PROMPT = f"""You are an expert interview coach. Evaluate each of the spoken answers in the user message independently.
 
 {RUBRIC}
 
-Return a JSON object with exactly these three keys:
+Return a JSON object with a "results" list containing one entry per item, each with:
+- "id": the item number
 - "score": integer from 0 to 100
 - "strengths": list of strings (specific things done well)
 - "weaknesses": list of strings (specific areas for improvement)"""
 
+
+class EvaluatorBusyError(Exception):
+    """Raised when OPENAI_MAX_CONCURRENCY calls are already in flight in this process."""
+
+
+class EvaluatorUnavailableError(ValueError):
+    """Raised when OpenAI timed out, was unreachable or kept returning 429/5xx after retries."""
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+_inflight = None
+
+
+def get_client() -> OpenAI:
+    """Return the process-wide OpenAI client so its keep-alive connection pool is reused."""
+    global _client, _inflight
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=httpx.Timeout(settings.OPENAI_READ_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+                max_retries=0,  # retries are handled by _create_completion
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.OPENAI_POOL_MAXSIZE,
+                        max_keepalive_connections=settings.OPENAI_POOL_MAXSIZE,
+                        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                    ),
+                ),
+            )
+            _inflight = threading.BoundedSemaphore(settings.OPENAI_MAX_CONCURRENCY)
+        return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Async counterpart of get_client(), used by the streaming endpoint under ASGI."""
+    global _async_client
+    get_client()  # make sure the shared concurrency limiter exists
+    with _client_lock:
+        if _async_client is None:
+            _async_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=httpx.Timeout(settings.OPENAI_READ_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+                max_retries=settings.OPENAI_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.OPENAI_POOL_MAXSIZE,
+                        max_keepalive_connections=settings.OPENAI_POOL_MAXSIZE,
+                        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                    ),
+                ),
+            )
+        return _async_client
+
+
+def _is_retryable(error: OpenAIError) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _openai_failure(message: str, error: OpenAIError) -> ValueError:
+    error_class = EvaluatorUnavailableError if _is_retryable(error) else ValueError
+    return error_class(f"{message}: {error}")
+
+
+async def _acquire_async() -> bool:
+    """The same timed wait as _create_completion's acquire, without blocking the event loop."""
+    deadline = time.monotonic() + settings.OPENAI_QUEUE_TIMEOUT
+    while not _inflight.acquire(blocking=False):
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+def _create_completion(**kwargs):
+    client = get_client()
+    if not _inflight.acquire(timeout=settings.OPENAI_QUEUE_TIMEOUT):
+        raise EvaluatorBusyError("Too many evaluations in progress, please retry shortly.")
+    try:
+        attempt = 0
+        while True:
+            try:
+                return client.chat.completions.create(**kwargs)
+            except OpenAIError as e:
+                if attempt >= settings.OPENAI_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                # Full jitter: sleep a random amount up to the capped exponential delay.
+                delay = random.uniform(0, min(settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * 2 ** attempt))
+                logger.info("Retrying OpenAI call in %.2fs after %s", delay, e)
+                time.sleep(delay)
+                attempt += 1
+    finally:
+        _inflight.release()
+
+
+def evaluate_answer(question_obj, answer_text: str) -> dict:
+    version = evaluation_cache.rubric_version(RUBRIC, MODEL)
+    key = evaluation_cache.cache_key(question_obj, answer_text, RUBRIC, MODEL)
+    cached = evaluation_cache.lookup(key, version)
+    if cached is not None:
+        return cached
+
+    evaluation = _request_evaluation(question_obj, answer_text)
+    evaluation_cache.store(key, version, evaluation)
+    return evaluation
+
+
+def screen_answer(question_obj, answer_text: str) -> dict:
+    """Score with the cheaper OPENAI_SCREEN_MODEL. The result has an extra "confidence" key
+    (0-1) that evaluators.TieredEvaluator uses to decide whether to escalate to MODEL."""
+    model = settings.OPENAI_SCREEN_MODEL
+    # Same version as MODEL's entries so evict() keeps both; the key includes the screen model.
+    version = evaluation_cache.rubric_version(RUBRIC, MODEL)
+    key = evaluation_cache.cache_key(question_obj, answer_text, RUBRIC, f"{model}:screen")
+    cached = evaluation_cache.lookup(key, version)
+    if cached is not None:
+        return cached
+
+    evaluation = _request_evaluation(question_obj, answer_text, model=model, with_confidence=True)
+    evaluation_cache.store(key, version, evaluation)
+    return evaluation
+
+
+def _answer_block(question_obj, answer_text: str) -> str:
+    return f"""Question: {question_obj.question}
+Category: {question_obj.category} | Subcategory: {question_obj.subcategory} | Difficulty: {question_obj.difficulty}
+Answer: {answer_text}"""
+
+
+def _evaluation_messages(system_prompt: str, question_obj, answer_text: str) -> list:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": _answer_block(question_obj, answer_text)},
+    ]
+
+
+def _request_evaluation(question_obj, answer_text: str, model=MODEL, with_confidence=False) -> dict:
+    system_prompt = SCREEN_SYSTEM_PROMPT if with_confidence else SYSTEM_PROMPT
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
+        start = time.perf_counter()
+        response = _create_completion(
+            model=model,
             response_format={"type": "json_object"},
+            messages=_evaluation_messages(system_prompt, question_obj, answer_text),
+        )
+        usage.record(model, "screen" if with_confidence else "single", [question_obj], response.usage, start)
+        result = json.loads(response.choices[0].message.content)
+        evaluation = _clean_evaluation(result)
+        if with_confidence:
+            evaluation["confidence"] = max(0.0, min(1.0, float(result.get("confidence", 0))))
+        return evaluation
+    except OpenAIError as e:
+        raise _openai_failure("OpenAI evaluation failed", e) from e
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Failed to parse OpenAI response: {e}") from e
+
+
+def _clean_evaluation(result: dict) -> dict:
+    score = int(result.get("score", 0))
+    score = max(0, min(100, score))  # clamp to valid range
+    return {
+        "score": score,
+        "strengths": result.get("strengths", []),
+        "weaknesses": result.get("weaknesses", []),
+    }
+
+
+BATCH_RESPONSE_SCHEMA = {
+    "name": "answer_evaluations",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "score": {"type": "integer"},
+                        "strengths": {"type": "array", "items": {"type": "string"}},
+                        "weaknesses": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["id", "score", "strengths", "weaknesses"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["results"],
+        "additionalProperties": False,
+    },
+}
+
+
+def evaluate_answers_batch(items) -> list:
+    """Evaluate a list of (question_obj, answer_text) pairs, returning evaluations in the same order.
+
+    Cached items are served from the evaluation cache; the rest are packed into a single
+    structured-output request. Items missing or malformed in that response are retried one
+    at a time, so a ValueError is only raised if an individual fallback call fails. If OpenAI
+    is unavailable the EvaluatorUnavailableError is raised straight away instead.
+    """
+    version = evaluation_cache.rubric_version(RUBRIC, MODEL)
+    keys = [evaluation_cache.cache_key(q, a, RUBRIC, MODEL) for q, a in items]
+    results = [evaluation_cache.lookup(key, version) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    try:
+        batch = _request_batch_evaluation([items[i] for i in pending])
+    except EvaluatorUnavailableError:
+        raise
+    except ValueError:
+        batch = {}
+
+    for position, i in enumerate(pending):
+        evaluation = batch.get(position)
+        if evaluation is None:
+            evaluation = _request_evaluation(*items[i])
+        evaluation_cache.store(keys[i], version, evaluation)
+        results[i] = evaluation
+    return results
+
+
+def _request_batch_evaluation(items) -> dict:
+    """Return {position: evaluation} for every item the model scored with a valid result."""
+    joined = "\n\n".join(
+        f"### Item {position}\n{_answer_block(question_obj, answer_text)}"
+        for position, (question_obj, answer_text) in enumerate(items)
+    )
+
+    try:
+        start = time.perf_counter()
+        response = _create_completion(
+            model=MODEL,
+            response_format={"type": "json_schema", "json_schema": BATCH_RESPONSE_SCHEMA},
             messages=[
-                {"role": "user", "content": prompt},
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": joined},
             ],
         )
-        result = json.loads(response.choices[0].message.content)
-        score = int(result.get("score", 0))
-        score = max(0, min(100, score))  # clamp to valid range
-        return {
-            "score": score,
-            "strengths": result.get("strengths", []),
-            "weaknesses": result.get("weaknesses", []),
-        }
+        usage.record(MODEL, "batch", [question_obj for question_obj, _ in items], response.usage, start)
+        payload = json.loads(response.choices[0].message.content)
+        raw_results = payload["results"]
+    except OpenAIError as e:
+        raise _openai_failure("OpenAI batch evaluation failed", e) from e
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Failed to parse OpenAI batch response: {e}") from e
+
+    evaluations = {}
+    for raw in raw_results if isinstance(raw_results, list) else []:
+        if not _is_valid_batch_item(raw, len(items)) or raw["id"] in evaluations:
+            continue
+        evaluations[raw["id"]] = _clean_evaluation(raw)
+    return evaluations
+
+
+def _is_valid_batch_item(raw, item_count: int) -> bool:
+    if not isinstance(raw, dict):
+        return False
+    if not isinstance(raw.get("id"), int) or not 0 <= raw["id"] < item_count:
+        return False
+    if not isinstance(raw.get("score"), int) or not 0 <= raw["score"] <= 100:
+        return False
+    return all(
+        isinstance(raw.get(field), list) and all(isinstance(item, str) for item in raw[field])
+        for field in ("strengths", "weaknesses")
+    )
+
+
+class StreamingEvaluationParser:
+    """Incrementally scan a streamed evaluation JSON object.
+
+    ``feed`` returns ("strengths" | "weaknesses", text) for every list item whose closing
+    quote has arrived, so feedback can be forwarded before the object is complete.
+    """
+
+    LIST_KEYS = ("strengths", "weaknesses")
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key = None
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        items = []
+        while self._pos < len(self.text):
+            ch = self.text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._on_string(json.loads(self.text[self._string_start:self._pos + 1]), items)
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._expect_key = ch == "{" and len(self._stack) == 1
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif ch == "," and self._stack == ["{"]:
+                self._expect_key = True
+            self._pos += 1
+        return items
+
+    def _on_string(self, value: str, items: list):
+        if self._stack == ["{"] and self._expect_key:
+            self._key = value
+            self._expect_key = False
+        elif self._stack == ["{", "["] and self._key in self.LIST_KEYS:
+            items.append((self._key, value))
+
+    def result(self) -> dict:
+        return _clean_evaluation(json.loads(self.text))
+
+
+async def stream_evaluation(question_obj, answer_text: str):
+    """Async generator yielding ("strengths" | "weaknesses", text) items as they are produced,
+    followed by a final ("result", evaluation) pair. Raises ValueError or EvaluatorBusyError."""
+    version = evaluation_cache.rubric_version(RUBRIC, MODEL)
+    key = evaluation_cache.cache_key(question_obj, answer_text, RUBRIC, MODEL)
+    cached = await sync_to_async(evaluation_cache.lookup)(key, version)
+    if cached is not None:
+        for field in StreamingEvaluationParser.LIST_KEYS:
+            for item in cached[field]:
+                yield field, item
+        yield "result", cached
+        return
+
+    client = get_async_client()
+    if not await _acquire_async():
+        raise EvaluatorBusyError("Too many evaluations in progress, please retry shortly.")
+    parser = StreamingEvaluationParser()
+    start = time.perf_counter()
+    stream_usage = None
+    try:
+        stream = await client.chat.completions.create(
+            model=MODEL,
+            response_format={"type": "json_object"},
+            # SYSTEM_PROMPT already asks for strengths and weaknesses before the score.
+            messages=_evaluation_messages(SYSTEM_PROMPT, question_obj, answer_text),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                stream_usage = chunk.usage
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for item in parser.feed(chunk.choices[0].delta.content):
+                yield item
+        evaluation = parser.result()
     except OpenAIError as e:
-        raise ValueError(f"OpenAI evaluation failed: {e}") from e
+        raise _openai_failure("OpenAI evaluation failed", e) from e
     except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
         raise ValueError(f"Failed to parse OpenAI response: {e}") from e
+    finally:
+        _inflight.release()
+
+    await sync_to_async(usage.record)(MODEL, "stream", [question_obj], stream_usage, start)
+    await sync_to_async(evaluation_cache.store)(key, version, evaluation)
+    yield "result", evaluation
@@ -0,0 +1,70 @@
+"""Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are ordered by ``(field, id)`` and the cursor encodes the last row's pair, so each
+page is a single indexed range scan no matter how deep the client pages. List views stay
+backwards compatible: they only paginate when ``cursor`` or ``limit`` is in the query string.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def is_paginated_request(request):
+    return 'cursor' in request.query_params or 'limit' in request.query_params
+
+
+def encode_cursor(value, pk):
+    payload = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value, pk])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, model_field):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        # to_python raises Django's ValidationError for values of the wrong type.
+        value = model_field.to_python(value)
+        if value is None:
+            raise ValueError
+        return value, int(pk)
+    except (ValueError, TypeError, DjangoValidationError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def page_size(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        raise ValidationError({'limit': 'Must be an integer.'})
+    return max(1, min(limit, maximum))
+
+
+def paginate_keyset(queryset, request, field='created_at', descending=True):
+    """Return ``(rows, next_cursor)`` for the page selected by the request's cursor/limit."""
+    limit = page_size(request)
+    direction = '-' if descending else ''
+    lookup = 'lt' if descending else 'gt'
+    if field == 'id':
+        queryset = queryset.order_by(f'{direction}id')
+    else:
+        queryset = queryset.order_by(f'{direction}{field}', f'{direction}id')
+
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor, queryset.model._meta.get_field(field))
+        if field == 'id':
+            queryset = queryset.filter(**{f'id__{lookup}': pk})
+        else:
+            queryset = queryset.filter(Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'id__{lookup}': pk}))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], field), rows[-1].pk)
+    return rows, next_cursor
@@ -0,0 +1,241 @@
+"""Per-student progress snapshots behind /student/progress/.
+
+A StudentProgressSnapshot is built from AnswerModel the first time it is read and then kept
+up to date incrementally by the AnswerModel signals: a new answer bumps the counts, weekly
+activity and streak, and a newly scored answer folds its score into the category totals,
+min/max and recent trend. Changes that cannot be applied incrementally (rescoring, deletes,
+moving an answer between students, editing a question's category) drop the snapshot so the
+next read rebuilds it.
+
+Every change locks the student's user row in the transaction that writes the answers, and
+get_snapshot builds under the same lock. A build therefore either sees an answer or finishes
+before that answer's update looks for the snapshot, so no answer is missed or counted twice.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import rollups
+from .models import AnswerModel, CustomUser, StudentProgressSnapshot
+
+
+def _day(answer_created_at):
+    return timezone.localtime(answer_created_at).date()
+
+
+def _week_start(day):
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def _add_score(stats, score):
+    stats['count'] += 1
+    stats['sum'] += score
+    stats['min'] = score if stats['min'] is None else min(stats['min'], score)
+    stats['max'] = score if stats['max'] is None else max(stats['max'], score)
+
+
+def _empty_stats():
+    return {'count': 0, 'sum': 0, 'min': None, 'max': None}
+
+
+def _trim_activity(weekly_activity, today):
+    oldest = _week_start(today - timedelta(weeks=settings.PROGRESS_ACTIVITY_WEEKS - 1))
+    return {week: count for week, count in weekly_activity.items() if week >= oldest}
+
+
+def _apply_score(snapshot, fact, answer):
+    snapshot.scored_count += 1
+    snapshot.score_sum += fact['score']
+    snapshot.best_score = fact['score'] if snapshot.best_score is None else max(snapshot.best_score, fact['score'])
+    snapshot.worst_score = fact['score'] if snapshot.worst_score is None else min(snapshot.worst_score, fact['score'])
+    category = snapshot.areas.setdefault(fact['category'], {**_empty_stats(), 'subcategories': {}})
+    _add_score(category, fact['score'])
+    _add_score(category['subcategories'].setdefault(fact['subcategory'], _empty_stats()), fact['score'])
+    trend = snapshot.recent_scores + [{
+        'answer_id': answer.pk,
+        'score': fact['score'],
+        'created_at': answer.created_at.isoformat(),
+    }]
+    trend.sort(key=lambda item: (item['created_at'], item['answer_id']))
+    snapshot.recent_scores = trend[-settings.PROGRESS_TREND_LENGTH:]
+
+
+def _apply_activity(snapshot, answer):
+    day = _day(answer.created_at)
+    snapshot.answer_count += 1
+    week = _week_start(day)
+    snapshot.weekly_activity[week] = snapshot.weekly_activity.get(week, 0) + 1
+    snapshot.weekly_activity = _trim_activity(snapshot.weekly_activity, timezone.localdate())
+    if snapshot.last_active_day is None or day > snapshot.last_active_day:
+        if snapshot.last_active_day is not None and day == snapshot.last_active_day + timedelta(days=1):
+            snapshot.current_streak += 1
+        else:
+            snapshot.current_streak = 1
+        snapshot.longest_streak = max(snapshot.longest_streak, snapshot.current_streak)
+        snapshot.last_active_day = day
+    if snapshot.last_answer_at is None or answer.created_at > snapshot.last_answer_at:
+        snapshot.last_answer_at = answer.created_at
+
+
+def _lock_students(student_ids):
+    ids = sorted({pk for pk in student_ids if pk is not None})
+    # NO KEY UPDATE: inserting an answer already holds KEY SHARE on its student's row, which a
+    # plain FOR UPDATE would wait on, deadlocking two concurrent submissions by one student.
+    list(CustomUser.objects.select_for_update(no_key=True).filter(pk__in=ids).order_by('pk').values_list('pk', flat=True))
+    return ids
+
+
+def _update(student_id, apply):
+    """Run ``apply(snapshot)`` on a locked snapshot, if the student has one yet."""
+    if student_id is None:
+        return
+    with transaction.atomic():
+        _lock_students([student_id])
+        snapshot = StudentProgressSnapshot.objects.select_for_update().filter(student_id=student_id).first()
+        if snapshot is not None:
+            apply(snapshot)
+            snapshot.save()
+
+
+def answers_created(student_id, answers):
+    """New answers were saved for the student (by a save signal or a bulk_create)."""
+    def apply(snapshot):
+        for answer in answers:
+            _apply_activity(snapshot, answer)
+            fact = rollups.answer_fact(answer)
+            if fact is not None:
+                _apply_score(snapshot, fact, answer)
+    _update(student_id, apply)
+
+
+def answer_scored(answer, fact):
+    """An existing, previously unscored answer received its score."""
+    _update(answer.student_id, lambda snapshot: _apply_score(snapshot, fact, answer))
+
+
+def invalidate(*student_ids):
+    with transaction.atomic():
+        StudentProgressSnapshot.objects.filter(student_id__in=_lock_students(student_ids)).delete()
+
+
+def build(student_id):
+    """Compute a fresh (unsaved) snapshot for the student from AnswerModel."""
+    answers = AnswerModel.objects.filter(student_id=student_id)
+    snapshot = StudentProgressSnapshot(student_id=student_id)
+    snapshot.answer_count = answers.count()
+    if not snapshot.answer_count:
+        return snapshot
+
+    scored = answers.filter(score__isnull=False)
+    for row in (
+        scored.values('question__category', 'question__subcategory')
+        .annotate(count=Count('id'), sum=Sum('score'), min=Min('score'), max=Max('score'))
+    ):
+        stats = {key: row[key] for key in ('count', 'sum', 'min', 'max')}
+        category = snapshot.areas.setdefault(row['question__category'], {**_empty_stats(), 'subcategories': {}})
+        category['subcategories'][row['question__subcategory']] = stats
+        category['count'] += stats['count']
+        category['sum'] += stats['sum']
+        category['min'] = stats['min'] if category['min'] is None else min(category['min'], stats['min'])
+        category['max'] = stats['max'] if category['max'] is None else max(category['max'], stats['max'])
+    for category in snapshot.areas.values():
+        snapshot.scored_count += category['count']
+        snapshot.score_sum += category['sum']
+        snapshot.best_score = category['max'] if snapshot.best_score is None else max(snapshot.best_score, category['max'])
+        snapshot.worst_score = category['min'] if snapshot.worst_score is None else min(snapshot.worst_score, category['min'])
+
+    recent = scored.order_by('-created_at', '-id').values('id', 'score', 'created_at')[:settings.PROGRESS_TREND_LENGTH]
+    snapshot.recent_scores = [
+        {'answer_id': row['id'], 'score': row['score'], 'created_at': row['created_at'].isoformat()}
+        for row in reversed(recent)
+    ]
+
+    today = timezone.localdate()
+    days = {
+        row['day']: row['count']
+        for row in answers.annotate(day=TruncDate('created_at')).values('day').annotate(count=Count('id'))
+    }
+    for day, count in days.items():
+        week = _week_start(day)
+        snapshot.weekly_activity[week] = snapshot.weekly_activity.get(week, 0) + count
+    snapshot.weekly_activity = _trim_activity(snapshot.weekly_activity, today)
+
+    streak = 0
+    previous = None
+    for day in sorted(days):
+        streak = streak + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        snapshot.longest_streak = max(snapshot.longest_streak, streak)
+        previous = day
+    snapshot.current_streak = streak
+    snapshot.last_active_day = previous
+    snapshot.last_answer_at = answers.aggregate(last=Max('created_at'))['last']
+    return snapshot
+
+
+def get_snapshot(student_id):
+    """The student's snapshot, building and storing it on first use."""
+    snapshot = StudentProgressSnapshot.objects.filter(student_id=student_id).first()
+    if snapshot is not None:
+        return snapshot
+    with transaction.atomic():
+        _lock_students([student_id])
+        # Built by another request while we waited for the lock.
+        snapshot = StudentProgressSnapshot.objects.filter(student_id=student_id).first()
+        if snapshot is None:
+            snapshot = build(student_id)
+            snapshot.save()
+    return snapshot
+
+
+def _average(stats):
+    return round(stats['sum'] / stats['count'], 1) if stats['count'] else None
+
+
+def as_dict(snapshot):
+    today = timezone.localdate()
+    # The stored streak ends on last_active_day; it is only current if that was today or yesterday.
+    active = snapshot.last_active_day is not None and snapshot.last_active_day >= today - timedelta(days=1)
+    weeks = [_week_start(today - timedelta(weeks=offset)) for offset in reversed(range(settings.PROGRESS_ACTIVITY_WEEKS))]
+    areas = []
+    for category, stats in sorted(snapshot.areas.items()):
+        for subcategory, sub_stats in sorted(stats['subcategories'].items()):
+            areas.append({'category': category, 'subcategory': subcategory, 'average_score': _average(sub_stats), 'count': sub_stats['count']})
+    ranked = sorted((area for area in areas if area['count']), key=lambda area: area['average_score'])
+    return {
+        'answer_count': snapshot.answer_count,
+        'scored_count': snapshot.scored_count,
+        'average_score': _average({'sum': snapshot.score_sum, 'count': snapshot.scored_count}),
+        'best_score': snapshot.best_score,
+        'worst_score': snapshot.worst_score,
+        'by_category': [
+            {
+                'category': category,
+                'count': stats['count'],
+                'average_score': _average(stats),
+                'min_score': stats['min'],
+                'max_score': stats['max'],
+                'subcategories': [
+                    {
+                        'subcategory': subcategory,
+                        'count': sub_stats['count'],
+                        'average_score': _average(sub_stats),
+                        'min_score': sub_stats['min'],
+                        'max_score': sub_stats['max'],
+                    }
+                    for subcategory, sub_stats in sorted(stats['subcategories'].items())
+                ],
+            }
+            for category, stats in sorted(snapshot.areas.items())
+        ],
+        'strongest_area': ranked[-1] if ranked else None,
+        'weakest_area': ranked[0] if ranked else None,
+        'recent_scores': snapshot.recent_scores,
+        'weekly_activity': [{'week_start': week, 'count': snapshot.weekly_activity.get(week, 0)} for week in weeks],
+        'current_streak': snapshot.current_streak if active else 0,
+        'longest_streak': snapshot.longest_streak,
+        'last_answer_at': snapshot.last_answer_at,
+    }
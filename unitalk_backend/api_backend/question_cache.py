@@ -0,0 +1,49 @@
+"""Versioned cache for the serialized question bank.
+
+A version token in the shared cache is replaced whenever a question is saved or deleted
+(see signals.py). The serialized bank is cached per version both in this process and in
+the shared cache, and the version doubles as the list endpoint's ETag, so a conditional
+GET can be answered without touching the database.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+
+VERSION_KEY = 'questions:version'
+PAYLOAD_KEY = 'questions:payload:{}'
+PAYLOAD_TIMEOUT = 24 * 3600
+
+_local = {}
+_local_lock = threading.Lock()
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def etag_for(version):
+    return f'"questions-{version}"'
+
+
+def get_payload(version, build):
+    """Return the serialized bank for ``version``, calling ``build()`` only on a miss in both layers."""
+    with _local_lock:
+        if version in _local:
+            return _local[version]
+    payload = cache.get(PAYLOAD_KEY.format(version))
+    if payload is None:
+        payload = build()
+        cache.set(PAYLOAD_KEY.format(version), payload, timeout=PAYLOAD_TIMEOUT)
+    with _local_lock:
+        _local.clear()  # only the newest version is worth keeping in memory
+        _local[version] = payload
+    return payload
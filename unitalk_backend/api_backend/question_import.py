@@ -0,0 +1,158 @@
+"""Bulk question import from CSV, JSON or NDJSON.
+
+Rows are parsed and validated one at a time and buffered only until a batch is full. Each
+batch costs one query to find text hashes that already exist and one bulk_create, so an
+import of N rows runs about 2 * N / batch_size queries. Duplicates are detected by
+QuestionModel.text_hash, against both the bank and earlier rows of the same file, so
+re-running an import is harmless.
+
+bulk_create skips the QuestionModel signals, so the question bank cache version is bumped
+here once the import commits. The near-duplicate index picks the new rows up on its next
+sync, because that sync reads every id above the last one indexed.
+"""
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from django.db import transaction
+
+from . import question_cache
+from .models import QuestionModel, question_text_hash
+
+FORMATS = ('csv', 'json', 'ndjson')
+CHOICES = {
+    'difficulty': [value for value, _ in QuestionModel.DIFFICULTY_CHOICES],
+    'category': [value for value, _ in QuestionModel.CATEGORY_CHOICES],
+    'subcategory': [value for value, _ in QuestionModel.SUBCATEGORY_CHOICES],
+}
+QUESTION_MAX_LENGTH = QuestionModel._meta.get_field('question').max_length
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be read as the requested format at all."""
+
+
+class InvalidRow(str):
+    """A row that could not be parsed; the text is the error to report."""
+
+
+def detect_format(name):
+    """Guess the format from a file name, defaulting to CSV."""
+    extension = name.rsplit('.', 1)[-1].lower()
+    if extension == 'jsonl':
+        return 'ndjson'
+    return extension if extension in FORMATS else 'csv'
+
+
+def read_rows(binary_file, fmt):
+    """Yield ``(row_number, row)`` from a binary file; undecodable rows come through as InvalidRow."""
+    if fmt == 'json':
+        # A JSON array has to be parsed whole; the upload size limit bounds it.
+        try:
+            rows = json.load(codecs.getreader('utf-8-sig')(binary_file))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ImportFormatError(f'Invalid JSON: {e}')
+        if not isinstance(rows, list):
+            raise ImportFormatError('A JSON import must be an array of objects.')
+        yield from enumerate(rows, start=1)
+        return
+
+    text = codecs.getreader('utf-8-sig')(binary_file, errors='replace')
+    if fmt == 'ndjson':
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as e:
+                yield number, InvalidRow(f'Invalid JSON: {e}')
+        return
+
+    reader = csv.DictReader(text)
+    missing = {'question', 'difficulty'} - set(reader.fieldnames or ())
+    if missing:
+        raise ImportFormatError(f'CSV header is missing column(s): {sorted(missing)}')
+    # Row numbers count the header as row 1, matching what a spreadsheet shows.
+    for number, row in enumerate(reader, start=2):
+        yield number, row
+
+
+def clean_row(row):
+    """Return ``(fields, errors)`` for one input row."""
+    if not isinstance(row, dict):
+        return None, {'row': row if isinstance(row, InvalidRow) else 'Expected an object.'}
+    errors = {}
+    fields = {}
+    question = str(row.get('question') or '').strip()
+    if not question:
+        errors['question'] = 'This field is required.'
+    elif len(question) > QUESTION_MAX_LENGTH:
+        errors['question'] = f'Ensure this field has no more than {QUESTION_MAX_LENGTH} characters.'
+    fields['question'] = question
+    for name, choices in CHOICES.items():
+        value = str(row.get(name) or '').strip()
+        if not value:
+            default = QuestionModel._meta.get_field(name).default
+            if isinstance(default, str):
+                fields[name] = default
+                continue
+            errors[name] = 'This field is required.'
+            continue
+        # Accept any capitalisation of a valid choice.
+        match = next((choice for choice in choices if choice.lower() == value.lower()), None)
+        if match is None:
+            errors[name] = f'"{value}" is not a valid choice ({", ".join(choices)}).'
+        fields[name] = match
+    return fields, errors
+
+
+def import_questions(rows, batch_size=None, dry_run=False, max_errors=None):
+    """Validate and insert ``(row_number, row)`` pairs. Returns a report dict.
+
+    Runs in one transaction; with ``dry_run`` everything is validated and checked for
+    duplicates but nothing is written.
+    """
+    batch_size = batch_size or settings.QUESTION_IMPORT_BATCH_SIZE
+    max_errors = settings.QUESTION_IMPORT_MAX_ERRORS if max_errors is None else max_errors
+    report = {'rows': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'dry_run': dry_run}
+    seen = set()
+    batch = []
+
+    def error(number, errors):
+        report['invalid'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'row': number, 'errors': errors})
+
+    def flush():
+        existing = set(
+            QuestionModel.objects.filter(text_hash__in=[question.text_hash for question in batch])
+            .values_list('text_hash', flat=True)
+        )
+        new = [question for question in batch if question.text_hash not in existing]
+        report['duplicates'] += len(batch) - len(new)
+        if new and not dry_run:
+            QuestionModel.objects.bulk_create(new, batch_size=batch_size)
+        report['created'] += len(new)
+        batch.clear()
+
+    with transaction.atomic():
+        for number, row in rows:
+            report['rows'] += 1
+            fields, errors = clean_row(row)
+            if errors:
+                error(number, errors)
+                continue
+            text_hash = question_text_hash(fields['question'])
+            if text_hash in seen:
+                report['duplicates'] += 1
+                continue
+            seen.add(text_hash)
+            batch.append(QuestionModel(text_hash=text_hash, **fields))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        if report['created'] and not dry_run:
+            transaction.on_commit(question_cache.bump_version)
+    return report
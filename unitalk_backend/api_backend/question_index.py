@@ -0,0 +1,195 @@
+"""In-process near-duplicate index over QuestionModel.question.
+
+Each question is hashed into a fixed-width vector of signed word and character-trigram
+counts (the "hashing trick"), L2-normalised and stored as one row of a float32 NumPy matrix,
+so the cosine similarity against every question is a single matrix-vector product.
+
+The matrix is written to QUESTION_INDEX_PATH and loaded on first use; ``sync`` then only
+vectorises questions with a higher id than the last one indexed, so workers pick up each
+other's inserts with one small query. The file is rewritten every QUESTION_INDEX_SAVE_EVERY
+new rows rather than on each insert. Edits and deletes are not tracked in the matrix:
+candidates are re-scored against the current database text before being returned, and
+``rebuild`` (or `manage.py dedupe_questions`) refreshes everything.
+"""
+import logging
+import os
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+from django.conf import settings
+
+from .models import QuestionModel, normalize_question_text
+
+logger = logging.getLogger(__name__)
+
+# Bump when the features change so stale index files are rebuilt instead of loaded.
+VECTORIZER_VERSION = 1
+CANDIDATES = 20
+
+def _features(text):
+    normalized = normalize_question_text(text)
+    features = normalized.split()
+    padded = f' {normalized} '
+    features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def vectorize(text, dim=None):
+    dim = dim or settings.QUESTION_INDEX_DIM
+    features = _features(text)
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    # crc32 rather than hash(), which is salted per process and would not survive a reload.
+    hashes = np.fromiter((zlib.crc32(feature.encode()) for feature in features), dtype=np.uint32, count=len(features))
+    signs = np.where(hashes >> 31, -1.0, 1.0)
+    vector += np.bincount(hashes % dim, weights=signs, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class QuestionIndex:
+    def __init__(self, path, dim):
+        self.path = path
+        self.dim = dim
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.size = 0
+        self.unsaved = 0
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    @property
+    def max_id(self):
+        return int(self.ids[self.size - 1]) if self.size else 0
+
+    def _append(self, ids, vectors):
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            # Grow geometrically so incremental inserts stay amortised O(1).
+            capacity = max(needed, 2 * len(self.ids), 1024)
+            self.ids = np.resize(self.ids, capacity)
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[:self.size] = self.matrix[:self.size]
+            self.matrix = matrix
+        self.ids[self.size:needed] = ids
+        self.matrix[self.size:needed] = vectors
+        self.size = needed
+        self.unsaved += len(ids)
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                if int(data['version']) != VECTORIZER_VERSION or int(data['dim']) != self.dim:
+                    return False
+                ids, matrix = data['ids'], data['matrix']
+        except (OSError, KeyError, ValueError):
+            return False
+        self.size = 0
+        self._append(ids, matrix)
+        self.unsaved = 0
+        return True
+
+    def save(self):
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                np.savez(
+                    handle,
+                    version=VECTORIZER_VERSION,
+                    dim=self.dim,
+                    ids=self.ids[:self.size],
+                    matrix=self.matrix[:self.size],
+                )
+            os.replace(tmp, self.path)
+        except OSError:
+            logger.warning('Could not write the question index to %s', self.path, exc_info=True)
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+        self.unsaved = 0
+
+    def _add_rows(self, rows):
+        rows = list(rows)
+        if rows:
+            self._append(
+                np.array([pk for pk, _ in rows], dtype=np.int64),
+                np.stack([vectorize(text, self.dim) for _, text in rows]),
+            )
+
+    def sync(self):
+        """Index questions created since the last sync (loading or building the matrix first)."""
+        with self.lock:
+            if not self.loaded:
+                if not self._load():
+                    self._rebuild()
+                    return
+                self.loaded = True
+            self._add_rows(
+                QuestionModel.objects.filter(id__gt=self.max_id).order_by('id').values_list('id', 'question')
+            )
+            if self.unsaved >= settings.QUESTION_INDEX_SAVE_EVERY:
+                self.save()
+
+    def _rebuild(self):
+        self.size = 0
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, self.dim), dtype=np.float32)
+        self._add_rows(QuestionModel.objects.order_by('id').values_list('id', 'question').iterator(chunk_size=2000))
+        self.loaded = True
+        self.save()
+
+    def rebuild(self):
+        with self.lock:
+            self._rebuild()
+
+    def search(self, text, threshold, exclude_id=None):
+        """Questions at least ``threshold`` cosine-similar to ``text``, most similar first."""
+        self.sync()
+        vector = vectorize(text, self.dim)
+        with self.lock:
+            if not self.size or not vector.any():
+                return []
+            scores = self.matrix[:self.size] @ vector
+            hits = np.flatnonzero(scores >= threshold)
+            if len(hits) > CANDIDATES:
+                hits = hits[np.argpartition(scores[hits], -CANDIDATES)[-CANDIDATES:]]
+            candidates = {int(pk) for pk in self.ids[hits]}
+        candidates.discard(exclude_id)
+        if not candidates:
+            return []
+        # Re-score against the stored text so deleted or edited questions are not reported.
+        matches = []
+        for question in QuestionModel.objects.filter(pk__in=candidates):
+            similarity = float(vectorize(question.question, self.dim) @ vector)
+            if similarity >= threshold:
+                matches.append((question, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def similarity_matrix_blocks(self, block_size=1000):
+        """Yield (row ids, column ids, similarities) blocks covering the upper triangle."""
+        ids, matrix = self.ids[:self.size], self.matrix[:self.size]
+        for start in range(0, self.size, block_size):
+            block = matrix[start:start + block_size]
+            yield ids[start:start + block_size], ids[start:], block @ matrix[start:].T
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = QuestionIndex(settings.QUESTION_INDEX_PATH, settings.QUESTION_INDEX_DIM)
+        return _index
+
+
+def find_similar(text, threshold=None, exclude_id=None):
+    threshold = settings.QUESTION_SIMILAR_THRESHOLD if threshold is None else threshold
+    return get_index().search(text, threshold, exclude_id=exclude_id)
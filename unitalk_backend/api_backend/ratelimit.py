@@ -0,0 +1,143 @@
+"""Token-bucket rate limiting for the evaluation and upload endpoints.
+
+Each bucket holds up to ``capacity`` tokens and refills continuously at the rate given in
+settings.RATE_LIMITS ("20/min" = 20 tokens, refilled over a minute). A request takes one
+token (or the view's ``get_throttle_cost``) and is refused with 429 and Retry-After when the
+bucket is short. Buckets live in RATE_LIMIT_STORE: 'database' (the RateLimitBucket table,
+exact under concurrency via row locks) or 'cache' (the Django cache, e.g. Redis; cheaper but
+concurrent requests can occasionally overdraw a bucket by a token or two).
+"""
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.throttling import BaseThrottle
+
+from .models import RateLimitBucket
+
+PERIODS = {'s': 1, 'sec': 1, 'min': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(rate: str):
+    """Return (capacity, tokens per second) for a rate such as "20/min"."""
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period.strip()]
+
+
+def _refill(tokens, updated_at, now, capacity, refill):
+    return min(capacity, tokens + (now - updated_at) * refill)
+
+
+class DatabaseBucketStore:
+    # Buckets idle for this long are full again and can be dropped.
+    IDLE_SECONDS = 86400
+
+    def take(self, key, capacity, refill, cost):
+        now = time.time()
+        with transaction.atomic():
+            bucket, _ = RateLimitBucket.objects.select_for_update().get_or_create(
+                key=key, defaults={'tokens': capacity, 'updated_at': now},
+            )
+            tokens = _refill(bucket.tokens, bucket.updated_at, now, capacity, refill)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / refill
+            if not wait:
+                tokens -= cost
+            RateLimitBucket.objects.filter(pk=bucket.pk).update(tokens=tokens, updated_at=now)
+        if random.random() < 0.001:
+            RateLimitBucket.objects.filter(updated_at__lt=now - self.IDLE_SECONDS).delete()
+        return wait
+
+
+class CacheBucketStore:
+    def take(self, key, capacity, refill, cost):
+        now = time.time()
+        cache_key = f'ratelimit:{key}'
+        tokens, updated_at = cache.get(cache_key, (capacity, now))
+        tokens = _refill(tokens, updated_at, now, capacity, refill)
+        wait = 0.0 if tokens >= cost else (cost - tokens) / refill
+        if not wait:
+            tokens -= cost
+        cache.set(cache_key, (tokens, now), timeout=math.ceil(capacity / refill) + 1)
+        return wait
+
+
+STORES = {
+    'database': DatabaseBucketStore(),
+    'cache': CacheBucketStore(),
+}
+
+
+def take(key: str, rate: str, cost: int = 1) -> float:
+    """Take ``cost`` tokens from bucket ``key``. Returns 0 if allowed, else seconds to wait."""
+    capacity, refill = parse_rate(rate)
+    return STORES[settings.RATE_LIMIT_STORE].take(key, capacity, refill, min(cost, capacity))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """DRF throttle backed by ``take``. ``scope`` names the rate in settings.RATE_LIMITS;
+    an empty rate disables it. ``methods`` restricts it to some HTTP methods."""
+
+    scope = None
+    methods = None
+
+    def get_key(self, request, view):
+        """Bucket key for this request, or None to let it through unthrottled."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        rate = settings.RATE_LIMITS.get(self.scope)
+        key = self.get_key(request, view) if rate else None
+        if key is None:
+            return True
+        cost = view.get_throttle_cost(request) if hasattr(view, 'get_throttle_cost') else 1
+        self.retry_after = take(f'{self.scope}:{key}', rate, cost) or None
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+class EvaluationUserThrottle(TokenBucketThrottle):
+    scope = 'evaluation_user'
+
+    def get_key(self, request, view):
+        return request.user.id if request.user.is_authenticated else None
+
+
+class EvaluationIPThrottle(TokenBucketThrottle):
+    """Keyed on DRF's client IP, which trusts only REST_FRAMEWORK['NUM_PROXIES'] X-Forwarded-For hops."""
+    scope = 'evaluation_ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EvaluationGlobalThrottle(TokenBucketThrottle):
+    scope = 'evaluation_global'
+
+    def get_key(self, request, view):
+        return 'all'
+
+
+EVALUATION_THROTTLES = [EvaluationUserThrottle, EvaluationIPThrottle, EvaluationGlobalThrottle]
+
+
+class CVUploadThrottle(TokenBucketThrottle):
+    scope = 'cv_upload_user'
+    methods = ('POST',)
+
+    def get_key(self, request, view):
+        return request.user.id if request.user.is_authenticated else None
+
+
+def throttle_wait(throttle_classes, request, view):
+    """Run throttles outside DRF (e.g. in a plain async view). Returns the longest wait, or None."""
+    waits = [throttle.wait() for throttle in (cls() for cls in throttle_classes) if not throttle.allow_request(request, view)]
+    return max(waits) if waits else None
@@ -0,0 +1,132 @@
+"""Incrementally maintained aggregates behind FacultyAnalyticsView.
+
+Every scored answer contributes its score to one AnswerRollup bucket and one
+StudentAnswerRollup row. The AnswerModel signals in signals.py call ``add`` and
+``remove`` with a *fact* dict describing the answer before and after each write;
+code that bypasses signals (bulk_create) must call ``add_answers`` itself. Editing a
+question's category, subcategory or difficulty moves its answers with ``move_question``.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AnswerModel, AnswerRollup, StudentAnswerRollup
+
+
+def answer_fact(answer):
+    """Describe the rollup contribution of a saved answer, or None if it is unscored."""
+    if answer.score is None:
+        return None
+    question = answer.question
+    return {
+        'score': answer.score,
+        'student_id': answer.student_id,
+        'category': question.category,
+        'subcategory': question.subcategory,
+        'difficulty': question.difficulty,
+        'day': timezone.localtime(answer.created_at).date(),
+    }
+
+
+def stored_answer_fact(pk):
+    """Fact for the answer as currently stored in the database (before an update)."""
+    row = (
+        AnswerModel.objects.filter(pk=pk)
+        .values('score', 'student_id', 'created_at', 'question__category', 'question__subcategory', 'question__difficulty')
+        .first()
+    )
+    if row is None or row['score'] is None:
+        return None
+    return {
+        'score': row['score'],
+        'student_id': row['student_id'],
+        'category': row['question__category'],
+        'subcategory': row['question__subcategory'],
+        'difficulty': row['question__difficulty'],
+        'day': timezone.localtime(row['created_at']).date(),
+    }
+
+
+QUESTION_FIELDS = ('category', 'subcategory', 'difficulty')
+
+
+def _apply_bucket(category, subcategory, difficulty, day, score_sum, answer_count):
+    bucket, _ = AnswerRollup.objects.get_or_create(
+        category=category,
+        subcategory=subcategory,
+        difficulty=difficulty,
+        day=day,
+    )
+    AnswerRollup.objects.filter(pk=bucket.pk).update(
+        score_sum=F('score_sum') + score_sum,
+        answer_count=F('answer_count') + answer_count,
+    )
+
+
+def _apply(fact, sign):
+    _apply_bucket(fact['category'], fact['subcategory'], fact['difficulty'], fact['day'], sign * fact['score'], sign)
+    if fact['student_id'] is not None:
+        student_rollup, _ = StudentAnswerRollup.objects.get_or_create(student_id=fact['student_id'])
+        StudentAnswerRollup.objects.filter(pk=student_rollup.pk).update(answer_count=F('answer_count') + sign)
+
+
+def add(fact):
+    if fact is not None:
+        _apply(fact, 1)
+
+
+def remove(fact):
+    if fact is not None:
+        _apply(fact, -1)
+
+
+def add_answers(answers):
+    for answer in answers:
+        add(answer_fact(answer))
+
+
+def move_question(question_id, previous, current):
+    """Move a question's scored answers between buckets after its QUESTION_FIELDS changed.
+
+    ``previous`` and ``current`` are (category, subcategory, difficulty) tuples. Costs one
+    grouped query plus two bucket updates per day the question was answered on.
+    """
+    days = (
+        AnswerModel.objects.filter(question_id=question_id, score__isnull=False)
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(score_sum=Sum('score'), answer_count=Count('id'))
+    )
+    with transaction.atomic():
+        for row in days:
+            _apply_bucket(*previous, row['day'], -row['score_sum'], -row['answer_count'])
+            _apply_bucket(*current, row['day'], row['score_sum'], row['answer_count'])
+
+
+def expected_rollups():
+    """Recompute bucket and per-student totals from the raw AnswerModel table."""
+    scored = AnswerModel.objects.filter(score__isnull=False)
+    buckets = {
+        (row['question__category'], row['question__subcategory'], row['question__difficulty'], row['day']): (
+            row['score_sum'],
+            row['answer_count'],
+        )
+        for row in scored.annotate(day=TruncDate('created_at'))
+        .values('question__category', 'question__subcategory', 'question__difficulty', 'day')
+        .annotate(score_sum=Sum('score'), answer_count=Count('id'))
+    }
+    students = {
+        row['student_id']: row['answer_count']
+        for row in scored.filter(student__isnull=False).values('student_id').annotate(answer_count=Count('id'))
+    }
+    return buckets, students
+
+
+def stored_rollups():
+    buckets = {
+        (row.category, row.subcategory, row.difficulty, row.day): (row.score_sum, row.answer_count)
+        for row in AnswerRollup.objects.filter(answer_count__gt=0)
+    }
+    students = dict(StudentAnswerRollup.objects.filter(answer_count__gt=0).values_list('student_id', 'answer_count'))
+    return buckets, students
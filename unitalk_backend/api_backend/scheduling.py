@@ -0,0 +1,173 @@
+"""Faculty availability and conflict-free appointment booking.
+
+Free slots for a date range come from two queries (the faculty member's weekly windows and
+the appointments that overlap the range) and a sweep over sorted intervals: the windows are
+expanded to concrete days and merged, booked intervals are merged and subtracted, and each
+window's slot grid is kept where a slot fits inside what is left.
+
+Bookings lock the faculty member's user row before checking for overlaps, so two requests
+for the same faculty member are serialised and cannot both take the same time.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DEFAULT_APPOINTMENT_MINUTES, MAX_APPOINTMENT_MINUTES, Appointment, CustomUser, FacultyAvailability
+
+
+class SlotUnavailableError(ValueError):
+    """The requested time is outside the faculty member's hours or overlaps a booking."""
+
+
+def merge(intervals):
+    """Merge overlapping or touching ``(start, end)`` intervals into a sorted, disjoint list."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(free, busy):
+    """Remove the disjoint, sorted ``busy`` intervals from the disjoint, sorted ``free`` ones."""
+    result = []
+    i = 0
+    for start, end in free:
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > start:
+                result.append((start, busy[j][0]))
+            start = max(start, busy[j][1])
+            j += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def _windows(faculty_id):
+    return list(
+        FacultyAvailability.objects.filter(faculty_id=faculty_id)
+        .values_list('weekday', 'start_time', 'end_time', 'slot_minutes')
+    )
+
+
+def _window_instances(windows, first_day, last_day):
+    """Concrete ``(start, end, slot_minutes)`` for every window occurrence in the day range."""
+    by_weekday = {}
+    for weekday, start_time, end_time, slot_minutes in windows:
+        by_weekday.setdefault(weekday, []).append((start_time, end_time, slot_minutes))
+    instances = []
+    day = first_day
+    while day <= last_day:
+        for start_time, end_time, slot_minutes in by_weekday.get(day.weekday(), ()):
+            instances.append((
+                timezone.make_aware(datetime.combine(day, start_time)),
+                timezone.make_aware(datetime.combine(day, end_time)),
+                slot_minutes,
+            ))
+        day += timedelta(days=1)
+    return sorted(instances)
+
+
+def busy_intervals(faculty_id, start, end, exclude_id=None):
+    """Booked ``(start, end)`` intervals that overlap ``[start, end)``, merged."""
+    appointments = (
+        Appointment.objects.filter(
+            faculty_id=faculty_id,
+            scheduled_at__lt=end,
+            scheduled_at__gt=start - timedelta(minutes=MAX_APPOINTMENT_MINUTES),
+        )
+        .exclude(status='cancelled')
+    )
+    if exclude_id is not None:
+        appointments = appointments.exclude(pk=exclude_id)
+    intervals = []
+    for scheduled_at, duration in appointments.values_list('scheduled_at', 'duration_minutes'):
+        booked_end = scheduled_at + timedelta(minutes=duration)
+        if booked_end > start:
+            intervals.append((scheduled_at, booked_end))
+    return merge(intervals)
+
+
+def free_slots(faculty_id, first_day, last_day, now=None):
+    """Bookable ``(start, end)`` slots between two local dates (inclusive), earliest first.
+
+    Returns None for faculty with no working hours set, who can be booked at any time.
+    """
+    now = now or timezone.now()
+    windows = _windows(faculty_id)
+    if not windows:
+        return None
+    instances = _window_instances(windows, first_day, last_day)
+    if not instances:
+        return []
+    working = merge([(start, end) for start, end, _ in instances])
+    free = subtract(working, busy_intervals(faculty_id, working[0][0], working[-1][1]))
+    free_starts = [start for start, _ in free]
+
+    slots = set()
+    for window_start, window_end, slot_minutes in instances:
+        length = timedelta(minutes=slot_minutes)
+        slot_start = window_start
+        while slot_start + length <= window_end:
+            i = bisect_right(free_starts, slot_start) - 1
+            if slot_start >= now and i >= 0 and slot_start + length <= free[i][1]:
+                slots.add((slot_start, slot_start + length))
+            slot_start += length
+    return sorted(slots)
+
+
+def slot_length(faculty_id, scheduled_at):
+    """Length of the slot starting at ``scheduled_at``, or SlotUnavailableError if there is none.
+
+    Faculty who have not set any working hours can be booked at any time for the default length.
+    """
+    windows = _windows(faculty_id)
+    if not windows:
+        return timedelta(minutes=DEFAULT_APPOINTMENT_MINUTES)
+    day = timezone.localtime(scheduled_at).date()
+    # A window can only contain the start if it begins on the same local day.
+    for window_start, window_end, slot_minutes in _window_instances(windows, day, day):
+        length = timedelta(minutes=slot_minutes)
+        offset = scheduled_at - window_start
+        if offset >= timedelta(0) and scheduled_at + length <= window_end and not offset % length:
+            return length
+    raise SlotUnavailableError('That time is not one of the faculty member\'s available slots.')
+
+
+def _ensure_free(faculty_id, start, end, exclude_id=None):
+    # Locking the faculty row serialises concurrent bookings for the same faculty member.
+    list(CustomUser.objects.select_for_update().filter(pk=faculty_id).values_list('pk', flat=True))
+    if busy_intervals(faculty_id, start, end, exclude_id=exclude_id):
+        raise SlotUnavailableError('That time overlaps an existing appointment.')
+
+
+def book(faculty_id, student_id, scheduled_at, **fields):
+    if scheduled_at < timezone.now():
+        raise SlotUnavailableError('Appointments cannot be booked in the past.')
+    length = slot_length(faculty_id, scheduled_at)
+    with transaction.atomic():
+        _ensure_free(faculty_id, scheduled_at, scheduled_at + length)
+        return Appointment.objects.create(
+            faculty_id=faculty_id,
+            student_id=student_id,
+            scheduled_at=scheduled_at,
+            duration_minutes=length // timedelta(minutes=1),
+            **fields,
+        )
+
+
+def set_status(appointment, new_status):
+    """Change an appointment's status, re-checking for conflicts when a cancelled one is revived."""
+    with transaction.atomic():
+        if appointment.status == 'cancelled' and new_status != 'cancelled':
+            _ensure_free(appointment.faculty_id, appointment.scheduled_at, appointment.ends_at, exclude_id=appointment.pk)
+        appointment.status = new_status
+        appointment.save()
@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import QuestionModel, AnswerModel, Appointment, CV
+from .models import QuestionModel, AnswerModel, Appointment, CV, EvaluationJob, FacultyAvailability
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
@@ -52,11 +53,42 @@ class SubmitAnswerSerializer(serializers.Serializer):
     answer = serializers.CharField(max_length=5000)
 
 
+class BatchAnswerItemSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    answer = serializers.CharField(max_length=5000)
+
+
+class SubmitAnswersBatchSerializer(serializers.Serializer):
+    answers = BatchAnswerItemSerializer(many=True, allow_empty=False)
+
+    def validate_answers(self, value):
+        if len(value) > settings.EVALUATION_BATCH_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'At most {settings.EVALUATION_BATCH_MAX_SIZE} answers can be submitted at once.'
+            )
+        questions = QuestionModel.objects.in_bulk({item['question'] for item in value})
+        missing = sorted({item['question'] for item in value} - questions.keys())
+        if missing:
+            raise serializers.ValidationError(f'Unknown question id(s): {missing}')
+        for item in value:
+            item['question'] = questions[item['question']]
+        return value
+
+
+class EvaluationJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.UUIDField(source='token', read_only=True)
+    answer = AnswerSerializer(read_only=True)
+
+    class Meta:
+        model = EvaluationJob
+        fields = ['job_id', 'status', 'error', 'attempts', 'created_at', 'finished_at', 'answer']
+
+
 class AppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
-        fields = ['id', 'faculty', 'student', 'scheduled_at', 'status', 'notes', 'created_at']
-        read_only_fields = ['student', 'created_at']
+        fields = ['id', 'faculty', 'student', 'scheduled_at', 'duration_minutes', 'status', 'notes', 'created_at']
+        read_only_fields = ['student', 'duration_minutes', 'created_at']
 
     def validate(self, attrs):
         faculty = attrs.get('faculty')
@@ -70,7 +102,25 @@ class FacultyAppointmentListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Appointment
-        fields = ['id', 'faculty', 'student', 'scheduled_at', 'status', 'notes', 'created_at']
+        fields = ['id', 'faculty', 'student', 'scheduled_at', 'duration_minutes', 'status', 'notes', 'created_at']
+
+
+class FacultyRosterSerializer(FacultyAppointmentListSerializer):
+    """Appointment plus the student stats annotated by views._with_student_stats."""
+    student_stats = serializers.SerializerMethodField()
+
+    class Meta(FacultyAppointmentListSerializer.Meta):
+        fields = FacultyAppointmentListSerializer.Meta.fields + ['student_stats']
+
+    def get_student_stats(self, obj):
+        average = obj.student_average_score
+        return {
+            'answer_count': obj.student_answer_count or 0,
+            'average_score': round(average, 1) if average is not None else None,
+            'latest_score': obj.student_latest_score,
+            'weakest_subcategory': obj.student_weakest_subcategory,
+            'has_cv': obj.student_has_cv,
+        }
 
 
 class StudentAppointmentSerializer(serializers.ModelSerializer):
@@ -78,10 +128,32 @@ class StudentAppointmentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Appointment
-        fields = ['id', 'faculty', 'scheduled_at', 'status', 'notes', 'created_at']
+        fields = ['id', 'faculty', 'scheduled_at', 'duration_minutes', 'status', 'notes', 'created_at']
+
+
+class FacultyAvailabilitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FacultyAvailability
+        fields = ['id', 'weekday', 'start_time', 'end_time', 'slot_minutes']
+
+    def validate(self, attrs):
+        if attrs['end_time'] <= attrs['start_time']:
+            raise serializers.ValidationError({'end_time': 'Must be after start_time.'})
+        return attrs
+
+
+class SparseFieldsetMixin:
+    """Accepts a ``fields`` keyword listing the only fields to include in the output."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
 
-class AnswerWithQuestionSerializer(serializers.ModelSerializer):
+class AnswerWithQuestionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     question = QuestionSerializer(read_only=True)
 
     class Meta:
@@ -92,7 +164,7 @@ class AnswerWithQuestionSerializer(serializers.ModelSerializer):
 class CVSerializer(serializers.ModelSerializer):
     class Meta:
         model = CV
-        fields = ['id', 'filename', 'uploaded_at']
+        fields = ['id', 'filename', 'size_bytes', 'uploaded_at']
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import progress, question_cache, rollups
+from .authentication import forget_user_state
+from .models import CV, AnswerModel, CustomUser, QuestionModel
+
+ROLLUP_FIELDS = {'score', 'question', 'student', 'created_at'}
+
+
+@receiver(pre_save, sender=AnswerModel)
+def remember_stored_answer(sender, instance, update_fields=None, **kwargs):
+    instance._rollup_previous = None
+    instance._rollup_skip = update_fields is not None and not ROLLUP_FIELDS & set(update_fields)
+    if instance.pk is not None and not instance._rollup_skip:
+        instance._rollup_previous = rollups.stored_answer_fact(instance.pk)
+
+
+@receiver(post_save, sender=AnswerModel)
+def update_rollups_on_save(sender, instance, created, **kwargs):
+    if getattr(instance, '_rollup_skip', False):
+        return
+    previous = None if created else instance._rollup_previous
+    current = rollups.answer_fact(instance)
+    if previous != current:
+        rollups.remove(previous)
+        rollups.add(current)
+
+
+@receiver(post_save, sender=AnswerModel)
+def update_progress_on_save(sender, instance, created, **kwargs):
+    if created:
+        progress.answers_created(instance.student_id, [instance])
+        return
+    if getattr(instance, '_rollup_skip', False):
+        return
+    previous = instance._rollup_previous
+    current = rollups.answer_fact(instance)
+    if previous is None and current is not None:
+        progress.answer_scored(instance, current)
+    elif previous != current:
+        # Rescored or moved; rebuild from scratch on the next read.
+        progress.invalidate(previous and previous['student_id'], current and current['student_id'])
+
+
+@receiver(post_delete, sender=AnswerModel)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    rollups.remove(rollups.answer_fact(instance))
+
+
+@receiver(post_delete, sender=AnswerModel)
+def update_progress_on_delete(sender, instance, **kwargs):
+    progress.invalidate(instance.student_id)
+
+
+@receiver(post_delete, sender=CV)
+def delete_cv_file(sender, instance, **kwargs):
+    if instance.pdf:
+        instance.pdf.delete(save=False)
+
+
+@receiver(post_save, sender=QuestionModel)
+@receiver(post_delete, sender=QuestionModel)
+def bump_question_bank_version(sender, **kwargs):
+    transaction.on_commit(question_cache.bump_version)
+
+
+@receiver(pre_save, sender=QuestionModel)
+def remember_stored_question(sender, instance, update_fields=None, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk is not None and (update_fields is None or set(rollups.QUESTION_FIELDS) & set(update_fields)):
+        instance._rollup_previous = (
+            QuestionModel.objects.filter(pk=instance.pk).values_list(*rollups.QUESTION_FIELDS).first()
+        )
+
+
+@receiver(post_save, sender=QuestionModel)
+def move_rollups_for_question(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    current = tuple(getattr(instance, name) for name in rollups.QUESTION_FIELDS)
+    if not created and previous is not None and previous != current:
+        rollups.move_question(instance.pk, previous, current)
+
+
+@receiver(post_save, sender=QuestionModel)
+def invalidate_progress_for_question(sender, instance, created, **kwargs):
+    # Snapshots group scores by the question's category and subcategory.
+    if not created:
+        progress.invalidate(*instance.question_answers.values_list('student_id', flat=True).distinct())
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_auth_state(sender, instance, **kwargs):
+    transaction.on_commit(lambda: forget_user_state(instance.pk))
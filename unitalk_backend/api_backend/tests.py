@@ -1,3 +1,1198 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import datetime
+import hashlib
+import io
+import json
+import random
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+import zlib
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import (
+    authentication, benchmarks, evaluation_cache, evaluation_jobs, evaluators, openai_service, progress, question_cache,
+    question_index, ratelimit, rollups, scheduling,
+)
+from .models import (
+    AnswerModel, CustomUser, CV, Appointment, EvaluationCacheEntry, EvaluationJob, EvaluationUsage, FacultyAvailability,
+    QuestionModel, RateLimitBucket, question_text_hash,
+)
+
+TEMP_MEDIA = tempfile.mkdtemp()
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'cvs': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': TEMP_MEDIA}},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class CVQueryTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA, ignore_errors=True)
+
+    def setUp(self):
+        self.student = CustomUser.objects.create_user(username='student', password='pw', user_type='student')
+        self.faculty = CustomUser.objects.create_user(username='faculty', password='pw', user_type='faculty')
+        Appointment.objects.create(faculty=self.faculty, student=self.student, scheduled_at=timezone.now())
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        pdf = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 test', content_type='application/pdf')
+        response = self.client.post('/api_backend/student/cv/', {'pdf': pdf})
+        self.assertEqual(response.status_code, 201)
+
+    def assertBlobNotSelected(self, queries):
+        for query in queries:
+            self.assertNotIn('pdf_base64', query['sql'])
+
+    def test_student_metadata_does_not_select_blob(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api_backend/student/cv/')
+        self.assertEqual(response.data['filename'], 'cv.pdf')
+        self.assertEqual(response.data['size_bytes'], 13)
+        self.assertBlobNotSelected(queries)
+
+    def test_faculty_metadata_does_not_select_blob(self):
+        self.client.force_authenticate(self.faculty)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api_backend/faculty/student/{self.student.id}/cv/')
+        self.assertEqual(response.data['filename'], 'cv.pdf')
+        self.assertBlobNotSelected(queries)
+
+    def test_upload_and_download_do_not_select_blob(self):
+        pdf = SimpleUploadedFile('new.pdf', b'%PDF-1.4 replaced', content_type='application/pdf')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post('/api_backend/student/cv/', {'pdf': pdf})
+            response = self.client.get('/api_backend/student/cv/pdf/')
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 replaced')
+        self.assertBlobNotSelected(queries)
+
+    def test_default_manager_defers_blob(self):
+        cv = CV.objects.get(student=self.student)
+        self.assertIn('pdf_base64', cv.get_deferred_fields())
+        self.assertTrue(CV.objects.with_pdf().filter(student=self.student).exists())
+
+    def test_replaced_file_is_deleted_only_after_commit(self):
+        old_name = CV.objects.get(student=self.student).pdf.name
+        storage = CV._meta.get_field('pdf').storage
+        pdf = SimpleUploadedFile('new.pdf', b'%PDF-1.4 replaced', content_type='application/pdf')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post('/api_backend/student/cv/', {'pdf': pdf})
+        self.assertTrue(storage.exists(old_name))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(storage.exists(old_name))
+
+    def test_legacy_blob_is_served_until_moved(self):
+        legacy = CustomUser.objects.create_user(username='legacy', password='pw', user_type='student')
+        pdf_bytes = b'%PDF-1.4 legacy'
+        CV.objects.create(
+            student=legacy, pdf_base64=base64.b64encode(pdf_bytes).decode(), has_pdf=True,
+            size_bytes=len(pdf_bytes), checksum=hashlib.sha256(pdf_bytes).hexdigest(),
+        )
+        self.client.force_authenticate(legacy)
+        response = self.client.get('/api_backend/student/cv/pdf/')
+        self.assertEqual(b''.join(response.streaming_content), pdf_bytes)
+
+        with self.assertRaises(CommandError):
+            call_command('move_cvs_to_storage', stdout=io.StringIO())
+        self.assertFalse(CV.objects.get(student=legacy).pdf)
+        call_command('move_cvs_to_storage', allow_local_storage=True, clear_legacy=True, stdout=io.StringIO())
+        cv = CV.objects.with_blob().get(student=legacy)
+        self.assertEqual((cv.pdf_base64, cv.pdf.read()), ('', pdf_bytes))
+
+
+@override_settings(EVALUATION_WORKERS=0, EVALUATION_MAX_ATTEMPTS=2, EVALUATION_RETRY_DELAY=10)
+class EvaluationJobTests(TestCase):
+    def setUp(self):
+        self.question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium')
+        self.client = APIClient()
+
+    def submit(self):
+        response = self.client.post(f'/api_backend/questions/{self.question.id}/submit-answer/', {'answer': 'Project cash flows.'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        return response.data
+
+    def test_job_is_polled_by_token_not_pk(self):
+        job = self.submit()
+        self.assertEqual(str(EvaluationJob.objects.get().token), job['job_id'])
+        self.assertEqual(self.client.get(f'/api_backend/evaluations/{job["job_id"]}/').status_code, 200)
+        self.assertEqual(self.client.get(f'/api_backend/evaluations/{EvaluationJob.objects.get().pk}/').status_code, 404)
+
+    def test_unexpected_error_backs_off_then_fails(self):
+        self.submit()
+        with mock.patch.object(evaluation_jobs.evaluators, 'evaluate', side_effect=RuntimeError('boom')), \
+                self.assertLogs('api_backend.evaluation_jobs', 'WARNING'):
+            [job] = evaluation_jobs.claim_next_jobs()
+            evaluation_jobs.run_jobs([job])
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.error), ('pending', 'boom'))
+            self.assertGreater(job.not_before, timezone.now())
+            # Not claimable again until the backoff has passed.
+            self.assertEqual(evaluation_jobs.claim_next_jobs(), [])
+
+            EvaluationJob.objects.update(not_before=timezone.now())
+            evaluation_jobs.run_jobs(evaluation_jobs.claim_next_jobs())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+    def test_batch_is_queued_and_evaluated_in_one_call(self):
+        url = '/api_backend/questions/submit-answers/'
+        payload = {'answers': [{'question': self.question.id, 'answer': f'Answer {i}'} for i in range(3)]}
+        self.assertEqual(self.client.post(url, payload, format='json').status_code, 401)
+
+        student = CustomUser.objects.create_user(username='batcher', password='pw', user_type='student')
+        self.client.force_authenticate(student)
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual([job['status'] for job in response.data], ['pending'] * 3)
+        self.assertFalse(AnswerModel.objects.filter(score__isnull=False).exists())
+
+        result = {'score': 70, 'strengths': ['Clear'], 'weaknesses': [], 'tier': 'full', 'evaluation_ms': 5}
+        with mock.patch.object(evaluation_jobs.evaluators, 'evaluate_batch', return_value=[result] * 3) as evaluate_batch:
+            self.assertEqual(evaluation_jobs.drain(), 3)
+        evaluate_batch.assert_called_once()
+        self.assertEqual(AnswerModel.objects.filter(student=student, score=70).count(), 3)
+
+    def test_sweep_reclaims_jobs_left_by_a_previous_process(self):
+        for _ in range(3):
+            self.submit()
+        dead, retry_due, retry_later = EvaluationJob.objects.order_by('id')
+        long_ago = timezone.now() - datetime.timedelta(seconds=settings.EVALUATION_JOB_TIMEOUT + 1)
+        EvaluationJob.objects.filter(pk=dead.pk).update(status='running', started_at=long_ago, attempts=1)
+        EvaluationJob.objects.filter(pk=retry_due.pk).update(not_before=timezone.now())
+        EvaluationJob.objects.filter(pk=retry_later.pk).update(not_before=timezone.now() + datetime.timedelta(minutes=5))
+
+        result = {'score': 70, 'strengths': ['Clear'], 'weaknesses': [], 'tier': 'full', 'evaluation_ms': 5}
+        with mock.patch.object(evaluation_jobs.evaluators, 'evaluate', return_value=result):
+            self.assertEqual(evaluation_jobs.drain(), 2)
+        statuses = dict(EvaluationJob.objects.values_list('pk', 'status'))
+        self.assertEqual([statuses[job.pk] for job in (dead, retry_due, retry_later)], ['done', 'done', 'pending'])
+
+    @override_settings(EVALUATION_WORKERS=2, EVALUATION_SWEEP_INTERVAL=30)
+    def test_sweeper_starts_once_and_wakes_the_pool_periodically(self):
+        with mock.patch.object(evaluation_jobs, '_sweeper', None), \
+                mock.patch.object(evaluation_jobs.threading, 'Thread') as thread:
+            evaluation_jobs.start_sweeper()
+            evaluation_jobs.start_sweeper()
+        thread.assert_called_once_with(target=evaluation_jobs._sweep, name='evaluation-sweeper', daemon=True)
+        thread.return_value.start.assert_called_once_with()
+
+        class Stop(Exception):
+            pass
+
+        with mock.patch.object(evaluation_jobs, '_wake') as wake, \
+                mock.patch.object(evaluation_jobs.time, 'sleep', side_effect=[None, Stop]) as sleep:
+            with self.assertRaises(Stop):
+                evaluation_jobs._sweep()
+        self.assertEqual(wake.call_count, 2)
+        sleep.assert_called_with(30)
+
+    @override_settings(EVALUATION_WORKERS=0)
+    def test_no_sweeper_without_in_process_workers(self):
+        with mock.patch.object(evaluation_jobs, '_sweeper', None), \
+                mock.patch.object(evaluation_jobs.threading, 'Thread') as thread:
+            self.assertIsNone(evaluation_jobs.start_sweeper())
+        thread.assert_not_called()
+
+    def test_busy_evaluator_requeues_with_delay_and_stops_draining(self):
+        self.submit()
+        self.submit()
+        busy = evaluation_jobs.EvaluatorBusyError('busy')
+        with mock.patch.object(evaluation_jobs.evaluators, 'evaluate', side_effect=busy) as evaluate:
+            self.assertEqual(evaluation_jobs.drain(), 0)
+        evaluate.assert_called_once()
+        job = EvaluationJob.objects.order_by('id').first()
+        self.assertEqual((job.status, job.attempts), ('pending', 0))
+        self.assertGreater(job.not_before, timezone.now())
+
+
+@override_settings(EVALUATOR_BACKEND='tiered', EVALUATOR_FALLBACK_BACKEND='', EVALUATION_CACHE_ENABLED=True)
+class TieredEvaluatorTests(TestCase):
+    ANSWER = 'I would project free cash flows and discount them at the weighted cost of capital.'
+
+    def setUp(self):
+        self.question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium')
+        self.full = {'score': 80, 'strengths': ['Structured'], 'weaknesses': []}
+
+    def test_unparseable_screen_output_escalates(self):
+        with mock.patch.object(openai_service, 'screen_answer', side_effect=ValueError('Failed to parse')), \
+                mock.patch.object(openai_service, 'evaluate_answer', return_value=dict(self.full)), \
+                self.assertLogs('api_backend.evaluators', 'WARNING'):
+            evaluation = evaluators.evaluate(self.question, self.ANSWER)
+        self.assertEqual((evaluation['score'], evaluation['tier']), (80, 'full'))
+
+    def test_screen_outage_is_not_escalated(self):
+        error = openai_service.EvaluatorUnavailableError('down')
+        with mock.patch.object(openai_service, 'screen_answer', side_effect=error), \
+                mock.patch.object(openai_service, 'evaluate_answer') as evaluate_answer:
+            with self.assertRaises(openai_service.EvaluatorUnavailableError):
+                evaluators.evaluate(self.question, self.ANSWER)
+        evaluate_answer.assert_not_called()
+
+    @override_settings(EVALUATION_MIN_WORDS=0)
+    def test_answers_without_letters_are_screened_out(self):
+        for answer in ('', '   ', '123 456 !!! 7.5%'):
+            with self.subTest(answer=answer):
+                evaluation = evaluators.prescreen(self.question, answer)
+                self.assertEqual((evaluation['score'], evaluation['tier']), (0, 'rules'))
+                self.assertIn('garbled', evaluation['weaknesses'][0])
+        # Letters but no ASCII words.
+        self.assertIn('English', evaluators.prescreen(self.question, '现金流折现')['weaknesses'][0])
+
+    def test_cache_hits_report_the_cache_tier(self):
+        self.question.difficulty = 'Hard'
+        with mock.patch.object(openai_service, '_request_evaluation', return_value=dict(self.full)) as request:
+            first = evaluators.evaluate(self.question, self.ANSWER)
+            second = evaluators.evaluate(self.question, self.ANSWER)
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual((first['tier'], second['tier']), ('full', 'cache'))
+        self.assertEqual(second['score'], 80)
+
+
+@override_settings(EVALUATOR_BACKEND='openai', EVALUATOR_FALLBACK_BACKEND='heuristic', EVALUATOR_FALLBACK_COOLDOWN=30)
+class EvaluatorRegistryTests(TestCase):
+    ANSWER = 'First I would project free cash flows, then discount them at the weighted cost of capital.'
+
+    def setUp(self):
+        self.question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium', category='Consulting')
+        patcher = mock.patch.dict(evaluators._skip_until, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.outage = mock.patch.object(
+            openai_service, 'evaluate_answer', side_effect=openai_service.EvaluatorUnavailableError('down'),
+        )
+
+    def test_registry_resolves_the_configured_backend(self):
+        self.assertIsInstance(evaluators.evaluator_for(self.question), evaluators.OpenAIEvaluator)
+        with override_settings(EVALUATOR_BACKENDS_BY_CATEGORY={'Consulting': 'heuristic'}):
+            self.assertIsInstance(evaluators.evaluator_for(self.question), evaluators.HeuristicEvaluator)
+        with override_settings(EVALUATOR_BACKEND='tiered'):
+            self.assertIsInstance(evaluators.evaluator_for(self.question), evaluators.TieredEvaluator)
+        self.assertIs(evaluators.get_evaluator('heuristic'), evaluators.get_evaluator('heuristic'))
+        with self.assertRaisesMessage(ValueError, "Unknown evaluator backend 'nope'"):
+            evaluators.get_evaluator('nope')
+
+    def test_outage_falls_back_to_the_heuristic_and_skips_the_primary(self):
+        with self.outage as evaluate_answer, self.assertLogs('api_backend.evaluators', 'WARNING'):
+            first = evaluators.evaluate(self.question, self.ANSWER)
+            second = evaluators.evaluate(self.question, self.ANSWER)
+        self.assertEqual((first['tier'], second['tier']), ('heuristic', 'heuristic'))
+        self.assertEqual(first['score'], evaluators.HeuristicEvaluator().evaluate(self.question, self.ANSWER)['score'])
+        self.assertIn('evaluation_ms', first)
+        # The second answer went straight to the fallback instead of waiting on the outage.
+        self.assertEqual(evaluate_answer.call_count, 1)
+
+    def test_primary_is_tried_again_once_the_cooldown_expires(self):
+        full = {'score': 80, 'strengths': [], 'weaknesses': []}
+        with mock.patch.object(evaluators.time, 'monotonic', return_value=1000.0):
+            with self.outage, self.assertLogs('api_backend.evaluators', 'WARNING'):
+                evaluators.evaluate(self.question, self.ANSWER)
+        with mock.patch.object(openai_service, 'evaluate_answer', return_value=dict(full)) as evaluate_answer:
+            with mock.patch.object(evaluators.time, 'monotonic', return_value=1029.0):
+                self.assertEqual(evaluators.evaluate(self.question, self.ANSWER)['tier'], 'heuristic')
+            evaluate_answer.assert_not_called()
+            with mock.patch.object(evaluators.time, 'monotonic', return_value=1031.0):
+                self.assertEqual(evaluators.evaluate(self.question, self.ANSWER)['tier'], 'full')
+            evaluate_answer.assert_called_once()
+
+    def test_batches_fall_back_and_a_missing_fallback_raises(self):
+        with mock.patch.object(
+            openai_service, 'evaluate_answers_batch', side_effect=openai_service.EvaluatorUnavailableError('down'),
+        ), self.assertLogs('api_backend.evaluators', 'WARNING'):
+            results = evaluators.evaluate_batch([(self.question, self.ANSWER), (self.question, 'um')])
+        self.assertEqual([result['tier'] for result in results], ['heuristic', 'heuristic'])
+        with override_settings(EVALUATOR_FALLBACK_BACKEND=''), self.outage:
+            with self.assertRaises(openai_service.EvaluatorUnavailableError):
+                evaluators.evaluate(self.question, self.ANSWER)
+
+    async def test_stream_falls_back_before_anything_is_sent(self):
+        async def outage(*args):
+            raise openai_service.EvaluatorUnavailableError('down')
+            yield
+
+        with mock.patch.object(openai_service, 'stream_evaluation', outage), self.assertLogs('api_backend.evaluators', 'WARNING'):
+            items = [item async for item in evaluators.stream(self.question, self.ANSWER)]
+        field, result = items[-1]
+        self.assertEqual((field, result['tier']), ('result', 'heuristic'))
+
+
+class EvaluationUsageTests(TestCase):
+    def setUp(self):
+        self.faculty = CustomUser.objects.create_user(username='usage_faculty', password='pw', user_type='faculty')
+        self.client = APIClient()
+
+    def usage_row(self, days_ago, **fields):
+        row = EvaluationUsage.objects.create(kind='single', **fields)
+        EvaluationUsage.objects.filter(pk=row.pk).update(created_at=timezone.now() - timezone.timedelta(days=days_ago))
+
+    @override_settings(EVALUATOR_BACKEND='openai', EVALUATION_CACHE_ENABLED=False, EVALUATION_WORKERS=0)
+    def test_evaluation_records_tokens_latency_and_tier(self):
+        question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium', category='Consulting')
+        completion = SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=1200, completion_tokens=150, prompt_tokens_details=SimpleNamespace(cached_tokens=1024)),
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({'score': 72, 'strengths': ['Clear'], 'weaknesses': []})))],
+        )
+
+        def slow_completion(**kwargs):
+            time.sleep(0.02)
+            return completion
+
+        response = self.client.post(f'/api_backend/questions/{question.id}/submit-answer/', {'answer': 'Project cash flows.'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        with mock.patch.object(openai_service, '_create_completion', side_effect=slow_completion):
+            self.assertEqual(evaluation_jobs.drain(), 1)
+
+        row = EvaluationUsage.objects.get()
+        self.assertEqual(
+            (row.model, row.kind, row.category, row.item_count, row.prompt_tokens, row.cached_tokens, row.completion_tokens),
+            (openai_service.MODEL, 'single', 'Consulting', 1, 1200, 1024, 150),
+        )
+        self.assertGreaterEqual(row.latency_ms, 20)
+        answer = AnswerModel.objects.get()
+        self.assertEqual((answer.score, answer.evaluation_tier), (72, 'full'))
+        self.assertGreaterEqual(answer.evaluation_ms, row.latency_ms)
+
+    def test_usage_report_sums_each_day_and_category(self):
+        tokens = {'prompt_tokens': 10000, 'cached_tokens': 4000, 'completion_tokens': 1000}
+        self.usage_row(0, model='gpt-4o', category='Consulting', latency_ms=100, **tokens)
+        self.usage_row(0, model='gpt-4o', category='Consulting', latency_ms=300, **tokens)
+        self.usage_row(0, model='gpt-4o-mini', category='Investment Banking', latency_ms=50, prompt_tokens=10000, completion_tokens=1000)
+        self.usage_row(3, model='gpt-4o', category='Consulting', latency_ms=200, item_count=4, **tokens)
+        self.usage_row(3, model='unpriced-model', category='Consulting', latency_ms=200, **tokens)
+        self.usage_row(40, model='gpt-4o', category='Consulting', latency_ms=900, **tokens)
+
+        self.client.force_authenticate(self.faculty)
+        response = self.client.get('/api_backend/faculty/evaluations/usage/', {'days': 30})
+        self.assertEqual(response.status_code, 200)
+        today = timezone.localdate()
+        self.assertEqual(
+            [(row['day'], row['category'], row['calls'], row['items'], row['cost_usd'], row['average_latency_ms']) for row in response.data['results']],
+            [
+                (today - datetime.timedelta(days=3), 'Consulting', 2, 5, 0.03, 200),
+                (today, 'Consulting', 2, 2, 0.06, 200),
+                (today, 'Investment Banking', 1, 1, 0.0021, 50),
+            ],
+        )
+        totals = response.data['totals']
+        self.assertEqual((totals['calls'], totals['prompt_tokens'], totals['cached_tokens']), (5, 50000, 16000))
+        self.assertEqual((totals['cost_usd'], totals['cached_share']), (0.0921, 0.32))
+        self.assertEqual(response.data['unpriced_models'], ['unpriced-model'])
+
+        self.client.force_authenticate(CustomUser.objects.create_user(username='usage_student', password='pw', user_type='student'))
+        self.assertEqual(self.client.get('/api_backend/faculty/evaluations/usage/').status_code, 403)
+
+    def test_tier_report_groups_answers_by_tier(self):
+        question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium')
+        student = CustomUser.objects.create_user(username='tiered', password='pw', user_type='student')
+        for tier, score, evaluation_ms, days_ago in (
+            ('rules', 0, 1, 0), ('screen', 60, 100, 0), ('screen', 80, 300, 1), ('full', 90, 2000, 2),
+            ('full', 10, 9000, 40), ('', None, None, 0),
+        ):
+            answer = AnswerModel.objects.create(
+                question=question, student=student, answer='...', score=score, evaluation_tier=tier, evaluation_ms=evaluation_ms,
+            )
+            AnswerModel.objects.filter(pk=answer.pk).update(created_at=timezone.now() - timezone.timedelta(days=days_ago))
+
+        self.client.force_authenticate(self.faculty)
+        response = self.client.get('/api_backend/faculty/evaluations/tiers/', {'days': 30})
+        self.assertEqual(response.data['total_answers'], 4)
+        self.assertEqual(
+            [(row['tier'], row['count'], row['share'], row['average_score'], row['average_ms'], row['max_ms']) for row in response.data['tiers']],
+            [('full', 1, 0.25, 90.0, 2000, 2000), ('rules', 1, 0.25, 0.0, 1, 1), ('screen', 2, 0.5, 70.0, 200, 300)],
+        )
+
+
+@override_settings(EVALUATION_CACHE_ENABLED=True, EVALUATION_CACHE_EVICT_EVERY=1)
+class EvaluationCacheTests(TestCase):
+    ANSWER = 'I would project free cash flows and discount them at the WACC.'
+
+    def setUp(self):
+        self.question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium')
+        patcher = mock.patch.object(
+            openai_service, '_request_evaluation', side_effect=lambda *args, **kwargs: {'score': 70, 'strengths': [], 'weaknesses': []},
+        )
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_identical_question_and_answer_hit(self):
+        first = openai_service.evaluate_answer(self.question, self.ANSWER)
+        second = openai_service.evaluate_answer(self.question, '  i would project free cash flows and   discount them at the wacc. ')
+        self.assertEqual(self.request.call_count, 1)
+        self.assertNotIn('tier', first)
+        self.assertEqual((second['score'], second['tier']), (70, 'cache'))
+        self.assertEqual(EvaluationCacheEntry.objects.get().hits, 1)
+
+    def test_rubric_model_or_question_changes_miss(self):
+        openai_service.evaluate_answer(self.question, self.ANSWER)
+        with mock.patch.object(openai_service, 'RUBRIC', openai_service.RUBRIC + '\nPenalise jargon.'):
+            self.assertNotIn('tier', openai_service.evaluate_answer(self.question, self.ANSWER))
+        with mock.patch.object(openai_service, 'MODEL', 'gpt-4o-mini'):
+            self.assertNotIn('tier', openai_service.evaluate_answer(self.question, self.ANSWER))
+        self.question.difficulty = 'Hard'
+        self.assertNotIn('tier', openai_service.evaluate_answer(self.question, self.ANSWER))
+        self.assertEqual(self.request.call_count, 4)
+        # Each store evicts entries written under another rubric version.
+        self.assertEqual(
+            set(EvaluationCacheEntry.objects.values_list('rubric_version', flat=True)),
+            {evaluation_cache.rubric_version(openai_service.RUBRIC, openai_service.MODEL)},
+        )
+
+    @override_settings(EVALUATION_CACHE_TTL=60)
+    def test_expired_entries_miss(self):
+        openai_service.evaluate_answer(self.question, self.ANSWER)
+        EvaluationCacheEntry.objects.update(created_at=timezone.now() - timezone.timedelta(seconds=61))
+        self.assertNotIn('tier', openai_service.evaluate_answer(self.question, self.ANSWER))
+        self.assertEqual(self.request.call_count, 2)
+
+    @override_settings(EVALUATION_CACHE_MAX_ENTRIES=3)
+    def test_eviction_keeps_the_table_at_its_cap(self):
+        version = evaluation_cache.rubric_version(openai_service.RUBRIC, openai_service.MODEL)
+        for i in range(3):
+            evaluation_cache.store(f'key{i}', version, {'score': i})
+            EvaluationCacheEntry.objects.filter(key=f'key{i}').update(last_used_at=timezone.now() - timezone.timedelta(minutes=10 - i))
+        # A hit makes key0 the most recently used, so key1 is evicted first.
+        self.assertEqual(evaluation_cache.lookup('key0', version)['score'], 0)
+        for i in range(3, 5):
+            evaluation_cache.store(f'key{i}', version, {'score': i})
+            self.assertEqual(EvaluationCacheEntry.objects.count(), 3)
+        self.assertEqual(set(EvaluationCacheEntry.objects.values_list('key', flat=True)), {'key0', 'key3', 'key4'})
+
+
+@override_settings(RATE_LIMIT_STORE='database')
+class RateLimitTests(TestCase):
+    def setUp(self):
+        self.question = QuestionModel.objects.create(question='Walk me through a DCF.', difficulty='Medium')
+        self.client = APIClient()
+
+    def submit(self, **extra):
+        return self.client.post(f'/api_backend/questions/{self.question.id}/submit-answer/', {'answer': 'Cash flows.'}, format='json', **extra)
+
+    def test_bucket_refills_linearly_up_to_capacity(self):
+        self.assertEqual(ratelimit.parse_rate('20/min'), (20, 20 / 60))
+        self.assertEqual(ratelimit._refill(0, 100, 115, 20, 20 / 60), 5)
+        self.assertEqual(ratelimit._refill(18, 100, 160, 20, 20 / 60), 20)
+
+    def test_take_returns_the_wait_until_enough_tokens(self):
+        with mock.patch.object(ratelimit.time, 'time', return_value=1000.0) as clock:
+            self.assertEqual(ratelimit.take('test', '2/min'), 0)
+            self.assertEqual(ratelimit.take('test', '2/min'), 0)
+            self.assertEqual(ratelimit.take('test', '2/min'), 30)
+            clock.return_value = 1030.0
+            self.assertEqual(ratelimit.take('test', '2/min'), 0)
+            # A cost above capacity is capped, so an oversized request can still get through.
+            self.assertEqual(ratelimit.take('other', '2/min', cost=5), 0)
+
+    @override_settings(RATE_LIMITS={'evaluation_ip': '1/min'})
+    def test_throttled_request_gets_429_with_retry_after(self):
+        self.assertEqual(self.submit().status_code, 202)
+        response = self.submit()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+
+    @override_settings(RATE_LIMITS={'evaluation_ip': '1/min'})
+    def test_forwarded_for_cannot_be_spoofed(self):
+        # Render appends the address it saw; anything before that is client-supplied.
+        self.assertEqual(self.submit(HTTP_X_FORWARDED_FOR='1.1.1.1, 203.0.113.7').status_code, 202)
+        self.assertEqual(self.submit(HTTP_X_FORWARDED_FOR='2.2.2.2, 203.0.113.7').status_code, 429)
+        self.assertEqual(list(RateLimitBucket.objects.values_list('key', flat=True)), ['evaluation_ip:203.0.113.7'])
+
+    @override_settings(RATE_LIMITS={'evaluation_user': '3/min'})
+    def test_batch_costs_one_token_per_answer(self):
+        self.client.force_authenticate(CustomUser.objects.create_user(username='student', password='pw', user_type='student'))
+        batch = {'answers': [{'question': self.question.id, 'answer': 'Cash flows.'}] * 2}
+        self.assertEqual(self.client.post('/api_backend/questions/submit-answers/', batch, format='json').status_code, 202)
+        self.assertEqual(self.client.post('/api_backend/questions/submit-answers/', batch, format='json').status_code, 429)
+        self.assertEqual(self.submit().status_code, 202)
+
+
+class StreamingEvaluationParserTests(SimpleTestCase):
+    RESPONSE = (
+        '{"strengths": ["Clear \\"structure\\"", "Uses [brackets], {braces}"], '
+        '"notes": {"strengths": ["nested, ignored"]}, '
+        '"weaknesses": ["No numbers"], "score": 150}'
+    )
+
+    def test_items_are_emitted_as_soon_as_their_string_closes(self):
+        parser = openai_service.StreamingEvaluationParser()
+        emitted = []
+        for position, ch in enumerate(self.RESPONSE):
+            for item in parser.feed(ch):
+                emitted.append((position, item))
+        self.assertEqual([item for _, item in emitted], [
+            ('strengths', 'Clear "structure"'),
+            ('strengths', 'Uses [brackets], {braces}'),
+            ('weaknesses', 'No numbers'),
+        ])
+        first_close = self.RESPONSE.index('",')
+        self.assertEqual(emitted[0][0], first_close)
+
+    def test_chunk_boundaries_do_not_matter(self):
+        parser = openai_service.StreamingEvaluationParser()
+        items = []
+        for start in range(0, len(self.RESPONSE), 7):
+            items += parser.feed(self.RESPONSE[start:start + 7])
+        self.assertEqual(len(items), 3)
+        self.assertEqual(parser.result(), {
+            'score': 100,
+            'strengths': ['Clear "structure"', 'Uses [brackets], {braces}'],
+            'weaknesses': ['No numbers'],
+        })
+
+    def test_incomplete_response_fails_to_parse(self):
+        parser = openai_service.StreamingEvaluationParser()
+        self.assertEqual(parser.feed('{"strengths": ["Half'), [])
+        with self.assertRaises(ValueError):
+            parser.result()
+
+
+@override_settings(OPENAI_QUEUE_TIMEOUT=0.3)
+class StreamLimiterTests(SimpleTestCase):
+    def test_stream_path_waits_for_a_free_slot_like_the_sync_path(self):
+        limiter = threading.BoundedSemaphore(1)
+        limiter.acquire()
+        with mock.patch.object(openai_service, '_inflight', limiter):
+            threading.Timer(0.1, limiter.release).start()
+            self.assertTrue(asyncio.run(openai_service._acquire_async()))
+            # Still held: gives up after OPENAI_QUEUE_TIMEOUT.
+            self.assertFalse(asyncio.run(openai_service._acquire_async()))
+
+
+class QuestionRollupTests(TestCase):
+    def test_editing_a_question_moves_its_answers_between_buckets(self):
+        question = QuestionModel.objects.create(question='Size the market for e-bikes.', difficulty='Easy', category='Consulting')
+        other = QuestionModel.objects.create(question='What is WACC?', difficulty='Easy', category='Consulting')
+        student = CustomUser.objects.create_user(username='rollup', password='pw', user_type='student')
+        for days_ago, score in ((0, 60), (0, 80), (3, 50)):
+            answer = AnswerModel.objects.create(question=question, student=student, answer='...', score=score)
+            AnswerModel.objects.filter(pk=answer.pk).update(created_at=timezone.now() - timezone.timedelta(days=days_ago))
+        AnswerModel.objects.create(question=other, student=student, answer='...', score=70)
+        call_command('rebuild_analytics_rollups', stdout=io.StringIO())
+
+        question.difficulty = 'Hard'
+        question.category = 'Investment Banking'
+        question.save()
+        self.assertEqual(rollups.stored_rollups(), rollups.expected_rollups())
+
+        # A save that does not touch the grouping fields leaves the rollups alone.
+        with CaptureQueriesContext(connection) as queries:
+            question.save(update_fields=['question'])
+        self.assertFalse([q for q in queries if 'rollup' in q['sql'].lower()])
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.student = CustomUser.objects.create_user(username='pager', password='pw', user_type='student')
+        self.faculty = CustomUser.objects.create_user(username='pager_faculty', password='pw', user_type='faculty')
+        self.client = APIClient()
+
+    def test_malformed_cursors_are_a_400(self):
+        cursors = [
+            base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            for payload in (['garbage', 1], [None, 1], ['2026-01-01T00:00:00Z', 'x'], 5, ['only-one'])
+        ] + ['not base64!']
+        for user, url in ((self.student, '/api_backend/student/answers/'), (self.faculty, '/api_backend/faculty/appointments/')):
+            self.client.force_authenticate(user)
+            for cursor in cursors:
+                with self.subTest(url=url, cursor=cursor):
+                    response = self.client.get(url, {'limit': 2, 'cursor': cursor})
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn('cursor', response.data)
+
+
+class QuestionCacheTests(TestCase):
+    URL = '/api_backend/questions/'
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.question = QuestionModel.objects.create(question='What is EBITDA?', difficulty='Easy')
+
+    def test_matching_etag_is_answered_without_queries(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.URL, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        # Filtered and paginated lists are not cached.
+        self.assertEqual(self.client.get(self.URL, {'difficulty': 'Easy'}, headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_saving_deleting_or_importing_bumps_the_etag(self):
+        faculty = CustomUser.objects.create_user(username='bank_faculty', password='pw', user_type='faculty')
+        client = APIClient()
+        client.force_authenticate(faculty)
+
+        def save():
+            self.question.question = 'What is EBITDA margin?'
+            self.question.save()
+
+        def create():
+            QuestionModel.objects.create(question='What is WACC?', difficulty='Easy')
+
+        def delete():
+            QuestionModel.objects.get(question='What is WACC?').delete()
+
+        def import_file():
+            upload = SimpleUploadedFile('bank.csv', b'question,difficulty\nWhat is beta?,Hard\n')
+            self.assertEqual(client.post('/api_backend/faculty/questions/import/', {'file': upload}).status_code, 201)
+
+        etag = self.client.get(self.URL)['ETag']
+        for change in (save, create, delete, import_file):
+            with self.subTest(change=change.__name__):
+                with self.captureOnCommitCallbacks(execute=True):
+                    change()
+                # A stale ETag gets the current bank rather than a 304.
+                response = self.client.get(self.URL, headers={'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertEqual(
+                    sorted(question['question'] for question in response.data),
+                    sorted(QuestionModel.objects.values_list('question', flat=True)),
+                )
+                etag = response['ETag']
+
+
+class QuestionRandomTests(TestCase):
+    def test_questions_after_id_gaps_are_not_favoured(self):
+        questions = [QuestionModel.objects.create(question=f'Question {i}', difficulty='Easy') for i in range(10)]
+        QuestionModel.objects.filter(pk__in=[question.pk for question in questions[1:8]]).delete()
+        kept = [questions[0].pk, questions[8].pk, questions[9].pk]
+        client = APIClient()
+        random.seed(0)
+        picks = Counter(client.get('/api_backend/questions/random/').data['id'] for _ in range(300))
+        self.assertEqual(set(picks), set(kept))
+        # Taking the next id after a random point would pick questions[8] about 80% of the time.
+        for pk in kept:
+            self.assertGreater(picks[pk], 60)
+
+
+class QuestionIndexTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = str(Path(directory) / 'index.npz')
+        override = override_settings(QUESTION_INDEX_PATH=path)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch.object(question_index, '_index', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_search_follows_added_and_deleted_questions(self):
+        private = QuestionModel.objects.create(question='How would you value a private company?', difficulty='Medium')
+        index = question_index.get_index()
+        matches = index.search('How would you go about valuing a private company?', settings.QUESTION_SIMILAR_THRESHOLD)
+        self.assertEqual([question.pk for question, _ in matches], [private.pk])
+
+        wacc = QuestionModel.objects.create(question='What is the weighted average cost of capital?', difficulty='Easy')
+        matches = index.search('What is the WACC (weighted average cost of capital)?', settings.QUESTION_SIMILAR_THRESHOLD)
+        self.assertEqual([question.pk for question, _ in matches], [wacc.pk])
+
+        deleted_pk = private.pk
+        private.delete()
+        self.assertEqual(index.search('How would you value a private company?', settings.QUESTION_SIMILAR_THRESHOLD), [])
+        # The stale row is skipped until a rebuild drops it.
+        self.assertIn(deleted_pk, index.ids[:index.size])
+        index.rebuild()
+        self.assertNotIn(deleted_pk, index.ids[:index.size])
+
+    def test_unrelated_questions_stay_below_the_thresholds(self):
+        # Scored 0.45 with 128 columns, enough to be listed as similar and close to a 409.
+        leadership = question_index.vectorize('Tell me about a time you showed leadership.')
+        valuation = question_index.vectorize('How would you value a private company?')
+        self.assertLess(float(leadership @ valuation), settings.QUESTION_SIMILAR_THRESHOLD - 0.3)
+
+        QuestionModel.objects.create(question='Tell me about a time you showed leadership.', difficulty='Easy')
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user(username='asker', password='pw', user_type='student'))
+        response = client.post('/api_backend/questions/', {'question': 'How would you value a private company?', 'difficulty': 'Medium'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['similar_questions'], [])
+        response = client.post('/api_backend/questions/', {'question': 'Tell me about a time when you showed leadership', 'difficulty': 'Easy'})
+        self.assertEqual(response.status_code, 409)
+
+    def test_threshold_is_inclusive_and_excludes_the_question_itself(self):
+        question = QuestionModel.objects.create(question='How would you value a private company?', difficulty='Medium')
+        text = 'How would you value a private company using comparables?'
+        similarity = float(question_index.vectorize(question.question) @ question_index.vectorize(text))
+        self.assertEqual(len(question_index.find_similar(text, threshold=similarity - 1e-6)), 1)
+        self.assertEqual(question_index.find_similar(text, threshold=similarity + 1e-3), [])
+        self.assertEqual(question_index.find_similar(question.question, exclude_id=question.pk), [])
+
+    def test_merge_only_groups_questions_that_match_the_kept_question(self):
+        student = CustomUser.objects.create_user(username='deduper', password='pw', user_type='student')
+        # Each neighbour is above 0.85, but the ends of the chain are only 0.75 apart.
+        chain = [
+            QuestionModel.objects.create(question=text, difficulty='Medium')
+            for text in (
+                'How would you value a private company?',
+                'How would you value a private company using comparables?',
+                'How would you value a company using comparables?',
+            )
+        ]
+        for question in chain:
+            AnswerModel.objects.create(question=question, student=student, answer='...', score=70)
+        out = io.StringIO()
+        call_command('dedupe_questions', '--merge', threshold=0.85, stdout=out)
+        self.assertIn('1 group(s), 1 duplicate question(s).', out.getvalue())
+        self.assertEqual(
+            set(QuestionModel.objects.values_list('pk', flat=True)), {chain[0].pk, chain[2].pk},
+        )
+        self.assertEqual(
+            Counter(AnswerModel.objects.values_list('question_id', flat=True)), {chain[0].pk: 2, chain[2].pk: 1},
+        )
+        self.assertEqual(question_index.get_index().size, 2)
+
+
+@override_settings(QUESTION_IMPORT_BATCH_SIZE=2)
+class QuestionImportTests(TestCase):
+    URL = '/api_backend/faculty/questions/import/'
+
+    def setUp(self):
+        QuestionModel.objects.create(question='What is EBITDA?', difficulty='Easy')
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user(username='importer', password='pw', user_type='faculty'))
+
+    def upload(self, name, content, **data):
+        return self.client.post(self.URL, {'file': SimpleUploadedFile(name, content.encode()), **data}, format='multipart')
+
+    def test_csv_rows_are_deduplicated_and_errors_reported_per_row(self):
+        content = (
+            'question,difficulty,category\n'
+            '"what is EBITDA",easy,Consulting\n'
+            'Walk me through a DCF.,Medium,\n'
+            'Size the market for e-bikes.,Hard,consulting\n'
+            '"walk me through a   DCF",Medium,\n'
+            ',Medium,\n'
+            'What is WACC?,Impossible,Banking\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload('bank.csv', content)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            {key: response.data[key] for key in ('rows', 'created', 'duplicates', 'invalid')},
+            {'rows': 6, 'created': 2, 'duplicates': 2, 'invalid': 2},
+        )
+        # Row numbers count the header, as a spreadsheet does.
+        self.assertEqual(response.data['errors'], [
+            {'row': 6, 'errors': {'question': 'This field is required.'}},
+            {'row': 7, 'errors': {
+                'difficulty': '"Impossible" is not a valid choice (Easy, Medium, Hard).',
+                'category': '"Banking" is not a valid choice (Investment Banking, Consulting).',
+            }},
+        ])
+        bank = {question.question: question for question in QuestionModel.objects.all()}
+        self.assertEqual(set(bank), {'What is EBITDA?', 'Walk me through a DCF.', 'Size the market for e-bikes.'})
+        self.assertEqual(bank['Walk me through a DCF.'].category, 'Investment Banking')
+        self.assertEqual(bank['Size the market for e-bikes.'].category, 'Consulting')
+        self.assertEqual(bank['Walk me through a DCF.'].text_hash, question_text_hash('Walk me through a DCF.'))
+
+        # Importing the same file again only finds duplicates.
+        response = self.upload('bank.csv', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['duplicates']), (0, 4))
+
+    def test_json_and_ndjson_rows_are_reported_per_row(self):
+        rows = [
+            {'question': 'What is goodwill?', 'difficulty': 'Medium', 'subcategory': 'Financial'},
+            'not an object',
+            {'question': 'WHAT IS GOODWILL', 'difficulty': 'Medium'},
+            {'question': 'x' * 501, 'difficulty': 'Easy'},
+        ]
+        response = self.upload('bank.json', json.dumps(rows))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['duplicates'], response.data['invalid']), (1, 1, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 4])
+        self.assertEqual(response.data['errors'][0]['errors'], {'row': 'Expected an object.'})
+        self.assertEqual(QuestionModel.objects.get(question='What is goodwill?').subcategory, 'Financial')
+
+        content = '{"question": "What is beta?", "difficulty": "Hard"}\n\n{broken\n'
+        response = self.upload('bank.jsonl', content)
+        self.assertEqual((response.data['created'], response.data['invalid']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 3)
+        self.assertTrue(response.data['errors'][0]['errors']['row'].startswith('Invalid JSON'))
+
+    def test_dry_run_validates_without_writing(self):
+        version = question_cache.current_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload('bank.csv', 'question,difficulty\nWhat is beta?,Hard\nWhat is EBITDA?,Easy\n', dry_run='true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['duplicates'], response.data['dry_run']), (1, 1, True))
+        self.assertFalse(QuestionModel.objects.filter(question='What is beta?').exists())
+        self.assertEqual(question_cache.current_version(), version)
+
+    @override_settings(QUESTION_IMPORT_MAX_ERRORS=1)
+    def test_error_list_is_capped_but_every_invalid_row_is_counted(self):
+        response = self.upload('bank.csv', 'question,difficulty\n,Easy\n,Easy\n,Easy\n')
+        self.assertEqual(response.data['invalid'], 3)
+        self.assertEqual(len(response.data['errors']), 1)
+
+    def test_unreadable_files_are_rejected(self):
+        for name, content in (
+            ('bank.csv', 'text,level\nWhat is beta?,Hard\n'),
+            ('bank.json', '{"question": "What is beta?"}'),
+            ('bank.json', '[{"question": '),
+        ):
+            with self.subTest(content=content):
+                self.assertEqual(self.upload(name, content).status_code, 400)
+        self.assertEqual(self.upload('bank.csv', 'question,difficulty\n', format='xml').status_code, 400)
+        self.assertEqual(QuestionModel.objects.count(), 1)
+
+        self.client.force_authenticate(CustomUser.objects.create_user(username='sneaky', password='pw', user_type='student'))
+        self.assertEqual(self.upload('bank.csv', 'question,difficulty\nWhat is beta?,Hard\n').status_code, 403)
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def test_every_middleware_can_run_in_the_async_stack(self):
+        # One sync-only middleware would put every ASGI request through a thread hop.
+        for path in settings.MIDDLEWARE:
+            self.assertTrue(getattr(import_string(path), 'async_capable', False), path)
+
+    def test_sync_requests_are_counted(self):
+        QuestionModel.objects.create(question='What is EBITDA?', difficulty='Easy')
+        response = self.client.get('/api_backend/questions/random/')
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+    async def test_async_requests_are_counted(self):
+        await QuestionModel.objects.acreate(question='What is EBITDA?', difficulty='Easy')
+        response = await self.async_client.get('/api_backend/questions/random/')
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+
+class StudentProgressTests(TransactionTestCase):
+    def setUp(self):
+        self.student = CustomUser.objects.create_user(username='student', password='pw', user_type='student')
+        self.question = QuestionModel.objects.create(question='Walk me through a DCF.', category='Finance', subcategory='Valuation')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_snapshot_updates_lock_the_student_inside_the_answer_write(self):
+        self.client.get('/api_backend/student/progress/')
+        seen = []
+        real_lock = progress._lock_students
+
+        def lock(student_ids):
+            seen.append((connection.in_atomic_block, AnswerModel.objects.count()))
+            return real_lock(student_ids)
+
+        with mock.patch.object(progress, '_lock_students', side_effect=lock):
+            answer = AnswerModel.objects.create(question=self.question, answer='Cash flows.', student=self.student)
+            answer.score = 70
+            answer.save(update_fields=['score'])
+        self.assertEqual(seen, [(True, 1), (True, 1)])
+
+    def test_incremental_snapshot_matches_a_rebuild(self):
+        self.client.get('/api_backend/student/progress/')
+        for score in (40, None, 90):
+            AnswerModel.objects.create(question=self.question, answer='Cash flows.', student=self.student, score=score)
+        incremental = self.client.get('/api_backend/student/progress/').data
+        progress.invalidate(self.student.id)
+        rebuilt = self.client.get('/api_backend/student/progress/').data
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual((incremental['answer_count'], incremental['scored_count'], incremental['average_score']), (3, 2, 65.0))
+
+
+class PerformanceSummaryTests(TestCase):
+    def setUp(self):
+        self.student = CustomUser.objects.create_user(username='performer', password='pw', user_type='student')
+        self.questions = [
+            QuestionModel.objects.create(question=f'Question {i}', difficulty='Easy', category=category, subcategory=subcategory)
+            for i, (category, subcategory) in enumerate((
+                ('Investment Banking', 'Financial'), ('Investment Banking', 'Behavioral'), ('Consulting', 'Case'),
+            ))
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def add_answers(self, count, seed):
+        rng = random.Random(seed)
+        for _ in range(count):
+            answer = AnswerModel.objects.create(
+                question=rng.choice(self.questions), student=self.student, answer='...',
+                score=rng.choice([None, *range(0, 101, 7)]),
+            )
+            AnswerModel.objects.filter(pk=answer.pk).update(created_at=timezone.now() - timezone.timedelta(days=rng.randrange(120)))
+
+    def test_summary_matches_the_individual_endpoints(self):
+        self.add_answers(40, seed=1)
+        other = CustomUser.objects.create_user(username='other_performer', password='pw', user_type='student')
+        AnswerModel.objects.create(question=self.questions[0], student=other, answer='...', score=5)
+
+        summary = self.client.get('/api_backend/student/performance/summary/').data
+        self.assertEqual(summary['over_time'], self.client.get('/api_backend/student/performance/over-time/').data['performance_data'])
+        self.assertEqual(summary['by_category'], self.client.get('/api_backend/student/performance/by-category/').data)
+        self.assertEqual(summary['by_subcategory'], self.client.get('/api_backend/student/performance/by-subcategory/').data)
+        self.assertGreaterEqual(len(summary['over_time']), 3)
+        self.assertEqual(
+            sum(row['count'] for row in summary['by_category']),
+            AnswerModel.objects.filter(student=self.student, score__isnull=False).count(),
+        )
+
+    def test_summary_is_one_query_however_many_answers(self):
+        self.add_answers(5, seed=2)
+        with self.assertNumQueries(1):
+            self.client.get('/api_backend/student/performance/summary/')
+        self.add_answers(60, seed=3)
+        with self.assertNumQueries(1):
+            self.client.get('/api_backend/student/performance/summary/')
+
+
+class IntervalTests(SimpleTestCase):
+    def test_merge_joins_touching_and_contained_intervals(self):
+        self.assertEqual(scheduling.merge([(5, 6), (1, 2), (2, 3)]), [(1, 3), (5, 6)])
+        self.assertEqual(scheduling.merge([(1, 5), (2, 3), (4, 5)]), [(1, 5)])
+        self.assertEqual(scheduling.merge([]), [])
+
+    def test_subtract_keeps_free_time_touching_a_booking(self):
+        self.assertEqual(scheduling.subtract([(2, 4)], [(1, 2), (4, 5)]), [(2, 4)])
+
+    def test_subtract_splits_around_contained_booking(self):
+        self.assertEqual(scheduling.subtract([(1, 6)], [(2, 3), (4, 5)]), [(1, 2), (3, 4), (5, 6)])
+        self.assertEqual(scheduling.subtract([(2, 3)], [(1, 4)]), [])
+
+    def test_subtract_booking_across_two_windows(self):
+        self.assertEqual(scheduling.subtract([(1, 3), (4, 6)], [(2, 5)]), [(1, 2), (5, 6)])
+        self.assertEqual(scheduling.subtract([(1, 3), (4, 6), (7, 9)], [(0, 1), (2, 8)]), [(1, 2), (8, 9)])
+
+
+class AppointmentBookingTests(TestCase):
+    def setUp(self):
+        self.faculty = CustomUser.objects.create_user(username='faculty', password='pw', user_type='faculty')
+        self.student = CustomUser.objects.create_user(username='student', password='pw', user_type='student')
+        FacultyAvailability.objects.create(
+            faculty=self.faculty, weekday=0, start_time=datetime.time(9), end_time=datetime.time(12), slot_minutes=30,
+        )
+        today = timezone.localdate()
+        monday = today + datetime.timedelta(days=7 - today.weekday())
+        self.monday = lambda hour, minute=0: timezone.make_aware(datetime.datetime.combine(monday, datetime.time(hour, minute)))
+        self.client = APIClient()
+
+    def book(self, scheduled_at):
+        self.client.force_authenticate(self.student)
+        return self.client.post('/api_backend/appointments/', {'faculty': self.faculty.id, 'scheduled_at': scheduled_at.isoformat()}, format='json')
+
+    def test_only_slot_starts_inside_working_hours_can_be_booked(self):
+        self.assertEqual(self.book(self.monday(9, 15)).status_code, 409)
+        self.assertEqual(self.book(self.monday(11, 45)).status_code, 409)
+        self.assertEqual(self.book(self.monday(12)).status_code, 409)
+        response = self.book(self.monday(11, 30))
+        self.assertEqual((response.status_code, response.data['duration_minutes']), (201, 30))
+        self.assertEqual(self.book(self.monday(11, 30)).status_code, 409)
+
+    def test_reviving_a_cancelled_appointment_into_a_clash_is_refused(self):
+        cancelled = Appointment.objects.create(
+            faculty=self.faculty, student=self.student, scheduled_at=self.monday(10), duration_minutes=30, status='cancelled',
+        )
+        self.assertEqual(self.book(self.monday(10)).status_code, 201)
+        self.client.force_authenticate(self.faculty)
+        response = self.client.patch(f'/api_backend/appointments/{cancelled.id}/status/', {'status': 'confirmed'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        cancelled.refresh_from_db()
+        self.assertEqual(cancelled.status, 'cancelled')
+
+    def test_faculty_row_is_locked_before_the_overlap_check(self):
+        lock = mock.patch.object(CustomUser.objects, 'select_for_update', wraps=CustomUser.objects.select_for_update)
+        with lock as select_for_update, CaptureQueriesContext(connection) as queries:
+            scheduling.book(self.faculty.id, self.student.id, self.monday(9))
+        select_for_update.assert_called_once_with()
+        sql = [query['sql'] for query in queries.captured_queries]
+        locked = next(i for i, statement in enumerate(sql) if 'FROM "api_backend_customuser"' in statement)
+        overlap = next(i for i, statement in enumerate(sql) if 'FROM "api_backend_appointment"' in statement)
+        self.assertLess(locked, overlap)
+        if connection.features.has_select_for_update:
+            self.assertIn('FOR UPDATE', sql[locked])
+
+
+class FacultyRosterTests(TestCase):
+    URL = '/api_backend/faculty/appointments/'
+
+    def setUp(self):
+        self.faculty = CustomUser.objects.create_user(username='roster_faculty', password='pw', user_type='faculty')
+        self.financial = QuestionModel.objects.create(question='What is WACC?', difficulty='Easy', subcategory='Financial')
+        self.behavioral = QuestionModel.objects.create(question='Why this firm?', difficulty='Easy', subcategory='Behavioral')
+        self.client = APIClient()
+        self.client.force_authenticate(self.faculty)
+
+    def book(self, student, hours_ahead):
+        return Appointment.objects.create(
+            faculty=self.faculty, student=student, scheduled_at=timezone.now() + timezone.timedelta(hours=hours_ahead),
+        )
+
+    def answer(self, student, question, score, days_ago):
+        answer = AnswerModel.objects.create(question=question, student=student, answer='...', score=score)
+        AnswerModel.objects.filter(pk=answer.pk).update(created_at=timezone.now() - timezone.timedelta(days=days_ago))
+
+    def test_each_row_carries_its_students_stats(self):
+        active = CustomUser.objects.create_user(username='active', password='pw', user_type='student')
+        new = CustomUser.objects.create_user(username='new', password='pw', user_type='student')
+        for question, score, days_ago in (
+            (self.financial, 50, 3), (self.financial, 75, 2), (self.behavioral, 90, 1), (self.behavioral, None, 0),
+        ):
+            self.answer(active, question, score, days_ago)
+        CV.objects.create(student=active, has_pdf=True)
+        self.book(active, 1)
+        self.book(new, 2)
+        Appointment.objects.create(
+            faculty=CustomUser.objects.create_user(username='other_faculty', password='pw', user_type='faculty'),
+            student=active, scheduled_at=timezone.now(),
+        )
+
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['student']['username'] for row in response.data], ['active', 'new'])
+        self.assertEqual(response.data[0]['student_stats'], {
+            # The unscored answer counts as an answer but not towards the scores.
+            'answer_count': 4, 'average_score': 71.7, 'latest_score': 90,
+            'weakest_subcategory': 'Financial', 'has_cv': True,
+        })
+        self.assertEqual(response.data[1]['student_stats'], {
+            'answer_count': 0, 'average_score': None, 'latest_score': None,
+            'weakest_subcategory': None, 'has_cv': False,
+        })
+
+    def test_query_count_does_not_grow_with_the_roster(self):
+        def roster_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.URL)
+            self.assertEqual(response.status_code, 200)
+            return len(response.data), len(queries)
+
+        def add_students(count):
+            for _ in range(count):
+                student = CustomUser.objects.create(username=f'roster{CustomUser.objects.count()}', user_type='student')
+                self.answer(student, self.financial, 60, 1)
+                self.book(student, CustomUser.objects.count())
+
+        add_students(2)
+        rows, queries = roster_queries()
+        add_students(8)
+        self.assertEqual(roster_queries(), (rows + 8, queries))
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class AnswerExportTests(TestCase):
+    def setUp(self):
+        self.faculty = CustomUser.objects.create_user(username='faculty', password='pw', user_type='faculty')
+        question = QuestionModel.objects.create(question='Walk me through a DCF.')
+        AnswerModel.objects.bulk_create([AnswerModel(question=question, answer=f'Answer {i}', score=50 + i) for i in range(5)])
+        self.headers = {'authorization': f'Bearer {AccessToken.for_user(self.faculty)}'}
+
+    async def export(self, query):
+        response = await self.async_client.get(f'/api_backend/faculty/export/answers/?{query}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response, [part async for part in response.streaming_content]
+
+    async def test_export_streams_chunk_by_chunk_under_asgi(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            response, parts = await self.export('output=ndjson')
+        self.assertTrue(response.is_async)
+        self.assertEqual([str(warning.message) for warning in caught if 'StreamingHttpResponse' in str(warning.message)], [])
+        self.assertEqual([part.count(b'\n') for part in parts], [2, 2, 1])
+        self.assertEqual([json.loads(line)['answer'] for line in b''.join(parts).splitlines()], [f'Answer {i}' for i in range(5)])
+
+    async def test_gzipped_csv_export(self):
+        _, parts = await self.export('gzip=1')
+        rows = zlib.decompress(b''.join(parts), wbits=31).decode('utf-8').splitlines()
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(rows[0].startswith('id,created_at,'))
+
+
+    async def test_csv_cells_cannot_start_a_formula(self):
+        dangerous = ['=HYPERLINK("http://evil.example","x")', '+1+1', '-2+3', '@SUM(A1)', '\tA1', '\r=1']
+        question = await QuestionModel.objects.afirst()
+        await AnswerModel.objects.abulk_create([AnswerModel(question=question, answer=text, score=0) for text in dangerous])
+        _, parts = await self.export('')
+        rows = list(csv.DictReader(io.StringIO(b''.join(parts).decode('utf-8'))))
+        self.assertEqual([row['answer'] for row in rows], [f'Answer {i}' for i in range(5)] + [f"'{text}" for text in dangerous])
+        _, parts = await self.export('output=ndjson')
+        self.assertEqual([json.loads(line)['answer'] for line in b''.join(parts).splitlines()][5:], dangerous)
+
+class StatelessAuthenticationTests(TestCase):
+    def setUp(self):
+        # The cache outlives the test database, and user ids are reused between runs.
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = CustomUser.objects.create_user(username='student', password='pw', user_type='student')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def save_user(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_inactive_or_deleted_user_is_rejected(self):
+        self.assertEqual(self.client.get('/api_backend/student/progress/').status_code, 200)
+        self.save_user(is_active=False)
+        self.assertEqual(self.client.get('/api_backend/student/progress/').status_code, 401)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.client.get('/api_backend/student/progress/').status_code, 401)
+
+    def test_role_change_applies_after_invalidation(self):
+        self.assertEqual(self.client.get('/api_backend/student/progress/').status_code, 200)
+        self.save_user(user_type='faculty')
+        # The token still says "student"; the refreshed user state wins.
+        self.assertEqual(self.client.get('/api_backend/student/progress/').status_code, 403)
+        self.assertEqual(self.client.get('/api_backend/faculty/evaluations/tiers/').status_code, 200)
+
+    def test_saving_a_user_drops_the_cached_state(self):
+        key = authentication.AUTH_STATE_KEY.format(self.user.pk)
+        self.assertEqual(authentication.get_user_state(self.user.pk), {'is_active': True, 'user_type': 'student'})
+        CustomUser.objects.filter(pk=self.user.pk).update(user_type='faculty')
+        self.assertEqual(authentication.get_user_state(self.user.pk)['user_type'], 'student')
+        self.user.refresh_from_db()
+        self.save_user()
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(authentication.get_user_state(self.user.pk)['user_type'], 'faculty')
+
+
+class BenchmarkSafetyTests(TestCase):
+    @override_settings(DEBUG=False)
+    def test_commands_refuse_to_run_with_debug_off(self):
+        for command in ('seed_benchmark_data', 'run_benchmarks'):
+            with self.assertRaisesMessage(CommandError, '--i-know-this-is-not-prod'):
+                call_command(command, stdout=io.StringIO())
+        self.assertFalse(CustomUser.objects.exists())
+
+    @override_settings(DEBUG=False)
+    def test_confirmed_seed_keeps_cv_files_local(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        field = CV._meta.get_field('pdf')
+        real_storage = field.storage
+        with override_settings(MEDIA_ROOT=Path(media)), mock.patch.object(real_storage, 'save') as real_save:
+            call_command(
+                'seed_benchmark_data', '--i-know-this-is-not-prod', students=3, faculty=1, questions=2,
+                answers=5, appointments=1, cvs=1, stdout=io.StringIO(),
+            )
+        real_save.assert_not_called()
+        self.assertIs(field.storage, real_storage)
+        cv = CV.objects.get()
+        self.assertTrue((Path(media) / 'benchmark_cvs' / cv.pdf.name).exists())
@@ -0,0 +1,56 @@
+"""Upload size limits enforced before and while the request body is parsed.
+
+Views call ``content_length_exceeds`` to refuse an oversized request up front, then
+``install_size_limit`` before touching ``request.data`` / ``request.FILES``, so a chunked or
+mislabelled upload is cut off as soon as the limit is crossed instead of being stored in full.
+"""
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.template.defaultfilters import filesizeformat
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    def __init__(self, max_bytes, request=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def too_large_response(max_bytes):
+    limit = filesizeformat(max_bytes).replace('\xa0', ' ')
+    return Response(
+        {'detail': f'Upload exceeds the {limit} limit.'},
+        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    )
+
+
+# Allowance for multipart boundaries and headers on top of the file itself.
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def content_length_exceeds(request, max_bytes):
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return False
+    return content_length > max_bytes + MULTIPART_OVERHEAD
+
+
+def install_size_limit(request, max_bytes):
+    """Stop parsing uploaded files once they exceed ``max_bytes``. Returns the handler;
+    check its ``exceeded`` flag after reading request.FILES."""
+    handler = MaxSizeUploadHandler(max_bytes, request)
+    request.upload_handlers.insert(0, handler)
+    return handler
@@ -1,19 +1,31 @@
 from django.urls import path
 from .views import (
     QuestionListView,
+    QuestionRandomView,
     QuestionDetailView,
     SubmitAnswerView,
+    StreamSubmitAnswerView,
+    SubmitAnswersBatchView,
+    EvaluationJobView,
     RegisterView,
     StudentAnswerListView,
     FacultyAppointmentListView,
     AppointmentCreateView,
+    FacultyAvailabilityView,
+    FacultySlotsView,
     FacultyListView,
     AppointmentStatusUpdateView,
     FacultyStudentAnswersView,
     PerformanceOverTimeView,
     PerformanceByCategoryView,
     PerformanceBySubcategoryView,
+    PerformanceSummaryView,
+    StudentProgressView,
     FacultyAnalyticsView,
+    FacultyEvaluationTierView,
+    FacultyEvaluationUsageView,
+    FacultyAnswerExportView,
+    FacultyQuestionImportView,
     StudentCVView,
     StudentCVDownloadView,
     FacultyStudentCVView,
@@ -22,16 +34,28 @@ from .views import (
 
 urlpatterns = [
     path('questions/', QuestionListView.as_view()),
+    path('questions/random/', QuestionRandomView.as_view()),
+    path('questions/submit-answers/', SubmitAnswersBatchView.as_view()),
     path('questions/<int:pk>/', QuestionDetailView.as_view()),
     path('questions/<int:pk>/submit-answer/', SubmitAnswerView.as_view()),
+    path('questions/<int:pk>/submit-answer/stream/', StreamSubmitAnswerView.as_view()),
+    path('evaluations/<uuid:token>/', EvaluationJobView.as_view()),
     path('register/', RegisterView.as_view()),
     path('student/answers/', StudentAnswerListView.as_view()),
     path('student/performance/over-time/', PerformanceOverTimeView.as_view()),
     path('student/performance/by-category/', PerformanceByCategoryView.as_view()),
     path('student/performance/by-subcategory/', PerformanceBySubcategoryView.as_view()),
+    path('student/performance/summary/', PerformanceSummaryView.as_view()),
+    path('student/progress/', StudentProgressView.as_view()),
     path('faculty/', FacultyListView.as_view()),
     path('faculty/analytics/', FacultyAnalyticsView.as_view()),
+    path('faculty/evaluations/tiers/', FacultyEvaluationTierView.as_view()),
+    path('faculty/evaluations/usage/', FacultyEvaluationUsageView.as_view()),
+    path('faculty/export/answers/', FacultyAnswerExportView.as_view()),
+    path('faculty/questions/import/', FacultyQuestionImportView.as_view()),
     path('faculty/appointments/', FacultyAppointmentListView.as_view()),
+    path('faculty/availability/', FacultyAvailabilityView.as_view()),
+    path('faculty/<int:faculty_id>/availability/', FacultySlotsView.as_view()),
     path('faculty/student/<int:student_id>/answers/', FacultyStudentAnswersView.as_view()),
     path('appointments/', AppointmentCreateView.as_view()),
     path('appointments/<int:pk>/status/', AppointmentStatusUpdateView.as_view()),
@@ -0,0 +1,113 @@
+"""Token usage and latency accounting for OpenAI evaluation calls.
+
+openai_service calls ``record`` after every completion; ``report`` turns the stored rows
+into cost and latency per day and question category using settings.OPENAI_PRICING.
+"""
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import EvaluationUsage
+
+
+def _split(total: int, counts: list) -> list:
+    """Split ``total`` across ``counts`` proportionally, giving the rounding remainder to the first."""
+    items = sum(counts)
+    shares = [total * count // items for count in counts]
+    shares[0] += total - sum(shares)
+    return shares
+
+
+def record(model: str, kind: str, questions, usage, started_at: float):
+    """Store the usage of one completion that began at ``started_at`` (a perf_counter value).
+
+    A batch covering several question categories is stored as one row per category, with
+    the tokens split by how many of its items belong to each.
+    """
+    if usage is None:
+        return
+    latency_ms = round((time.perf_counter() - started_at) * 1000)
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached_tokens = getattr(details, 'cached_tokens', None) or 0
+    categories = Counter(question.category for question in questions)
+    counts = list(categories.values())
+    EvaluationUsage.objects.bulk_create([
+        EvaluationUsage(
+            model=model,
+            kind=kind,
+            category=category,
+            item_count=item_count,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached,
+            completion_tokens=completion_tokens,
+            latency_ms=latency_ms,
+        )
+        for category, item_count, prompt_tokens, cached, completion_tokens in zip(
+            categories,
+            counts,
+            _split(usage.prompt_tokens, counts),
+            _split(cached_tokens, counts),
+            _split(usage.completion_tokens, counts),
+        )
+    ])
+
+
+def cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int):
+    """USD cost of the given token counts, or None if ``model`` has no OPENAI_PRICING entry."""
+    prices = settings.OPENAI_PRICING.get(model)
+    if prices is None:
+        return None
+    return (
+        (prompt_tokens - cached_tokens) * prices['input']
+        + cached_tokens * prices['cached_input']
+        + completion_tokens * prices['output']
+    ) / 1_000_000
+
+
+def report(days: int) -> dict:
+    rows = (
+        EvaluationUsage.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'category', 'model')
+        .annotate(
+            calls=Count('id'),
+            items=Sum('item_count'),
+            prompt_tokens=Sum('prompt_tokens'),
+            cached_tokens=Sum('cached_tokens'),
+            completion_tokens=Sum('completion_tokens'),
+            average_latency_ms=Avg('latency_ms'),
+        )
+    )
+    fields = ('calls', 'items', 'prompt_tokens', 'cached_tokens', 'completion_tokens')
+    buckets = defaultdict(lambda: {**dict.fromkeys(fields, 0), 'cost_usd': 0.0, 'latency_total': 0.0})
+    unpriced = set()
+    for row in rows:
+        bucket = buckets[(row['day'], row['category'])]
+        for field in fields:
+            bucket[field] += row[field]
+        bucket['latency_total'] += row['average_latency_ms'] * row['calls']
+        row_cost = cost(row['model'], row['prompt_tokens'], row['cached_tokens'], row['completion_tokens'])
+        if row_cost is None:
+            unpriced.add(row['model'])
+        else:
+            bucket['cost_usd'] += row_cost
+
+    results = []
+    for (day, category), bucket in sorted(buckets.items()):
+        latency_total = bucket.pop('latency_total')
+        results.append({
+            'day': day,
+            'category': category,
+            **bucket,
+            'cost_usd': round(bucket['cost_usd'], 4),
+            'average_latency_ms': round(latency_total / bucket['calls']),
+        })
+    totals = {field: sum(row[field] for row in results) for field in fields}
+    totals['cost_usd'] = round(sum(row['cost_usd'] for row in results), 4)
+    totals['cached_share'] = round(totals['cached_tokens'] / totals['prompt_tokens'], 3) if totals['prompt_tokens'] else 0.0
+    return {'days': days, 'results': results, 'totals': totals, 'unpriced_models': sorted(unpriced)}
@@ -3,34 +3,148 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Avg, Count
+from django.db import connection, transaction
+from django.db.models import Aggregate, Avg, BooleanField, Count, Exists, FloatField, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
-from django.http import HttpResponse
-import base64
-from datetime import timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.cache import get_conditional_response
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+import json
+import math
+import random
+from datetime import datetime, timedelta
 from collections import defaultdict
 
-from .models import QuestionModel, AnswerModel, Appointment, CV
+from .models import QuestionModel, AnswerModel, Appointment, CV, EvaluationJob, AnswerRollup, StudentAnswerRollup, FacultyAvailability
 from .serializers import (
     QuestionSerializer,
     AnswerSerializer,
     AnswerWithQuestionSerializer,
     SubmitAnswerSerializer,
+    SubmitAnswersBatchSerializer,
     RegisterSerializer,
     AppointmentSerializer,
     FacultyAppointmentListSerializer,
+    FacultyRosterSerializer,
     StudentAppointmentSerializer,
     CVSerializer,
+    EvaluationJobSerializer,
+    FacultyAvailabilitySerializer,
 )
-from .openai_service import evaluate_answer
+from . import evaluators, exports, progress, question_cache, question_import, question_index, rollups, scheduling, uploads, usage
+from .authentication import StatelessJWTAuthentication
+from .cv_storage import save_cv_pdf, serve_cv_pdf
+from .pagination import is_paginated_request, paginate_keyset
+from .ratelimit import CVUploadThrottle, EVALUATION_THROTTLES, throttle_wait
+from .evaluation_jobs import enqueue_evaluation, enqueue_evaluations
+from .openai_service import EvaluatorBusyError
+
+
+QUESTION_FILTER_PARAMS = {'category', 'subcategory', 'difficulty', 'q'}
+
+
+def _filter_questions(questions, request):
+    for name in ('category', 'subcategory', 'difficulty'):
+        value = request.query_params.get(name)
+        if value:
+            questions = questions.filter(**{name: value})
+    return questions
+
+
+def _search_questions(questions, search):
+    """Full-text search on Postgres with a trigram fallback for fuzzy matches; icontains elsewhere."""
+    if connection.vendor != 'postgresql':
+        return questions.filter(question__icontains=search)
+    # Same expression as the question_search_idx GIN index (migration 0013), so the index is used.
+    matches = questions.filter(RawSQL(
+        "to_tsvector('english', question) @@ websearch_to_tsquery('english', %s)",
+        [search],
+        output_field=BooleanField(),
+    ))
+    if matches.exists():
+        return matches
+    # Word similarity compares the search with the closest stretch of the question, so a
+    # misspelt two-word search can still match a long question (question_trgm_idx serves it).
+    return questions.filter(question__trigram_word_similar=search)
+
+
+RANDOM_QUESTION_PROBES = 16
+
+
+class QuestionRandomView(APIView):
+    """One random question matching the optional category/subcategory/difficulty filters.
+
+    Probes RANDOM_QUESTION_PROBES random ids between the filtered min and max ids in one
+    indexed lookup and picks one of the probes that hit, so every question is equally likely
+    however the ids are spread. Only when no probe hits (very sparse ids) does it fall back
+    to COUNT plus OFFSET; ORDER BY random() over the table is never needed.
+    """
+
+    def get(self, request):
+        questions = _filter_questions(QuestionModel.objects.all(), request)
+        bounds = questions.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            return Response({'detail': 'No questions match these filters.'}, status=status.HTTP_404_NOT_FOUND)
+        probes = [random.randint(bounds['low'], bounds['high']) for _ in range(RANDOM_QUESTION_PROBES)]
+        found = questions.in_bulk(set(probes))
+        hits = [pk for pk in probes if pk in found]
+        if hits:
+            question = found[random.choice(hits)]
+        else:
+            question = questions.order_by('id')[random.randrange(questions.count())]
+        return Response(QuestionSerializer(question).data)
+
+
+def _similar_questions(matches):
+    return [
+        {**QuestionSerializer(question).data, 'similarity': round(similarity, 3)}
+        for question, similarity in matches
+    ]
 
 
 class QuestionListView(APIView):
+    def perform_authentication(self, request):
+        # Authenticate lazily (on first use of request.user) so cached GETs skip token checks.
+        pass
+
     def get(self, request):
-        questions = QuestionModel.objects.all()
-        serializer = QuestionSerializer(questions, many=True)
-        return Response(serializer.data)
+        if QUESTION_FILTER_PARAMS & request.query_params.keys() or is_paginated_request(request):
+            return self._filtered_list(request)
+
+        version = question_cache.current_version()
+        etag = question_cache.etag_for(version)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            for name, value in headers.items():
+                not_modified[name] = value
+            return not_modified
+
+        def build():
+            return QuestionSerializer(QuestionModel.objects.all(), many=True).data
+
+        return Response(question_cache.get_payload(version, build), headers=headers)
+
+    def _filtered_list(self, request):
+        questions = _filter_questions(QuestionModel.objects.all(), request)
+        search = request.query_params.get('q', '').strip()
+        if search:
+            questions = _search_questions(questions, search)
+        if is_paginated_request(request):
+            rows, next_cursor = paginate_keyset(questions, request, field='id', descending=False)
+            return Response({'results': QuestionSerializer(rows, many=True).data, 'next_cursor': next_cursor})
+        return Response(QuestionSerializer(questions.order_by('id'), many=True).data)
 
     def post(self, request):
         if not request.user.is_authenticated:
@@ -40,8 +154,17 @@ class QuestionListView(APIView):
         serializer = QuestionSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        similar = question_index.find_similar(serializer.validated_data['question'])
+        if similar and similar[0][1] >= settings.QUESTION_DUPLICATE_THRESHOLD:
+            return Response({
+                'detail': 'A very similar question already exists.',
+                'duplicates': _similar_questions(similar),
+            }, status=status.HTTP_409_CONFLICT)
         serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            {**serializer.data, 'similar_questions': _similar_questions(similar)},
+            status=status.HTTP_201_CREATED,
+        )
 
 
 class QuestionDetailView(APIView):
@@ -52,6 +175,8 @@ class QuestionDetailView(APIView):
 
 
 class SubmitAnswerView(APIView):
+    throttle_classes = EVALUATION_THROTTLES
+
     def post(self, request, pk):
         question = get_object_or_404(QuestionModel, pk=pk)
 
@@ -60,23 +185,129 @@ class SubmitAnswerView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         answer_text = serializer.validated_data['answer']
+        student_id = request.user.id if request.user.is_authenticated else None
+
+        with transaction.atomic():
+            answer = AnswerModel.objects.create(
+                question=question,
+                answer=answer_text,
+                student_id=student_id,
+            )
+            job = enqueue_evaluation(answer)
+
+        return Response(EvaluationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n'
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class StreamSubmitAnswerView(View):
+    """Server-sent events variant of SubmitAnswerView.
+
+    Emits a ``strength`` / ``weakness`` event per feedback item as soon as the model has
+    produced it, then ``score``, then ``done`` with the saved answer (or a single ``error``).
+    Runs as an async view so a long stream does not hold a worker thread under ASGI.
+    """
+
+    async def post(self, request, pk):
         try:
-            evaluation = evaluate_answer(question, answer_text)
-        except ValueError as e:
-            return Response({'detail': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
-
-        student = request.user if request.user.is_authenticated else None
-
-        answer = AnswerModel.objects.create(
-            question=question,
-            answer=answer_text,
-            strengths=evaluation['strengths'],
-            weaknesses=evaluation['weaknesses'],
-            score=evaluation['score'],
-            student=student,
-        )
+            auth = await sync_to_async(StatelessJWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            return JsonResponse(detail, status=status.HTTP_401_UNAUTHORIZED, encoder=JSONEncoder)
+        student_id = auth[0].id if auth else None
+        if auth:
+            request.user = auth[0]
+        wait = await sync_to_async(throttle_wait)(EVALUATION_THROTTLES, request, self)
+        if wait is not None:
+            response = JsonResponse(
+                {'detail': f'Request was throttled. Expected available in {math.ceil(wait)} seconds.'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
+
+        question = await aget_object_or_404(QuestionModel, pk=pk)
+        try:
+            payload = json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return JsonResponse({'detail': 'Invalid JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = SubmitAnswerSerializer(data=payload)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        answer_text = serializer.validated_data['answer']
+
+        async def events():
+            event_names = {'strengths': 'strength', 'weaknesses': 'weakness'}
+            try:
+                async for field, value in evaluators.stream(question, answer_text):
+                    if field == 'result':
+                        evaluation = value
+                    else:
+                        yield _sse(event_names[field], {'text': value})
+            except (EvaluatorBusyError, ValueError) as e:
+                yield _sse('error', {'detail': str(e)})
+                return
+
+            yield _sse('score', {'score': evaluation['score']})
+            answer = await sync_to_async(transaction.atomic(AnswerModel.objects.create))(
+                question=question,
+                answer=answer_text,
+                strengths=evaluation['strengths'],
+                weaknesses=evaluation['weaknesses'],
+                score=evaluation['score'],
+                evaluation_tier=evaluation['tier'],
+                evaluation_ms=evaluation['evaluation_ms'],
+                student_id=student_id,
+            )
+            yield _sse('done', AnswerSerializer(answer).data)
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
-        return Response(AnswerSerializer(answer).data, status=status.HTTP_201_CREATED)
+
+class SubmitAnswersBatchView(APIView):
+    """Queue several answers for evaluation in one batched model call; returns their jobs (202)."""
+    permission_classes = [IsAuthenticated]
+    throttle_classes = EVALUATION_THROTTLES
+
+    def get_throttle_cost(self, request):
+        answers = request.data.get('answers') if isinstance(request.data, dict) else None
+        return max(1, len(answers)) if isinstance(answers, list) else 1
+
+    def post(self, request):
+        serializer = SubmitAnswersBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data['answers']
+        student_id = request.user.id
+
+        with transaction.atomic():
+            answers = AnswerModel.objects.bulk_create([
+                AnswerModel(question=item['question'], answer=item['answer'], student_id=student_id)
+                for item in items
+            ])
+            # bulk_create skips model signals, so update the analytics rollups and progress here.
+            # The answers are unscored until their jobs finish; scoring goes through save().
+            rollups.add_answers(answers)
+            progress.answers_created(student_id, answers)
+            jobs = enqueue_evaluations(answers)
+
+        return Response(EvaluationJobSerializer(jobs, many=True).data, status=status.HTTP_202_ACCEPTED)
+
+
+class EvaluationJobView(APIView):
+    def get(self, request, token):
+        job = get_object_or_404(EvaluationJob.objects.select_related('answer'), token=token)
+        owner_id = job.answer.student_id
+        if owner_id is not None and owner_id != request.user.id:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(EvaluationJobSerializer(job).data)
 
 
 class RegisterView(APIView):
@@ -89,15 +320,92 @@ class RegisterView(APIView):
         return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
 
 
+ANSWER_HEAVY_FIELDS = ('answer', 'strengths', 'weaknesses')
+
+
+def _int_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be an integer.'})
+
+
+def _datetime_param(request, name, end_of_day=False):
+    """Parse an ISO date or datetime query param; a bare date with ``end_of_day`` means the next midnight."""
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        day = parse_date(value)
+        if day is not None:
+            parsed = datetime.combine(day + timedelta(days=1) if end_of_day else day, datetime.min.time())
+        else:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise ValueError
+    except ValueError:
+        raise ValidationError({name: 'Must be an ISO 8601 date or datetime.'})
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _answer_history_response(request, answers):
+    """Filter, optionally trim to ``fields=`` and optionally cursor-paginate an answer history."""
+    fields = None
+    if request.query_params.get('fields'):
+        fields = {name.strip() for name in request.query_params['fields'].split(',') if name.strip()}
+        unknown = fields - set(AnswerWithQuestionSerializer.Meta.fields)
+        if unknown:
+            raise ValidationError({'fields': f'Unknown field(s): {sorted(unknown)}'})
+        answers = answers.defer(*[name for name in ANSWER_HEAVY_FIELDS if name not in fields])
+    if fields is None or 'question' in fields:
+        answers = answers.select_related('question')
+
+    category = request.query_params.get('category')
+    subcategory = request.query_params.get('subcategory')
+    min_score = _int_param(request, 'min_score')
+    max_score = _int_param(request, 'max_score')
+    if category:
+        answers = answers.filter(question__category=category)
+    if subcategory:
+        answers = answers.filter(question__subcategory=subcategory)
+    if min_score is not None:
+        answers = answers.filter(score__gte=min_score)
+    if max_score is not None:
+        answers = answers.filter(score__lte=max_score)
+
+    if is_paginated_request(request):
+        rows, next_cursor = paginate_keyset(answers, request)
+        serializer = AnswerWithQuestionSerializer(rows, many=True, fields=fields)
+        return Response({'results': serializer.data, 'next_cursor': next_cursor})
+    serializer = AnswerWithQuestionSerializer(answers.order_by('-created_at', '-id'), many=True, fields=fields)
+    return Response(serializer.data)
+
+
 class StudentAnswerListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         if not request.user.is_student:
             return Response({'detail': 'Only students can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
-        answers = AnswerModel.objects.filter(student=request.user).select_related('question').order_by('-created_at')
-        serializer = AnswerWithQuestionSerializer(answers, many=True)
-        return Response(serializer.data)
+        return _answer_history_response(request, AnswerModel.objects.filter(student_id=request.user.id))
+
+
+def _scored_answers(student_id):
+    return AnswerModel.objects.filter(student_id=student_id, score__isnull=False)
+
+
+def _performance_rows(rows, key_name, key_field):
+    return [
+        {
+            key_name: row[key_field],
+            'average_score': round(row['average_score'], 1),
+            'count': row['count'],
+        }
+        for row in rows
+    ]
 
 
 class PerformanceOverTimeView(APIView):
@@ -110,11 +418,7 @@ class PerformanceOverTimeView(APIView):
         category_filter = request.query_params.get('category', None)
         subcategory_filter = request.query_params.get('subcategory', None)
         
-        # Get all answers for the student
-        answers = AnswerModel.objects.filter(
-            student=request.user,
-            score__isnull=False
-        ).select_related('question').order_by('created_at')
+        answers = _scored_answers(request.user.id)
         
         # Apply filters if provided
         if category_filter:
@@ -122,24 +426,21 @@ class PerformanceOverTimeView(APIView):
         if subcategory_filter:
             answers = answers.filter(question__subcategory=subcategory_filter)
         
-        # Group by month
-        performance_by_month = defaultdict(lambda: {'scores': [], 'count': 0})
-        
-        for answer in answers:
-            month_key = answer.created_at.strftime('%Y-%m')
-            performance_by_month[month_key]['scores'].append(answer.score)
-            performance_by_month[month_key]['count'] += 1
-        
-        # Calculate averages and format data
-        result = []
-        for month in sorted(performance_by_month.keys()):
-            scores = performance_by_month[month]['scores']
-            avg_score = sum(scores) / len(scores) if scores else 0
-            result.append({
-                'month': month,
-                'average_score': round(avg_score, 1),
-                'count': performance_by_month[month]['count']
-            })
+        # Group by month in the database
+        rows = (
+            answers.annotate(month=TruncMonth('created_at'))
+            .values('month')
+            .annotate(average_score=Avg('score'), count=Count('id'))
+            .order_by('month')
+        )
+        result = [
+            {
+                'month': row['month'].strftime('%Y-%m'),
+                'average_score': round(row['average_score'], 1),
+                'count': row['count'],
+            }
+            for row in rows
+        ]
         
         return Response({
             'performance_data': result,
@@ -157,29 +458,13 @@ class PerformanceByCategoryView(APIView):
         if not request.user.is_student:
             return Response({'detail': 'Only students can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Get performance grouped by category
-        answers = AnswerModel.objects.filter(
-            student=request.user,
-            score__isnull=False
-        ).select_related('question')
-        
-        category_performance = defaultdict(lambda: {'scores': [], 'count': 0})
-        
-        for answer in answers:
-            category = answer.question.category
-            category_performance[category]['scores'].append(answer.score)
-            category_performance[category]['count'] += 1
-        
-        result = []
-        for category, data in category_performance.items():
-            avg_score = sum(data['scores']) / len(data['scores']) if data['scores'] else 0
-            result.append({
-                'category': category,
-                'average_score': round(avg_score, 1),
-                'count': data['count']
-            })
-        
-        return Response(result)
+        rows = (
+            _scored_answers(request.user.id)
+            .values('question__category')
+            .annotate(average_score=Avg('score'), count=Count('id'))
+            .order_by('question__category')
+        )
+        return Response(_performance_rows(rows, 'category', 'question__category'))
 
 
 class PerformanceBySubcategoryView(APIView):
@@ -191,43 +476,132 @@ class PerformanceBySubcategoryView(APIView):
         
         category_filter = request.query_params.get('category', None)
         
-        # Get performance grouped by subcategory
-        answers = AnswerModel.objects.filter(
-            student=request.user,
-            score__isnull=False
-        ).select_related('question')
-        
+        answers = _scored_answers(request.user.id)
         if category_filter:
             answers = answers.filter(question__category=category_filter)
         
-        subcategory_performance = defaultdict(lambda: {'scores': [], 'count': 0})
-        
-        for answer in answers:
-            subcategory = answer.question.subcategory
-            subcategory_performance[subcategory]['scores'].append(answer.score)
-            subcategory_performance[subcategory]['count'] += 1
-        
-        result = []
-        for subcategory, data in subcategory_performance.items():
-            avg_score = sum(data['scores']) / len(data['scores']) if data['scores'] else 0
-            result.append({
-                'subcategory': subcategory,
-                'average_score': round(avg_score, 1),
-                'count': data['count']
-            })
-        
-        return Response(result)
+        rows = (
+            answers.values('question__subcategory')
+            .annotate(average_score=Avg('score'), count=Count('id'))
+            .order_by('question__subcategory')
+        )
+        return Response(_performance_rows(rows, 'subcategory', 'question__subcategory'))
+
+
+class PerformanceSummaryView(APIView):
+    """All three performance breakdowns from one grouped query.
+
+    The database groups by (month, category, subcategory); the handful of resulting
+    buckets are then rolled up into the three views using their sums and counts.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_student:
+            return Response({'detail': 'Only students can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+
+        rows = (
+            _scored_answers(request.user.id)
+            .annotate(month=TruncMonth('created_at'))
+            .values('month', 'question__category', 'question__subcategory')
+            .annotate(total=Sum('score'), count=Count('id'))
+        )
+
+        by_month = defaultdict(lambda: [0, 0])
+        by_category = defaultdict(lambda: [0, 0])
+        by_subcategory = defaultdict(lambda: [0, 0])
+        for row in rows:
+            for bucket, key in (
+                (by_month, row['month'].strftime('%Y-%m')),
+                (by_category, row['question__category']),
+                (by_subcategory, row['question__subcategory']),
+            ):
+                bucket[key][0] += row['total']
+                bucket[key][1] += row['count']
+
+        def build_result(buckets, key_name):
+            return [
+                {key_name: key, 'average_score': round(total / count, 1), 'count': count}
+                for key, (total, count) in sorted(buckets.items())
+            ]
+
+        return Response({
+            'over_time': build_result(by_month, 'month'),
+            'by_category': build_result(by_category, 'category'),
+            'by_subcategory': build_result(by_subcategory, 'subcategory'),
+        })
+
+
+class StudentProgressView(APIView):
+    """Everything the dashboard and progress pages show, from the student's progress snapshot."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_student:
+            return Response({'detail': 'Only students can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(progress.as_dict(progress.get_snapshot(request.user.id)))
+
+
+def _with_student_stats(appointments):
+    """Annotate each appointment with its student's answer stats as correlated subqueries."""
+    answers = AnswerModel.objects.filter(student_id=OuterRef('student_id')).order_by()
+    scored = answers.filter(score__isnull=False)
+    return appointments.annotate(
+        student_answer_count=Subquery(answers.values('student_id').annotate(count=Count('id')).values('count')),
+        student_average_score=Subquery(scored.values('student_id').annotate(average=Avg('score')).values('average')),
+        student_latest_score=Subquery(scored.order_by('-created_at', '-id').values('score')[:1]),
+        student_weakest_subcategory=Subquery(
+            scored.values('question__subcategory')
+            .annotate(average=Avg('score'))
+            .order_by('average', 'question__subcategory')
+            .values('question__subcategory')[:1]
+        ),
+        student_has_cv=Exists(CV.objects.filter(student_id=OuterRef('student_id'))),
+    )
 
 
 class FacultyAppointmentListView(APIView):
+    """The faculty member's appointment roster, each row with its student's performance summary.
+
+    Filters: ``status`` (comma-separated), ``from``/``to`` on scheduled_at (ISO dates or
+    datetimes; a ``to`` date includes that whole day). ``ordering`` is scheduled_at or
+    created_at, optionally prefixed with ``-``. Paginated by cursor when ``cursor`` or
+    ``limit`` is given, as the other list endpoints are.
+    """
     permission_classes = [IsAuthenticated]
+    ORDERING_FIELDS = {'scheduled_at', 'created_at'}
 
     def get(self, request):
         if not request.user.is_faculty:
             return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
-        appointments = Appointment.objects.filter(faculty=request.user).select_related('student')
-        serializer = FacultyAppointmentListSerializer(appointments, many=True)
-        return Response(serializer.data)
+        appointments = Appointment.objects.filter(faculty_id=request.user.id).select_related('student')
+
+        statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+        if statuses:
+            unknown = set(statuses) - {choice for choice, _ in Appointment.STATUS_CHOICES}
+            if unknown:
+                raise ValidationError({'status': f'Unknown status(es): {sorted(unknown)}'})
+            appointments = appointments.filter(status__in=statuses)
+        scheduled_from = _datetime_param(request, 'from')
+        scheduled_to = _datetime_param(request, 'to', end_of_day=True)
+        if scheduled_from:
+            appointments = appointments.filter(scheduled_at__gte=scheduled_from)
+        if scheduled_to:
+            appointments = appointments.filter(scheduled_at__lt=scheduled_to)
+
+        ordering = request.query_params.get('ordering', 'scheduled_at')
+        field = ordering.lstrip('-')
+        if field not in self.ORDERING_FIELDS:
+            raise ValidationError({'ordering': f'Must be one of {sorted(self.ORDERING_FIELDS)}, optionally prefixed with -.'})
+        descending = ordering.startswith('-')
+        appointments = _with_student_stats(appointments)
+
+        if is_paginated_request(request):
+            rows, next_cursor = paginate_keyset(appointments, request, field=field, descending=descending)
+            return Response({'results': FacultyRosterSerializer(rows, many=True).data, 'next_cursor': next_cursor})
+        direction = '-' if descending else ''
+        appointments = appointments.order_by(f'{direction}{field}', f'{direction}id')
+        return Response(FacultyRosterSerializer(appointments, many=True).data)
 
 
 class AppointmentCreateView(APIView):
@@ -236,7 +610,7 @@ class AppointmentCreateView(APIView):
     def get(self, request):
         if not request.user.is_student:
             return Response({'detail': 'Only students can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
-        appointments = Appointment.objects.filter(student=request.user).select_related('faculty').order_by('-scheduled_at')
+        appointments = Appointment.objects.filter(student_id=request.user.id).select_related('faculty').order_by('-scheduled_at')
         serializer = StudentAppointmentSerializer(appointments, many=True)
         return Response(serializer.data)
 
@@ -246,53 +620,102 @@ class AppointmentCreateView(APIView):
         serializer = AppointmentSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        serializer.save(student=request.user)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        data = serializer.validated_data
+        try:
+            appointment = scheduling.book(
+                data['faculty'].pk,
+                request.user.id,
+                data['scheduled_at'],
+                **{name: data[name] for name in ('status', 'notes') if name in data},
+            )
+        except scheduling.SlotUnavailableError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(AppointmentSerializer(appointment).data, status=status.HTTP_201_CREATED)
 
 
-class FacultyAnalyticsView(APIView):
+class FacultyAvailabilityView(APIView):
+    """The signed-in faculty member's weekly working hours; PUT replaces the whole list."""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         if not request.user.is_faculty:
             return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+        windows = FacultyAvailability.objects.filter(faculty_id=request.user.id)
+        return Response(FacultyAvailabilitySerializer(windows, many=True).data)
+
+    def put(self, request):
+        if not request.user.is_faculty:
+            return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = FacultyAvailabilitySerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            FacultyAvailability.objects.filter(faculty_id=request.user.id).delete()
+            windows = FacultyAvailability.objects.bulk_create([
+                FacultyAvailability(faculty_id=request.user.id, **window) for window in serializer.validated_data
+            ])
+        return Response(FacultyAvailabilitySerializer(windows, many=True).data)
+
+
+class FacultySlotsView(APIView):
+    """Free appointment slots for one faculty member between ``from`` and ``to`` (local dates, inclusive).
+
+    ``slots`` is null when the faculty member has not set working hours and takes bookings at any time.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, faculty_id):
+        get_object_or_404(get_user_model(), pk=faculty_id, user_type='faculty')
+        first_day = _datetime_param(request, 'from')
+        first_day = timezone.localtime(first_day).date() if first_day else timezone.localdate()
+        last_day = _datetime_param(request, 'to')
+        last_day = timezone.localtime(last_day).date() if last_day else first_day + timedelta(days=6)
+        if last_day < first_day:
+            raise ValidationError({'to': 'Must not be before from.'})
+        if (last_day - first_day).days >= settings.AVAILABILITY_MAX_DAYS:
+            raise ValidationError({'to': f'The range may cover at most {settings.AVAILABILITY_MAX_DAYS} days.'})
+        slots = scheduling.free_slots(faculty_id, first_day, last_day)
+        return Response({
+            'faculty': faculty_id,
+            'from': first_day,
+            'to': last_day,
+            'slots': None if slots is None else [{'start': start, 'end': end} for start, end in slots],
+        })
 
-        answers = AnswerModel.objects.filter(score__isnull=False).select_related('question', 'student')
 
-        subcategory_data = defaultdict(lambda: {'scores': [], 'count': 0})
-        category_data = defaultdict(lambda: {'scores': [], 'count': 0})
-        difficulty_data = defaultdict(lambda: {'scores': [], 'count': 0})
+class FacultyAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        for answer in answers:
-            subcat = answer.question.subcategory
-            cat = answer.question.category
-            diff = answer.question.difficulty
-            subcategory_data[subcat]['scores'].append(answer.score)
-            subcategory_data[subcat]['count'] += 1
-            category_data[cat]['scores'].append(answer.score)
-            category_data[cat]['count'] += 1
-            difficulty_data[diff]['scores'].append(answer.score)
-            difficulty_data[diff]['count'] += 1
+    def get(self, request):
+        if not request.user.is_faculty:
+            return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
 
-        def build_result(data_dict, key_name):
+        def build_result(key_name):
+            rows = (
+                AnswerRollup.objects.values(key_name)
+                .annotate(total=Sum('score_sum'), count=Sum('answer_count'))
+                .filter(count__gt=0)
+                .order_by(key_name)
+            )
             return [
                 {
-                    key_name: k,
-                    'average_score': round(sum(v['scores']) / len(v['scores']), 1),
-                    'count': v['count'],
+                    key_name: row[key_name],
+                    'average_score': round(row['total'] / row['count'], 1),
+                    'count': row['count'],
                 }
-                for k, v in data_dict.items()
+                for row in rows
             ]
 
-        total_answers = answers.count()
-        total_students = answers.values('student').distinct().count()
-        overall_avg = round(sum(a.score for a in answers) / total_answers, 1) if total_answers else 0
-        pending_appointments = Appointment.objects.filter(faculty=request.user, status='pending').count()
+        totals = AnswerRollup.objects.aggregate(total=Sum('score_sum'), count=Sum('answer_count'))
+        total_answers = totals['count'] or 0
+        total_students = StudentAnswerRollup.objects.filter(answer_count__gt=0).count()
+        overall_avg = round(totals['total'] / total_answers, 1) if total_answers else 0
+        pending_appointments = Appointment.objects.filter(faculty_id=request.user.id, status='pending').count()
 
         return Response({
-            'by_subcategory': build_result(subcategory_data, 'subcategory'),
-            'by_category': build_result(category_data, 'category'),
-            'by_difficulty': build_result(difficulty_data, 'difficulty'),
+            'by_subcategory': build_result('subcategory'),
+            'by_category': build_result('category'),
+            'by_difficulty': build_result('difficulty'),
             'stats': {
                 'total_students': total_students,
                 'total_answers': total_answers,
@@ -302,6 +725,131 @@ class FacultyAnalyticsView(APIView):
         })
 
 
+class _Percentile(Aggregate):
+    """PostgreSQL ``percentile_cont(fraction) WITHIN GROUP (ORDER BY expression)``."""
+    function = 'percentile_cont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+
+class FacultyEvaluationTierView(APIView):
+    """Answer count, latency and average score per evaluation tier over the last ``days`` days.
+    p50/p95 latencies need PostgreSQL and are null on other databases."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_faculty:
+            return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+        days = _int_param(request, 'days') or 30
+        aggregates = {
+            'count': Count('id'),
+            'average_score': Avg('score'),
+            'average_ms': Avg('evaluation_ms'),
+            'max_ms': Max('evaluation_ms'),
+        }
+        if connection.vendor == 'postgresql':
+            aggregates['p50_ms'] = _Percentile('evaluation_ms', fraction=0.5)
+            aggregates['p95_ms'] = _Percentile('evaluation_ms', fraction=0.95)
+        rows = (
+            AnswerModel.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+            .exclude(evaluation_tier='')
+            .values('evaluation_tier')
+            .annotate(**aggregates)
+            .order_by('evaluation_tier')
+        )
+        total = sum(row['count'] for row in rows)
+        return Response({
+            'days': days,
+            'total_answers': total,
+            'tiers': [
+                {
+                    'tier': row['evaluation_tier'],
+                    'count': row['count'],
+                    'share': round(row['count'] / total, 3),
+                    'average_score': round(row['average_score'], 1) if row['average_score'] is not None else None,
+                    'average_ms': round(row['average_ms']) if row['average_ms'] is not None else None,
+                    'p50_ms': round(row['p50_ms']) if row.get('p50_ms') is not None else None,
+                    'p95_ms': round(row['p95_ms']) if row.get('p95_ms') is not None else None,
+                    'max_ms': row['max_ms'],
+                }
+                for row in rows
+            ],
+        })
+
+
+class FacultyEvaluationUsageView(APIView):
+    """OpenAI token usage, cost and latency per day and category over the last ``days`` days."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_faculty:
+            return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(usage.report(_int_param(request, 'days') or 30))
+
+
+class FacultyAnswerExportView(APIView):
+    """Stream every matching answer with its question and student as CSV or NDJSON.
+
+    Query params: ``output`` (csv or ndjson; ``format`` is taken by DRF), ``gzip=1``,
+    ``from``/``to`` on created_at, ``category``, ``subcategory`` and ``student``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_faculty:
+            return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in exports.FORMATS:
+            raise ValidationError({'output': f'Must be one of {sorted(exports.FORMATS)}.'})
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        queryset = exports.answers(
+            since=_datetime_param(request, 'from'),
+            until=_datetime_param(request, 'to', end_of_day=True),
+            category=request.query_params.get('category'),
+            subcategory=request.query_params.get('subcategory'),
+            student_id=_int_param(request, 'student'),
+        )
+        # Async content: under ASGI a synchronous iterator is read whole before the first byte is sent.
+        response = StreamingHttpResponse(
+            exports.astream(queryset, fmt, compress),
+            content_type='application/gzip' if compress else exports.FORMATS[fmt],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{exports.filename(fmt, compress, timezone.now())}"'
+        return response
+
+
+class FacultyQuestionImportView(APIView):
+    """Bulk-add questions from an uploaded CSV, JSON or NDJSON ``file``.
+
+    The format comes from the ``format`` field or the file extension. Invalid rows and
+    duplicates of existing questions are skipped and reported; ``dry_run`` validates only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.is_faculty:
+            return Response({'detail': 'Only faculty can import questions.'}, status=status.HTTP_403_FORBIDDEN)
+        max_bytes = settings.QUESTION_IMPORT_MAX_BYTES
+        if uploads.content_length_exceeds(request, max_bytes):
+            return uploads.too_large_response(max_bytes)
+        size_limit = uploads.install_size_limit(request, max_bytes)
+        upload = request.FILES.get('file')
+        if size_limit.exceeded:
+            return uploads.too_large_response(max_bytes)
+        if not upload:
+            return Response({'detail': 'No file provided.'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or question_import.detect_format(upload.name)
+        if fmt not in question_import.FORMATS:
+            raise ValidationError({'format': f'Must be one of {list(question_import.FORMATS)}.'})
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true')
+        try:
+            report = question_import.import_questions(question_import.read_rows(upload, fmt), dry_run=dry_run)
+        except question_import.ImportFormatError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        created = report['created'] and not dry_run
+        return Response(report, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
 class FacultyListView(APIView):
     def get(self, request):
         User = get_user_model()
@@ -315,26 +863,35 @@ class AppointmentStatusUpdateView(APIView):
     def patch(self, request, pk):
         if not request.user.is_faculty:
             return Response({'detail': 'Only faculty can update appointment status.'}, status=status.HTTP_403_FORBIDDEN)
-        appointment = get_object_or_404(Appointment, pk=pk, faculty=request.user)
+        appointment = get_object_or_404(Appointment, pk=pk, faculty_id=request.user.id)
         new_status = request.data.get('status')
         if new_status not in ('confirmed', 'cancelled', 'pending'):
             return Response(
                 {'detail': 'Invalid status. Must be confirmed, cancelled, or pending.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        appointment.status = new_status
-        appointment.save()
+        try:
+            scheduling.set_status(appointment, new_status)
+        except scheduling.SlotUnavailableError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
         return Response(FacultyAppointmentListSerializer(appointment).data)
 
 
+# Columns needed for CV metadata responses and for file operations; neither touches pdf_base64
+# (only serve_cv_pdf reads it, for CVs not yet moved to storage).
+CV_METADATA_FIELDS = ('id', 'student', 'filename', 'size_bytes', 'uploaded_at')
+CV_FILE_FIELDS = CV_METADATA_FIELDS + ('pdf', 'checksum', 'has_pdf')
+
+
 class StudentCVView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CVUploadThrottle]
 
     def get(self, request):
         if not request.user.is_student:
             return Response({'detail': 'Students only.'}, status=status.HTTP_403_FORBIDDEN)
         try:
-            cv = CV.objects.get(student=request.user, pdf_base64__gt='')
+            cv = CV.objects.only(*CV_METADATA_FIELDS).with_pdf().get(student_id=request.user.id)
             return Response(CVSerializer(cv).data)
         except CV.DoesNotExist:
             return Response(None)
@@ -342,19 +899,27 @@ class StudentCVView(APIView):
     def post(self, request):
         if not request.user.is_student:
             return Response({'detail': 'Students only.'}, status=status.HTTP_403_FORBIDDEN)
+        max_bytes = settings.CV_MAX_UPLOAD_BYTES
+        if uploads.content_length_exceeds(request, max_bytes):
+            return uploads.too_large_response(max_bytes)
+        size_limit = uploads.install_size_limit(request, max_bytes)
         pdf_file = request.FILES.get('pdf')
+        if size_limit.exceeded:
+            return uploads.too_large_response(max_bytes)
         if not pdf_file:
             return Response({'error': 'No PDF provided.'}, status=status.HTTP_400_BAD_REQUEST)
-        cv, _ = CV.objects.get_or_create(student=request.user)
-        cv.pdf_base64 = base64.b64encode(pdf_file.read()).decode('utf-8')
-        cv.filename = pdf_file.name
-        cv.save()
+        with transaction.atomic():
+            cv, _ = CV.objects.only(*CV_FILE_FIELDS).get_or_create(student_id=request.user.id)
+            save_cv_pdf(cv, pdf_file)
+            cv.save()
         return Response(CVSerializer(cv).data, status=status.HTTP_201_CREATED)
 
     def delete(self, request):
         if not request.user.is_student:
             return Response({'detail': 'Students only.'}, status=status.HTTP_403_FORBIDDEN)
-        CV.objects.filter(student=request.user).delete()
+        cv = CV.objects.only(*CV_FILE_FIELDS).filter(student_id=request.user.id).first()
+        if cv:
+            cv.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -364,11 +929,8 @@ class StudentCVDownloadView(APIView):
     def get(self, request):
         if not request.user.is_student:
             return Response({'detail': 'Students only.'}, status=status.HTTP_403_FORBIDDEN)
-        cv = get_object_or_404(CV, student=request.user)
-        pdf_bytes = base64.b64decode(cv.pdf_base64)
-        response = HttpResponse(pdf_bytes, content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="{cv.filename}"'
-        return response
+        cv = get_object_or_404(CV.objects.only(*CV_FILE_FIELDS).with_pdf(), student_id=request.user.id)
+        return serve_cv_pdf(request, cv)
 
 
 class FacultyStudentCVView(APIView):
@@ -378,13 +940,13 @@ class FacultyStudentCVView(APIView):
         if not request.user.is_faculty:
             return Response({'detail': 'Faculty only.'}, status=status.HTTP_403_FORBIDDEN)
         has_appointment = Appointment.objects.filter(
-            faculty=request.user,
+            faculty_id=request.user.id,
             student__id=student_id,
         ).exists()
         if not has_appointment:
             return Response({'detail': 'No appointment found with this student.'}, status=status.HTTP_403_FORBIDDEN)
         try:
-            cv = CV.objects.get(student__id=student_id, pdf_base64__gt='')
+            cv = CV.objects.only(*CV_METADATA_FIELDS).with_pdf().get(student__id=student_id)
             return Response(CVSerializer(cv).data)
         except CV.DoesNotExist:
             return Response(None)
@@ -397,16 +959,13 @@ class FacultyStudentCVDownloadView(APIView):
         if not request.user.is_faculty:
             return Response({'detail': 'Faculty only.'}, status=status.HTTP_403_FORBIDDEN)
         has_appointment = Appointment.objects.filter(
-            faculty=request.user,
+            faculty_id=request.user.id,
             student__id=student_id,
         ).exists()
         if not has_appointment:
             return Response({'detail': 'No appointment found with this student.'}, status=status.HTTP_403_FORBIDDEN)
-        cv = get_object_or_404(CV, student__id=student_id)
-        pdf_bytes = base64.b64decode(cv.pdf_base64)
-        response = HttpResponse(pdf_bytes, content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="{cv.filename}"'
-        return response
+        cv = get_object_or_404(CV.objects.only(*CV_FILE_FIELDS).with_pdf(), student__id=student_id)
+        return serve_cv_pdf(request, cv)
 
 
 class FacultyStudentAnswersView(APIView):
@@ -417,6 +976,4 @@ class FacultyStudentAnswersView(APIView):
             return Response({'detail': 'Only faculty can access this endpoint.'}, status=status.HTTP_403_FORBIDDEN)
         User = get_user_model()
         student = get_object_or_404(User, pk=student_id, user_type='student')
-        answers = AnswerModel.objects.filter(student=student).select_related('question').order_by('-created_at')
-        serializer = AnswerWithQuestionSerializer(answers, many=True)
-        return Response(serializer.data)
+        return _answer_history_response(request, AnswerModel.objects.filter(student=student))
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'unitalk_backend.settings')
 
 application = get_asgi_application()
+
+# Imported after setup: the app registry must be ready.
+from api_backend.evaluation_jobs import start_sweeper  # noqa: E402
+
+start_sweeper()
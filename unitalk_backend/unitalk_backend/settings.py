@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'corsheaders',
     'api_backend',
@@ -47,8 +49,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api_backend.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api_backend.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -97,6 +100,27 @@ DATABASES = {
     }
 }
 
+# DB_CONNECTION_MODE selects how connections are reused:
+#   pgbouncer  - (default) a new connection per request, for transaction-mode poolers.
+#   persistent - keep each worker's connection for DB_CONN_MAX_AGE seconds with health checks;
+#                use with a session-mode pooler or a direct connection (e.g. DB_PORT=5432).
+#   pool       - Django's native connection pool (psycopg_pool); use with a direct connection
+#                or a session-mode pooler, as for persistent.
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'pgbouncer')
+if DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', '600'))
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONNECTION_MODE == 'pool':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    }
+
+# Per-request query instrumentation (api_backend.middleware.QueryBudgetMiddleware).
+QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', '20'))
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'True') == 'True'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,15 +158,42 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
+
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
+    "cvs": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": MEDIA_ROOT / 'cvs'},
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
     },
 }
 
+# Uploaded CV PDFs default to local disk, which is wiped on every deploy on hosts such as Render.
+# There, set CV_STORAGE_BACKEND=storages.backends.s3.S3Storage (django-storages) with
+# CV_S3_BUCKET, and CV_S3_REGION / CV_S3_ENDPOINT_URL for S3-compatible stores; boto3 reads
+# AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY itself. Any other Storage path is used as is.
+CV_STORAGE_BACKEND = os.environ.get('CV_STORAGE_BACKEND', '')
+if CV_STORAGE_BACKEND == 'storages.backends.s3.S3Storage':
+    STORAGES['cvs'] = {
+        'BACKEND': CV_STORAGE_BACKEND,
+        'OPTIONS': {
+            'bucket_name': os.environ.get('CV_S3_BUCKET'),
+            'region_name': os.environ.get('CV_S3_REGION') or None,
+            'endpoint_url': os.environ.get('CV_S3_ENDPOINT_URL') or None,
+            'location': 'cvs',
+            'default_acl': 'private',
+            'file_overwrite': False,
+            'querystring_auth': True,
+        },
+    }
+elif CV_STORAGE_BACKEND:
+    STORAGES['cvs'] = {'BACKEND': CV_STORAGE_BACKEND}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -152,10 +203,61 @@ AUTH_USER_MODEL = 'api_backend.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api_backend.authentication.StatelessJWTAuthentication',
     ),
+    # Reverse proxies in front of the app (Render's load balancer is one). Throttles take the client
+    # IP from this many hops back in X-Forwarded-For; without it a client could pick its own IP.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '1')),
 }
 
+# Token-bucket rate limits (see api_backend/ratelimit.py), as "<tokens>/<s|min|hour|day>".
+# An empty value disables that limit. RATE_LIMIT_STORE is 'database' or 'cache'.
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'database')
+RATE_LIMITS = {
+    'evaluation_user': os.environ.get('RATE_LIMIT_EVALUATION_USER', '20/min'),
+    'evaluation_ip': os.environ.get('RATE_LIMIT_EVALUATION_IP', '30/min'),
+    'evaluation_global': os.environ.get('RATE_LIMIT_EVALUATION_GLOBAL', '300/min'),
+    'cv_upload_user': os.environ.get('RATE_LIMIT_CV_UPLOAD_USER', '10/hour'),
+}
+
+# Largest CV PDF accepted, in bytes; larger uploads get a 413 without being stored.
+CV_MAX_UPLOAD_BYTES = int(os.environ.get('CV_MAX_UPLOAD_BYTES', str(5 * 1024 * 1024)))
+
+# Seconds a user's is_active/user_type may be served from cache by StatelessJWTAuthentication.
+# Saving or deleting a user clears it immediately; the TTL bounds staleness for other writes.
+AUTH_USER_STATE_TTL = int(os.environ.get('AUTH_USER_STATE_TTL', '60'))
+
+# Near-duplicate question detection (see api_backend/question_index.py). New questions at or
+# above QUESTION_DUPLICATE_THRESHOLD cosine similarity are rejected; those above
+# QUESTION_SIMILAR_THRESHOLD are accepted and returned with the similar questions listed.
+# On a labelled set of interview questions, paraphrases scored 0.73-0.95 and unrelated pairs at
+# most 0.65 (shared "Tell me about a time you..." openings), plus hash-collision noise with a
+# standard deviation of about 1/sqrt(QUESTION_INDEX_DIM). At 128 columns that noise alone put
+# unrelated questions near 0.45; at 1024 it is about 0.03, so nothing unrelated reaches 0.85.
+# The matrix is QUESTION_INDEX_DIM float32 columns per question (4 MB per 1k questions).
+QUESTION_DUPLICATE_THRESHOLD = float(os.environ.get('QUESTION_DUPLICATE_THRESHOLD', '0.85'))
+QUESTION_SIMILAR_THRESHOLD = float(os.environ.get('QUESTION_SIMILAR_THRESHOLD', '0.7'))
+QUESTION_INDEX_PATH = os.environ.get('QUESTION_INDEX_PATH', '/tmp/unitalk_question_index.npz')
+QUESTION_INDEX_DIM = int(os.environ.get('QUESTION_INDEX_DIM', '1024'))
+QUESTION_INDEX_SAVE_EVERY = int(os.environ.get('QUESTION_INDEX_SAVE_EVERY', '100'))
+
+# Longest date range, in days, one request to /faculty/<id>/availability/ may ask for.
+AVAILABILITY_MAX_DAYS = int(os.environ.get('AVAILABILITY_MAX_DAYS', '31'))
+
+# Rows fetched per query by the streaming answer export (see api_backend/exports.py).
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '2000'))
+
+# Bulk question import (see api_backend/question_import.py): largest accepted upload, rows per
+# bulk_create batch, and how many row errors the report lists.
+QUESTION_IMPORT_MAX_BYTES = int(os.environ.get('QUESTION_IMPORT_MAX_BYTES', str(20 * 1024 * 1024)))
+QUESTION_IMPORT_BATCH_SIZE = int(os.environ.get('QUESTION_IMPORT_BATCH_SIZE', '1000'))
+QUESTION_IMPORT_MAX_ERRORS = int(os.environ.get('QUESTION_IMPORT_MAX_ERRORS', '500'))
+
+# Student dashboard snapshot (see api_backend/progress.py): how many recent scores the trend
+# keeps and how many weeks the activity histogram covers.
+PROGRESS_TREND_LENGTH = int(os.environ.get('PROGRESS_TREND_LENGTH', '20'))
+PROGRESS_ACTIVITY_WEEKS = int(os.environ.get('PROGRESS_ACTIVITY_WEEKS', '12'))
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -174,3 +276,82 @@ CORS_ALLOWED_ORIGIN_REGEXES = [
 ]
 
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+
+# Shared cache used for the question bank version/payload. The file-based default is shared
+# by all workers on one host; set REDIS_URL (requires the `redis` package) to share it
+# across hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', '/tmp/unitalk_cache'),
+    },
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Background answer evaluation (see api_backend/evaluation_jobs.py).
+# EVALUATION_WORKERS threads run inside each web process; set it to 0 and run
+# `python manage.py run_evaluation_worker` to process jobs out of process instead.
+EVALUATION_WORKERS = int(os.environ.get('EVALUATION_WORKERS', '2'))
+EVALUATION_MAX_ATTEMPTS = int(os.environ.get('EVALUATION_MAX_ATTEMPTS', '3'))
+EVALUATION_JOB_TIMEOUT = int(os.environ.get('EVALUATION_JOB_TIMEOUT', '300'))
+# A failed attempt is retried after EVALUATION_RETRY_DELAY seconds, doubling per attempt.
+EVALUATION_RETRY_DELAY = float(os.environ.get('EVALUATION_RETRY_DELAY', '10'))
+# Jobs put back because OPENAI_MAX_CONCURRENCY calls were in flight wait this many seconds.
+EVALUATION_BUSY_RETRY_DELAY = float(os.environ.get('EVALUATION_BUSY_RETRY_DELAY', '2'))
+# Each web process also drains the queue at startup and every EVALUATION_SWEEP_INTERVAL
+# seconds, for jobs left behind by a restart (0 disables the sweep).
+EVALUATION_SWEEP_INTERVAL = float(os.environ.get('EVALUATION_SWEEP_INTERVAL', '30'))
+
+# Persistent evaluation cache (see api_backend/evaluation_cache.py). Entries are keyed on the
+# question, normalised answer text, rubric and model, so editing RUBRIC invalidates them.
+EVALUATION_CACHE_ENABLED = os.environ.get('EVALUATION_CACHE_ENABLED', 'True') == 'True'
+EVALUATION_CACHE_TTL = int(os.environ.get('EVALUATION_CACHE_TTL', str(30 * 24 * 3600)))
+EVALUATION_CACHE_MAX_ENTRIES = int(os.environ.get('EVALUATION_CACHE_MAX_ENTRIES', '50000'))
+# Expired and overflow entries are evicted on about one write in EVALUATION_CACHE_EVICT_EVERY
+# (and by `manage.py evaluation_cache --evict`).
+EVALUATION_CACHE_EVICT_EVERY = int(os.environ.get('EVALUATION_CACHE_EVICT_EVERY', '100'))
+EVALUATION_BATCH_MAX_SIZE = int(os.environ.get('EVALUATION_BATCH_MAX_SIZE', '20'))
+
+# Evaluator backends (see api_backend/evaluators.py): 'tiered', 'openai' (always the full
+# model) or the in-process 'heuristic'.
+# EVALUATOR_BACKENDS_BY_CATEGORY overrides the backend per question category, written as
+# "Consulting=heuristic,Investment Banking=openai". The fallback backend ('' to disable) is
+# used when the chosen one is unreachable, for EVALUATOR_FALLBACK_COOLDOWN seconds.
+EVALUATOR_BACKEND = os.environ.get('EVALUATOR_BACKEND', 'tiered')
+EVALUATOR_BACKENDS_BY_CATEGORY = dict(
+    pair.split('=', 1) for pair in os.environ.get('EVALUATOR_BACKENDS_BY_CATEGORY', '').split(',') if '=' in pair
+)
+EVALUATOR_FALLBACK_BACKEND = os.environ.get('EVALUATOR_FALLBACK_BACKEND', 'heuristic')
+EVALUATOR_FALLBACK_COOLDOWN = float(os.environ.get('EVALUATOR_FALLBACK_COOLDOWN', '30'))
+
+# Tiered routing (EVALUATOR_BACKEND=tiered, see evaluators.TieredEvaluator). Answers under
+# EVALUATION_MIN_WORDS words, non-English or garbled get a rule-based result; the rest are
+# scored by OPENAI_SCREEN_MODEL and escalated to the full model when its confidence is below
+# EVALUATION_ESCALATION_CONFIDENCE or the difficulty is in EVALUATION_ESCALATE_DIFFICULTIES.
+OPENAI_SCREEN_MODEL = os.environ.get('OPENAI_SCREEN_MODEL', 'gpt-4o-mini')
+EVALUATION_MIN_WORDS = int(os.environ.get('EVALUATION_MIN_WORDS', '5'))
+EVALUATION_ESCALATION_CONFIDENCE = float(os.environ.get('EVALUATION_ESCALATION_CONFIDENCE', '0.7'))
+EVALUATION_ESCALATE_DIFFICULTIES = os.environ.get('EVALUATION_ESCALATE_DIFFICULTIES', 'Hard').split(',')
+
+# OpenAI client (see api_backend/openai_service.py). One pooled client is shared per process;
+# calls beyond OPENAI_MAX_CONCURRENCY wait up to OPENAI_QUEUE_TIMEOUT seconds, then get a 503.
+OPENAI_CONNECT_TIMEOUT = float(os.environ.get('OPENAI_CONNECT_TIMEOUT', '5'))
+OPENAI_READ_TIMEOUT = float(os.environ.get('OPENAI_READ_TIMEOUT', '60'))
+OPENAI_POOL_MAXSIZE = int(os.environ.get('OPENAI_POOL_MAXSIZE', '10'))
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get('OPENAI_KEEPALIVE_EXPIRY', '60'))
+OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', '2'))
+OPENAI_RETRY_BASE_DELAY = float(os.environ.get('OPENAI_RETRY_BASE_DELAY', '0.5'))
+OPENAI_RETRY_MAX_DELAY = float(os.environ.get('OPENAI_RETRY_MAX_DELAY', '8'))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', '4'))
+OPENAI_QUEUE_TIMEOUT = float(os.environ.get('OPENAI_QUEUE_TIMEOUT', '0.5'))
+
+# USD per million tokens by model, for the evaluation usage report. Override with a JSON object
+# of the same shape in OPENAI_PRICING.
+OPENAI_PRICING = json.loads(os.environ.get('OPENAI_PRICING', 'null')) or {
+    'gpt-4o': {'input': 2.50, 'cached_input': 1.25, 'output': 10.00},
+    'gpt-4o-mini': {'input': 0.15, 'cached_input': 0.075, 'output': 0.60},
+}
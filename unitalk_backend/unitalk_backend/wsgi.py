@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'unitalk_backend.settings')
 
 application = get_wsgi_application()
+
+# Imported after setup: the app registry must be ready.
+from api_backend.evaluation_jobs import start_sweeper  # noqa: E402
+
+start_sweeper()
@@ -340,10 +340,9 @@ export default function FacultyDashboard() {
   const [selectedAppt, setSelectedAppt] = useState(null);
 
   useEffect(() => {
-    api.get('/faculty/appointments/')
+    api.get('/faculty/appointments/', { params: { status: 'pending,confirmed' } })
       .then(({ data }) => {
         const sorted = data
-          .filter((a) => a.status !== 'cancelled')
           .sort((a, b) => {
             if (a.status === 'pending' && b.status !== 'pending') return -1;
             if (a.status !== 'pending' && b.status === 'pending') return 1;
@@ -360,7 +359,7 @@ export default function FacultyDashboard() {
     try {
       const { data } = await api.patch(`/appointments/${apptId}/status/`, { status: newStatus });
       setAppointments((prev) => {
-        const updated = prev.map((a) => (a.id === apptId ? data : a));
+        const updated = prev.map((a) => (a.id === apptId ? { ...a, ...data } : a));
         if (newStatus === 'cancelled') return updated.filter((a) => a.id !== apptId);
         return updated;
       });
@@ -419,6 +418,15 @@ export default function FacultyDashboard() {
                       })}
                     </span>
                     {appt.notes && <p className="fac-appt-notes">{appt.notes}</p>}
+                    {appt.student_stats && (
+                      <p className="fac-appt-notes">
+                        {appt.student_stats.answer_count} answer{appt.student_stats.answer_count !== 1 ? 's' : ''}
+                        {appt.student_stats.average_score != null && ` · avg ${appt.student_stats.average_score}`}
+                        {appt.student_stats.latest_score != null && ` · latest ${appt.student_stats.latest_score}`}
+                        {appt.student_stats.weakest_subcategory && ` · weakest: ${appt.student_stats.weakest_subcategory}`}
+                        {appt.student_stats.has_cv && ' · CV on file'}
+                      </p>
+                    )}
                     <span className="fac-appt-cta">View performance →</span>
                   </div>
                 ))}
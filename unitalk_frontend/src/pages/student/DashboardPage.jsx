@@ -20,22 +20,25 @@ function diffStyle(d) {
 export default function DashboardPage() {
   const { user }   = useAuth();
   const navigate   = useNavigate();
-  const [answers, setAnswers] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [progress, setProgress] = useState(null);
+  const [recent, setRecent]     = useState([]);
+  const [loading, setLoading]   = useState(true);
 
   useEffect(() => {
-    api.get('/student/answers/')
-      .then(({ data }) => setAnswers(data))
-      .catch(() => setAnswers([]))
-      .finally(() => setLoading(false));
+    // Totals come from the server-side progress snapshot; only the five newest answers are fetched.
+    Promise.all([
+      api.get('/student/progress/')
+        .then(({ data }) => setProgress(data))
+        .catch(() => setProgress(null)),
+      api.get('/student/answers/', { params: { limit: 5, fields: 'id,question,score,created_at' } })
+        .then(({ data }) => setRecent(data.results))
+        .catch(() => setRecent([])),
+    ]).finally(() => setLoading(false));
   }, []);
 
-  const scored     = answers.filter((a) => a.score != null);
-  const avgScore   = scored.length
-    ? Math.round(scored.reduce((s, a) => s + a.score, 0) / scored.length)
-    : null;
-  const bestScore  = scored.length ? Math.max(...scored.map((a) => a.score)) : null;
-  const recent     = answers.slice(0, 5);
+  const answerCount = progress?.answer_count ?? 0;
+  const avgScore    = progress?.average_score != null ? Math.round(progress.average_score) : null;
+  const bestScore   = progress?.best_score ?? null;
 
   return (
     <div className="db-page">
@@ -49,7 +52,7 @@ export default function DashboardPage() {
       {/* ── Stats row ───────────────────────────────────────────── */}
       <div className="db-stats">
         <div className="db-stat-card" style={{ '--db-accent': '#6366F1' }}>
-          <span className="db-stat-num">{answers.length}</span>
+          <span className="db-stat-num">{answerCount}</span>
           <span className="db-stat-lbl">Sessions completed</span>
         </div>
         <div className="db-stat-card" style={{ '--db-accent': '#10B981' }}>
@@ -69,7 +72,7 @@ export default function DashboardPage() {
         <div className="db-card">
           <div className="db-card-hd">
             <h2>Recent Sessions</h2>
-            {answers.length > 0 && (
+            {answerCount > 0 && (
               <button className="db-link-btn" onClick={() => navigate('/student/feedback')}>
                 View all →
               </button>
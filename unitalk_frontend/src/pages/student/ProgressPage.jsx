@@ -19,19 +19,15 @@ const yScore = (s) => CM.top  + CH - (s / 100) * CH;    // score 0–100 → y
 const mIdx   = (str) => parseInt(str.split('-')[1], 10) - 1; // "2026-02" → 1
 
 export default function ProgressPage() {
-  const [answers, setAnswers] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [progress, setProgress] = useState(null);
   const [performanceData, setPerformanceData] = useState([]);
   const [selectedCategory, setSelectedCategory] = useState('All');
   const [selectedSubcategory, setSelectedSubcategory] = useState('All');
-  const [categoryPerformance, setCategoryPerformance] = useState([]);
-  const [subcategoryPerformance, setSubcategoryPerformance] = useState([]);
 
   useEffect(() => {
-    api.get('/student/answers/')
-      .then(({ data }) => setAnswers(data))
-      .catch(() => setAnswers([]))
-      .finally(() => setLoading(false));
+    api.get('/student/progress/')
+      .then(({ data }) => setProgress(data))
+      .catch(() => setProgress(null));
   }, []);
 
   useEffect(() => {
@@ -43,22 +39,27 @@ export default function ProgressPage() {
     api.get('/student/performance/over-time/', { params })
       .then(({ data }) => setPerformanceData(data.performance_data ?? []))
       .catch(() => setPerformanceData([]));
-
-    // Fetch performance by category
-    api.get('/student/performance/by-category/')
-      .then(({ data }) => setCategoryPerformance(data))
-      .catch(() => setCategoryPerformance([]));
-
-    // Fetch performance by subcategory
-    const subcatParams = selectedCategory !== 'All' ? { category: selectedCategory } : {};
-    api.get('/student/performance/by-subcategory/', { params: subcatParams })
-      .then(({ data }) => setSubcategoryPerformance(data))
-      .catch(() => setSubcategoryPerformance([]));
   }, [selectedCategory, selectedSubcategory]);
 
+  // Category and subcategory averages come from the progress snapshot, not a per-filter query.
+  const byCategory = (progress?.by_category ?? []).filter((c) => c.count > 0);
+  const categoryPerformance = byCategory.map(({ category, average_score }) => ({ category, average_score }));
+  const subcategoryTotals = {};
+  byCategory
+    .filter((c) => selectedCategory === 'All' || c.category === selectedCategory)
+    .flatMap((c) => c.subcategories)
+    .filter((s) => s.count > 0)
+    .forEach(({ subcategory, count, average_score }) => {
+      const total = subcategoryTotals[subcategory] ?? { count: 0, sum: 0 };
+      subcategoryTotals[subcategory] = { count: total.count + count, sum: total.sum + average_score * count };
+    });
+  const subcategoryPerformance = Object.entries(subcategoryTotals)
+    .map(([subcategory, { count, sum }]) => ({ subcategory, average_score: sum / count }))
+    .sort((a, b) => a.subcategory.localeCompare(b.subcategory));
 
   const weeklyGoal = 7;
-  const weeklyProgress = Math.min(answers.length, weeklyGoal);
+  const thisWeek = progress?.weekly_activity?.at(-1)?.count ?? 0;
+  const weeklyProgress = Math.min(thisWeek, weeklyGoal);
 
   // Sort data by month so the polyline draws left-to-right
   const sortedData = [...performanceData].sort((a, b) => a.month.localeCompare(b.month));
@@ -28,7 +28,9 @@ export default function AddQuestion() {
       setForm({ question: '', category: 'Investment Banking', subcategory: 'Behavioral', difficulty: 'Medium' });
     } catch (err) {
       const data = err.response?.data;
-      if (typeof data === 'object') {
+      if (data?.duplicates?.length) {
+        setError(`${data.detail} "${data.duplicates[0].question}"`);
+      } else if (typeof data === 'object') {
         const msg = Object.entries(data)
           .map(([k, v]) => `${k}: ${Array.isArray(v) ? v.join(' ') : v}`)
           .join(' | ');
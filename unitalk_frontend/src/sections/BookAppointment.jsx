@@ -9,6 +9,9 @@ export default function BookAppointment() {
   const [fetchError, setFetchError] = useState('');
   const [submitError, setSubmitError] = useState('');
   const [success, setSuccess] = useState(false);
+  const [date, setDate] = useState('');
+  // undefined while loading; null when the faculty member takes bookings at any time.
+  const [slots, setSlots] = useState(undefined);
 
   useEffect(() => {
     api.get('/faculty/')
@@ -16,6 +19,14 @@ export default function BookAppointment() {
       .catch(() => setFetchError('Failed to load faculty list.'));
   }, []);
 
+  useEffect(() => {
+    setSlots(undefined);
+    if (!form.faculty || !date) return;
+    api.get(`/faculty/${form.faculty}/availability/`, { params: { from: date, to: date } })
+      .then(({ data }) => setSlots(data.slots))
+      .catch(() => setSlots([]));
+  }, [form.faculty, date, success]);
+
   async function handleSubmit(e) {
     e.preventDefault();
     setSubmitError('');
@@ -29,7 +40,7 @@ export default function BookAppointment() {
         notes: form.notes,
       });
       setSuccess(true);
-      setForm({ faculty: '', scheduled_at: '', notes: '' });
+      setForm({ ...form, scheduled_at: '', notes: '' });
     } catch (err) {
       const data = err.response?.data;
       if (typeof data === 'object') {
@@ -65,15 +76,55 @@ export default function BookAppointment() {
             ))}
           </select>
         </div>
-        <div className="form-group">
-          <label>Date & Time</label>
-          <input
-            type="datetime-local"
-            value={form.scheduled_at}
-            onChange={(e) => setForm({ ...form, scheduled_at: e.target.value })}
-            required
-          />
-        </div>
+        {slots === null ? (
+          <div className="form-group">
+            <label>Date & Time</label>
+            <input
+              type="datetime-local"
+              value={form.scheduled_at}
+              onChange={(e) => setForm({ ...form, scheduled_at: e.target.value })}
+              required
+            />
+          </div>
+        ) : (
+          <>
+            <div className="form-group">
+              <label>Date</label>
+              <input
+                type="date"
+                value={date}
+                onChange={(e) => {
+                  setDate(e.target.value);
+                  setForm({ ...form, scheduled_at: '' });
+                }}
+                required
+              />
+            </div>
+            <div className="form-group">
+              <label>Time</label>
+              <select
+                value={form.scheduled_at}
+                onChange={(e) => setForm({ ...form, scheduled_at: e.target.value })}
+                disabled={!slots?.length}
+                required
+              >
+                <option value="">
+                  {!form.faculty || !date ? 'Pick a faculty member and date…'
+                    : slots === undefined ? 'Loading…'
+                    : slots.length === 0 ? 'No free slots on this day'
+                    : 'Select a time…'}
+                </option>
+                {(slots || []).map((slot) => (
+                  <option key={slot.start} value={slot.start}>
+                    {new Date(slot.start).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}
+                    {' – '}
+                    {new Date(slot.end).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })}
+                  </option>
+                ))}
+              </select>
+            </div>
+          </>
+        )}
         <div className="form-group">
           <label>Notes (optional)</label>
           <textarea
@@ -12,14 +12,28 @@ function parseList(value) {
     .filter(Boolean);
 }
 
+const PAGE_SIZE = 20;
+
 export default function MyProgress() {
+  const [progress, setProgress] = useState(null);
   const [answers, setAnswers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
+  const loadAnswers = (cursor) =>
+    api.get('/student/answers/', { params: { limit: PAGE_SIZE, ...(cursor && { cursor }) } })
+      .then(({ data }) => {
+        setAnswers((prev) => (cursor ? [...prev, ...data.results] : data.results));
+        setNextCursor(data.next_cursor);
+      });
+
   useEffect(() => {
-    api.get('/student/answers/')
-      .then(({ data }) => setAnswers(data))
+    // Totals come from the progress snapshot; the answer history is fetched a page at a time.
+    Promise.all([
+      api.get('/student/progress/').then(({ data }) => setProgress(data)),
+      loadAnswers(null),
+    ])
       .catch(() => setError('Failed to load progress.'))
       .finally(() => setLoading(false));
   }, []);
@@ -31,6 +45,11 @@ export default function MyProgress() {
   return (
     <>
       <h2>My Progress</h2>
+      {progress && (
+        <p className="question-label">
+          {progress.answer_count} answers · average {progress.average_score ?? '—'} · best {progress.best_score ?? '—'}
+        </p>
+      )}
       <div className="progress-list">
         {answers.map((a) => (
           <div key={a.id} className="progress-card">
@@ -60,6 +79,11 @@ export default function MyProgress() {
           </div>
         ))}
       </div>
+      {nextCursor && (
+        <button className="filter-btn" onClick={() => loadAnswers(nextCursor).catch(() => setError('Failed to load progress.'))}>
+          Load more
+        </button>
+      )}
     </>
   );
 }
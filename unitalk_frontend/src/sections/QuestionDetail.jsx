@@ -4,6 +4,10 @@ import ScoreBadge from '../components/ScoreBadge.jsx';
 import '../styles/components.css';
 import '../styles/dashboard.css';
 
+const POLL_INTERVAL_MS = 1500;
+// Past this the job is left to the server's retries; the answer is already saved.
+const POLL_TIMEOUT_MS = 3 * 60 * 1000;
+
 export default function QuestionDetail({ question, onBack, questionId }) {
   const [answer, setAnswer] = useState('');
   const [result, setResult] = useState(null);
@@ -139,12 +143,88 @@ export default function QuestionDetail({ question, onBack, questionId }) {
     setAnswer(finalTranscriptRef.current.trim());
   }
 
+  async function pollEvaluation() {
+    let { data: job } = await api.post(`/questions/${currentQuestion.id}/submit-answer/`, { answer });
+    const deadline = Date.now() + POLL_TIMEOUT_MS;
+    try {
+      while (job.status === 'pending' || job.status === 'running') {
+        if (Date.now() >= deadline) {
+          setSubmitError('Your answer was saved but is taking a while to evaluate. Check My Progress in a few minutes.');
+          return;
+        }
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+        ({ data: job } = await api.get(`/evaluations/${job.job_id}/`));
+      }
+    } catch {
+      // The answer is saved and will still be evaluated, so do not resubmit it.
+      setSubmitError('Lost the connection while evaluating. Check My Progress before submitting again.');
+      return;
+    }
+    if (job.status === 'failed') {
+      setSubmitError(job.error || 'Failed to evaluate answer.');
+      return;
+    }
+    setResult(job.answer);
+  }
+
+  // Streams feedback items as server-sent events; returns false if the stream request was
+  // not accepted, in which case nothing was saved and it is safe to submit again by polling.
+  async function streamEvaluation() {
+    const token = localStorage.getItem('access_token');
+    let response;
+    try {
+      response = await fetch(`${api.defaults.baseURL}/questions/${currentQuestion.id}/submit-answer/stream/`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: JSON.stringify({ answer }),
+      });
+    } catch {
+      return false;
+    }
+    if (!response.ok || !response.body) return false;
+
+    const partial = { score: null, strengths: [], weaknesses: [] };
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    try {
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const messages = buffer.split('\n\n');
+        buffer = messages.pop();
+        for (const message of messages) {
+          const event = message.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(message.match(/^data: (.*)$/m)?.[1] || '{}');
+          if (event === 'strength') partial.strengths = [...partial.strengths, data.text];
+          else if (event === 'weakness') partial.weaknesses = [...partial.weaknesses, data.text];
+          else if (event === 'score') partial.score = data.score;
+          else if (event === 'done') Object.assign(partial, data);
+          else if (event === 'error') {
+            setSubmitError(data.detail || 'Failed to evaluate answer.');
+            setResult(null);
+            continue;
+          }
+          setResult({ ...partial });
+        }
+      }
+    } catch {
+      // The server may already have saved the answer, so do not resubmit it by polling.
+      setSubmitError('Lost the connection while evaluating. Check My Progress before submitting again.');
+    }
+    return true;
+  }
+
   async function handleSubmit() {
     setSubmitError('');
     setSubmitLoading(true);
     try {
-      const { data } = await api.post(`/questions/${currentQuestion.id}/submit-answer/`, { answer });
-      setResult(data);
+      const streamed = await streamEvaluation();
+      if (!streamed) await pollEvaluation();
     } catch (err) {
       setSubmitError(err.response?.data?.detail || 'Failed to submit answer.');
     } finally {